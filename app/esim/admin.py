@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.urls import path, reverse
 from django.shortcuts import get_object_or_404, render, redirect
+from django.http import JsonResponse
+from django.utils.http import urlencode
 from django.contrib import messages
 from django.utils.html import format_html
 from django.db.models import Count, Q
@@ -11,16 +13,35 @@ from app import dealers
 from app.dealers.models import Dealer, DealerRole
 from app.users.models import CustomUser
 from .models import OfferedPackage, eSIMPackage, Provider, Country
+from .pagination import EstimatedCountPaginator
+from .bulk import freeze_selection
+from .progress import enqueue, read_progress, request_cancel
+from .search import update_search_vectors
+from .stats import read_catalogue_stats
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .tasks import (
+    bulk_package_action,
     sync_all_esim_packages,
     sync_country_esim_packages,
+    sync_esimaccess_packages,
+    sync_esimgo_packages,
     update_country_esim_packages,
     cleanup_old_packages,
     validate_package_data,
 )
 
+PROVIDER_SYNC_TASKS = {
+    "esimaccess": sync_esimaccess_packages,
+    "esimgo": sync_esimgo_packages,
+}
+
+
+def sync_progress_redirect(task_ids):
+    """Kuyruğa alınan senkronizasyon görevlerinin ilerleme sayfasına yönlendirir"""
+    url = reverse("admin:esim_package_sync_progress")
+    return redirect(f"{url}?{urlencode([('task', task_id) for task_id in task_ids])}")
+
 
 class PriceRangeFilter(admin.SimpleListFilter):
     title = "Fiyat Aralığı"
@@ -91,7 +112,7 @@ class DataAmountRangeFilter(admin.SimpleListFilter):
         elif self.value() == "20gb+":
             return queryset.filter(data_amount_mb__gte=20480)
         elif self.value() == "unlimited":
-            return queryset.filter(data_amount_mb=-1)
+            return queryset.filter(is_unlimited=True)
 
 
 class ProviderFilter(admin.SimpleListFilter):
@@ -125,22 +146,37 @@ class ProviderAdmin(ModelAdmin):
     readonly_fields = ("created_at", "updated_at")
     list_editable = ("is_active",)
 
+    def get_queryset(self, request):
+        # Paket sayıları satır başına sorgu yerine tek sorguda hesaplanır
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                package_count=Count("esimpackage"),
+                active_package_count=Count(
+                    "esimpackage", filter=Q(esimpackage__is_active=True)
+                ),
+            )
+        )
+
     def package_count(self, obj):
-        count = eSIMPackage.objects.filter(provider=obj).count()
         return format_html(
-            '<span style="font-weight: bold; color: #666;">{}</span>', count
+            '<span style="font-weight: bold; color: #666;">{}</span>',
+            obj.package_count,
         )
 
     package_count.short_description = "Toplam Paket"
+    package_count.admin_order_field = "package_count"
 
     def active_package_count(self, obj):
-        count = eSIMPackage.objects.filter(provider=obj, is_active=True).count()
+        count = obj.active_package_count
         color = "#28a745" if count > 0 else "#dc3545"
         return format_html(
             '<span style="font-weight: bold; color: {};">{}</span>', color, count
         )
 
     active_package_count.short_description = "Aktif Paket"
+    active_package_count.admin_order_field = "active_package_count"
 
     def view_packages_button(self, obj):
         url = (
@@ -177,23 +213,18 @@ class ProviderAdmin(ModelAdmin):
 
     def sync_provider_packages(self, request, provider_id):
         provider = Provider.objects.get(id=provider_id)
-
-        if provider.slug == "esimaccess":
-            task = sync_all_esim_packages.delay()
-            messages.success(
-                request,
-                f"✅ {provider.name} paketleri senkronize ediliyor. Task ID: {task.id}",
-            )
-        elif provider.slug == "esimgo":
-            from .services import Esimgo
-
-            esim_go = Esimgo()
-            esim_go.get_all_esim()
-            messages.success(
-                request, f"✅ {provider.name} paketleri senkronize edildi."
+        task = PROVIDER_SYNC_TASKS.get(provider.slug)
+        if task is None:
+            messages.error(
+                request, f"❌ {provider.name} için senkronizasyon tanımlı değil."
             )
+            return redirect("admin:esim_provider_changelist")
 
-        return redirect("admin:esim_provider_changelist")
+        task_id = enqueue(task, f"{provider.name} senkronizasyonu")
+        messages.success(
+            request, f"✅ {provider.name} paketleri senkronize ediliyor. Task ID: {task_id}"
+        )
+        return sync_progress_redirect([task_id])
 
 
 @admin.register(Country)
@@ -209,14 +240,26 @@ class CountryAdmin(ModelAdmin):
     search_fields = ("name", "code")
     ordering = ("name",)
 
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                package_count=Count(
+                    "esimpackage", filter=Q(esimpackage__is_active=True)
+                )
+            )
+        )
+
     def package_count(self, obj):
-        count = eSIMPackage.objects.filter(countries=obj, is_active=True).count()
+        count = obj.package_count
         color = "#28a745" if count > 0 else "#dc3545"
         return format_html(
             '<span style="font-weight: bold; color: {};">{}</span>', color, count
         )
 
     package_count.short_description = "Aktif Paket Sayısı"
+    package_count.admin_order_field = "package_count"
 
     def sync_country_button(self, obj):
         return format_html(
@@ -253,12 +296,16 @@ class CountryAdmin(ModelAdmin):
 
     def sync_country_packages(self, request, country_id):
         country = Country.objects.get(id=country_id)
-        task = sync_country_esim_packages.delay(country.code)
+        task_id = enqueue(
+            sync_country_esim_packages,
+            f"{country.code} ülkesi senkronizasyonu",
+            country.code,
+        )
         messages.success(
             request,
-            f"✅ {country.name} ({country.code}) paketleri senkronize ediliyor. Task ID: {task.id}",
+            f"✅ {country.name} ({country.code}) paketleri senkronize ediliyor. Task ID: {task_id}",
         )
-        return redirect("admin:esim_country_changelist")
+        return sync_progress_redirect([task_id])
 
 
 @admin.register(eSIMPackage)
@@ -284,11 +331,15 @@ class eSIMPackageAdmin(ModelAdmin):
         "created_at",
         "updated_at",
     )
-    search_fields = ("name", "provider__name", "countries__name", "countries__code")
+    # Ülke araması `get_search_results` içinde `country_codes` üzerinden yapılır
+    search_fields = ("name", "provider__name")
     readonly_fields = ("created_at", "updated_at")
     filter_horizontal = ("countries",)
     list_per_page = 25
     list_select_related = ("provider",)
+    # Büyük tabloda sayfa süresini COUNT(*) belirlemesin
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # Toplu işlemler
     actions = [
@@ -299,7 +350,35 @@ class eSIMPackageAdmin(ModelAdmin):
     ]
 
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related("countries")
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(country_count=Count("countries"))
+            .prefetch_related("countries")
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        filtered = queryset
+        queryset, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        term = search_term.strip()
+        if term:
+            # Ülke tablosu küçük; eşleşen kodlar GIN indeksli dizi üzerinde aranır
+            codes = list(
+                Country.objects.filter(
+                    Q(name__icontains=term) | Q(code__iexact=term)
+                ).values_list("code", flat=True)
+            )
+            if codes:
+                # Liste filtreleri korunur: eşleşmeler gelen queryset içinden seçilir
+                queryset |= filtered.filter(country_codes__overlap=codes)
+        return queryset, may_have_duplicates
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Admin'de eklenen/düzenlenen paket bir sonraki senkronizasyonu beklemeden aranabilir
+        update_search_vectors([form.instance.pk])
 
     def package_info(self, obj):
         return format_html(
@@ -332,14 +411,14 @@ class eSIMPackageAdmin(ModelAdmin):
     price_info.short_description = "Fiyat"
 
     def data_info(self, obj):
-        if obj.data_amount_mb == -1:
+        if obj.is_unlimited:
             return format_html(
                 '<div style="font-weight: bold; color: #8e44ad;">♾️ Sınırsız</div>'
             )
         elif obj.data_amount_mb >= 1024:
-            gb = round(obj.data_amount_mb / 1024, 1)
             return format_html(
-                '<div style="font-weight: bold; color: #3498db;">{} GB</div>', gb
+                '<div style="font-weight: bold; color: #3498db;">{} GB</div>',
+                f"{obj.data_amount_gb:.1f}",
             )
         else:
             return format_html(
@@ -358,13 +437,11 @@ class eSIMPackageAdmin(ModelAdmin):
     validity_info.short_description = "Geçerlilik"
 
     def country_info(self, obj):
-        countries = list(obj.countries.all()[:3])
-        country_codes = [c.code for c in countries]
+        # Prefetch edilmiş liste dilimlenir; ek sorgu yapılmaz
+        country_codes = [c.code for c in obj.countries.all()[:3]]
 
-        if obj.countries.count() > 3:
-            display_text = (
-                f"{', '.join(country_codes)} +{obj.countries.count() - 3} daha"
-            )
+        if obj.country_count > 3:
+            display_text = f"{', '.join(country_codes)} +{obj.country_count - 3} daha"
         else:
             display_text = ", ".join(country_codes)
 
@@ -372,10 +449,11 @@ class eSIMPackageAdmin(ModelAdmin):
             '<div style="font-size: 12px; color: #34495e;">🌍 {}</div>'
             '<div style="font-size: 10px; color: #7f8c8d;">Toplam: {} ülke</div>',
             display_text,
-            obj.countries.count(),
+            obj.country_count,
         )
 
     country_info.short_description = "Ülkeler"
+    country_info.admin_order_field = "country_count"
 
     def status_info(self, obj):
         if obj.is_active:
@@ -389,45 +467,56 @@ class eSIMPackageAdmin(ModelAdmin):
 
     status_info.short_description = "Durum"
 
-    # Toplu işlem fonksiyonları
-    def bulk_activate_packages(self, request, queryset):
-        count = queryset.update(is_active=True, updated_at=timezone.now())
+    # Toplu işlem fonksiyonları: seçim arka planda parça parça işlenir
+    def _run_bulk_action(self, request, queryset, action, label):
+        task_id = enqueue(
+            bulk_package_action,
+            label,
+            action,
+            freeze_selection(queryset),
+            cancellable=True,
+        )
         self.message_user(
-            request, f"✅ {count} paket aktif hale getirildi.", level=messages.SUCCESS
+            request,
+            f"🔄 {label} arka planda başlatıldı. Task ID: {task_id}",
+            level=messages.INFO,
+        )
+        return sync_progress_redirect([task_id])
+
+    def bulk_activate_packages(self, request, queryset):
+        return self._run_bulk_action(
+            request, queryset, "activate", "Paketleri aktif hale getirme"
         )
 
     bulk_activate_packages.short_description = "🟢 Seçili paketleri aktif hale getir"
 
     def bulk_deactivate_packages(self, request, queryset):
-        count = queryset.update(is_active=False, updated_at=timezone.now())
-        self.message_user(
-            request, f"⚠️ {count} paket pasif hale getirildi.", level=messages.WARNING
+        return self._run_bulk_action(
+            request, queryset, "deactivate", "Paketleri pasif hale getirme"
         )
 
     bulk_deactivate_packages.short_description = "🔴 Seçili paketleri pasif hale getir"
 
     def bulk_delete_packages(self, request, queryset):
-        count = queryset.count()
-        queryset.delete()
-        self.message_user(request, f"🗑️ {count} paket silindi.", level=messages.ERROR)
+        return self._run_bulk_action(request, queryset, "delete", "Paket silme")
 
     bulk_delete_packages.short_description = "🗑️ Seçili paketleri sil"
 
     def bulk_sync_selected_providers(self, request, queryset):
         providers = set(queryset.values_list("provider__slug", flat=True))
-        for provider_slug in providers:
-            if provider_slug == "esimaccess":
-                task = sync_all_esim_packages.delay()
-                messages.success(
-                    request,
-                    f"🔄 {provider_slug} senkronizasyonu başlatıldı. Task ID: {task.id}",
-                )
-            elif provider_slug == "esimgo":
-                from .services import Esimgo
-
-                esim_go = Esimgo()
-                esim_go.get_all_esim()
-                messages.success(request, f"🔄 {provider_slug} senkronize edildi.")
+        task_ids = []
+        for provider_slug in sorted(providers):
+            task = PROVIDER_SYNC_TASKS.get(provider_slug)
+            if task is None:
+                continue
+            task_id = enqueue(task, f"{provider_slug} senkronizasyonu")
+            task_ids.append(task_id)
+            messages.success(
+                request,
+                f"🔄 {provider_slug} senkronizasyonu başlatıldı. Task ID: {task_id}",
+            )
+        if task_ids:
+            return sync_progress_redirect(task_ids)
 
     bulk_sync_selected_providers.short_description = (
         "🔄 Seçili paketlerin provider'larını senkronize et"
@@ -466,6 +555,21 @@ class eSIMPackageAdmin(ModelAdmin):
                 self.admin_site.admin_view(self.provider_catalog_view),
                 name="esim_package_provider_catalog",
             ),
+            path(
+                "sync-progress/",
+                self.admin_site.admin_view(self.sync_progress_view),
+                name="esim_package_sync_progress",
+            ),
+            path(
+                "sync-progress/status/",
+                self.admin_site.admin_view(self.sync_progress_status),
+                name="esim_package_sync_progress_status",
+            ),
+            path(
+                "sync-progress/cancel/",
+                self.admin_site.admin_view(self.sync_progress_cancel),
+                name="esim_package_sync_progress_cancel",
+            ),
         ]
         return custom_urls + urls
 
@@ -496,13 +600,43 @@ class eSIMPackageAdmin(ModelAdmin):
             },
         )
 
+    def sync_progress_view(self, request):
+        """Kuyruğa alınan senkronizasyon görevlerinin canlı ilerleme sayfası"""
+        return render(
+            request,
+            "admin/esim/sync_progress.html",
+            dict(
+                self.admin_site.each_context(request),
+                title="Senkronizasyon İlerlemesi",
+                task_ids=request.GET.getlist("task"),
+            ),
+        )
+
+    def sync_progress_status(self, request):
+        # İlerleme sayfasının yokladığı hafif uç nokta: sadece önbellek okunur
+        progress = read_progress(request.GET.getlist("task"))
+        return JsonResponse({"tasks": progress})
+
+    def sync_progress_cancel(self, request):
+        if request.method != "POST":
+            return JsonResponse(
+                {"status": "error", "message": "POST bekleniyor"}, status=405
+            )
+        task_id = request.POST.get("task")
+        if not task_id:
+            return JsonResponse(
+                {"status": "error", "message": "task gerekli"}, status=400
+            )
+        request_cancel(task_id)
+        return JsonResponse({"status": "success"})
+
     def sync_all_view(self, request):
         if request.method == "POST":
-            task = sync_all_esim_packages.delay()
+            task_id = enqueue(sync_all_esim_packages, "Tüm paketlerin senkronizasyonu")
             messages.success(
-                request, f"🔄 Tüm paket senkronizasyonu başlatıldı. Task ID: {task.id}"
+                request, f"🔄 Tüm paket senkronizasyonu başlatıldı. Task ID: {task_id}"
             )
-            return redirect("admin:esim_esimpackage_changelist")
+            return sync_progress_redirect([task_id])
 
         return render(
             request,
@@ -520,17 +654,20 @@ class eSIMPackageAdmin(ModelAdmin):
 
             if country_code:
                 if update_mode:
-                    task = update_country_esim_packages.delay(country_code)
+                    task = update_country_esim_packages
                     action = "güncellemesi"
                 else:
-                    task = sync_country_esim_packages.delay(country_code)
+                    task = sync_country_esim_packages
                     action = "senkronizasyonu"
 
+                task_id = enqueue(
+                    task, f"{country_code} ülkesi {action}", country_code
+                )
                 messages.success(
                     request,
-                    f"🔄 {country_code} ülkesi {action} başlatıldı. Task ID: {task.id}",
+                    f"🔄 {country_code} ülkesi {action} başlatıldı. Task ID: {task_id}",
                 )
-                return redirect("admin:esim_esimpackage_changelist")
+                return sync_progress_redirect([task_id])
 
         countries = Country.objects.all().order_by("name")
         return render(
@@ -546,14 +683,21 @@ class eSIMPackageAdmin(ModelAdmin):
         if request.method == "POST":
             days = int(request.POST.get("days", 30))
             confirm = request.POST.get("confirm") == "on"
+            archive = request.POST.get("archive") == "on"
 
             if confirm:
-                task = cleanup_old_packages.delay(days)
+                task_id = enqueue(
+                    cleanup_old_packages,
+                    f"{days} gün önceki pasif paketlerin temizliği",
+                    days,
+                    archive,
+                    cancellable=True,
+                )
                 messages.success(
                     request,
-                    f"🧹 {days} gün önceki paketler temizleniyor. Task ID: {task.id}",
+                    f"🧹 {days} gün önceki paketler temizleniyor. Task ID: {task_id}",
                 )
-                return redirect("admin:esim_esimpackage_changelist")
+                return sync_progress_redirect([task_id])
 
         cutoff_date = timezone.now() - timedelta(days=30)
         packages_to_delete = eSIMPackage.objects.filter(
@@ -571,11 +715,11 @@ class eSIMPackageAdmin(ModelAdmin):
 
     def validate_view(self, request):
         if request.method == "POST":
-            task = validate_package_data.delay()
+            task_id = enqueue(validate_package_data, "Paket veri doğrulaması")
             messages.success(
-                request, f"✅ Veri doğrulaması başlatıldı. Task ID: {task.id}"
+                request, f"✅ Veri doğrulaması başlatıldı. Task ID: {task_id}"
             )
-            return redirect("admin:esim_esimpackage_changelist")
+            return sync_progress_redirect([task_id])
 
         return render(
             request,
@@ -587,45 +731,40 @@ class eSIMPackageAdmin(ModelAdmin):
         )
 
     def stats_view(self, request):
-        total_packages = eSIMPackage.objects.count()
-        active_packages = eSIMPackage.objects.filter(is_active=True).count()
-
-        provider_stats = []
-        for provider in Provider.objects.all():
-            total = eSIMPackage.objects.filter(provider=provider).count()
-            active = eSIMPackage.objects.filter(
-                provider=provider, is_active=True
-            ).count()
-            provider_stats.append(
-                {
-                    "provider": provider,
-                    "total": total,
-                    "active": active,
-                    "inactive": total - active,
-                }
-            )
+        stats = read_catalogue_stats()
+        general = stats["general"]
 
-        country_stats = []
-        countries_with_packages = (
-            Country.objects.annotate(
-                package_count=Count(
-                    "esimpackage", filter=Q(esimpackage__is_active=True)
-                )
-            )
-            .filter(package_count__gt=0)
-            .order_by("-package_count")[:10]
-        )
+        provider_stats = [
+            {
+                "name": item["name"],
+                "slug": item["slug"],
+                "total": item["total_packages"],
+                "active": item["active_packages"],
+                "inactive": item["inactive_packages"],
+            }
+            for item in stats["providers"]
+        ]
+        country_stats = [
+            {
+                "code": item["code"],
+                "name": item["name"],
+                "package_count": item["package_count"],
+                "rank": item["rank"],
+            }
+            for item in stats["countries"][:10]
+        ]
 
         return render(
             request,
             "admin/esim/stats.html",
             {
                 "title": "eSIM Paket İstatistikleri",
-                "total_packages": total_packages,
-                "active_packages": active_packages,
-                "inactive_packages": total_packages - active_packages,
+                "total_packages": general["total_packages"],
+                "active_packages": general["active_packages"],
+                "inactive_packages": general["inactive_packages"],
                 "provider_stats": provider_stats,
-                "country_stats": countries_with_packages,
+                "country_stats": country_stats,
+                "computed_at": stats["computed_at"],
             },
         )
 
@@ -0,0 +1,151 @@
+"""
+Katalog okuma uç noktalarının asenkron (ASGI) karşılıkları.
+
+Yanıt gövdeleri senkron DRF view'larıyla aynıdır; veritabanı erişimi Django'nun
+asenkron ORM arayüzleri (`aget`, `afirst`, `acount`, `async for`), önbellek
+erişimi `cache.aget`/`cache.aadd` ile yapılır. uvicorn gibi bir ASGI sunucusu
+altında yavaş sorgular bir worker'ı bloklamaz.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from simmaxi.db_router import read_from_replica
+from simmaxi.renderers import ORJSONRenderer
+from simmaxi.throttling import athrottled
+
+from .models import Country
+from .pagination import estimated_count
+from .queries import (
+    package_lookup_queryset,
+    page_queryset,
+    parse_search_params,
+    search_payload,
+    search_queryset,
+    snapshot_search,
+)
+from .rankings import best_packages, best_payload, parse_best_params
+from .snapshot import get_snapshot
+from .stats import aread_catalogue_stats
+from .supported_countries import acached_supported_countries
+from .tasks import refresh_supported_countries_cache
+
+_renderer = ORJSONRenderer()
+
+
+def _json(data, status=200):
+    return HttpResponse(
+        _renderer.render(data), content_type="application/json", status=status
+    )
+
+
+def _error(message, status):
+    return _json({"status": "error", "message": message}, status=status)
+
+
+def _snapshot_page(search):
+    # Dosya açma ve tüm katalog üzerinde filtreleme event loop'u bloklamamalı
+    snapshot = get_snapshot()
+    return None if snapshot is None else snapshot_search(snapshot, search)
+
+
+@read_from_replica
+@require_GET
+@athrottled(2)
+async def search_packages(request):
+    """eSIM paketlerini arar ve filtreler (asenkron)"""
+    try:
+        search = parse_search_params(request.GET)
+    except ValueError as exc:
+        return _error(str(exc), 400)
+
+    found = None
+    if not search["search_term"]:
+        found = await sync_to_async(_snapshot_page)(search)
+
+    if found is not None:
+        total_count, page_ids = found
+        count_exact = True
+        packages_by_id = await package_lookup_queryset(search).ain_bulk(page_ids)
+        packages = [packages_by_id[i] for i in page_ids if i in packages_by_id]
+    else:
+        queryset = search_queryset(search)
+        total_count, count_exact = await sync_to_async(estimated_count)(queryset)
+        packages = [pkg async for pkg in page_queryset(queryset, search)]
+
+    return _json(search_payload(search, packages, total_count, count_exact))
+
+
+@read_from_replica
+@require_GET
+@athrottled()
+async def get_supported_countries(request):
+    """Desteklenen ülkeleri döndürür (asenkron)"""
+    provider = request.GET.get("provider", "all")
+    try:
+        entry, stale = await acached_supported_countries(provider)
+    except ValueError as exc:
+        return _error(str(exc), 400)
+
+    if stale and await cache.aadd(
+        f"esim:supported-countries:{provider}:refreshing", 1, 60
+    ):
+        await sync_to_async(refresh_supported_countries_cache.delay)(provider)
+
+    if entry is None:
+        return _error(
+            "Ülke listesi henüz hazır değil, lütfen daha sonra tekrar deneyin", 503
+        )
+
+    country_data = entry["countries"]
+    return _json(
+        {
+            "status": "success",
+            "provider": provider,
+            "countries": country_data,
+            "count": len(country_data),
+            "refreshed_at": entry["refreshed_at"],
+            "stale": stale,
+        }
+    )
+
+
+@read_from_replica
+@require_GET
+@athrottled()
+async def get_package_stats(request):
+    """eSIM paket istatistiklerini döndürür (asenkron)"""
+    stats = await aread_catalogue_stats()
+    return _json(
+        {
+            "status": "success",
+            "data": {
+                "general": stats["general"],
+                "providers": stats["providers"],
+                "top_countries": stats["countries"][:10],
+                "computed_at": stats["computed_at"],
+            },
+        }
+    )
+
+
+@read_from_replica
+@require_GET
+@athrottled()
+async def get_best_packages(request, code):
+    """Ülkenin en iyi değerli paketlerini döndürür (asenkron)"""
+    try:
+        metric, unlimited, limit = parse_best_params(request.GET)
+    except ValueError as exc:
+        return _error(str(exc), 400)
+
+    country = await Country.objects.filter(code=code.upper()).afirst()
+    if country is None:
+        return _error(f"Ülke bulunamadı: {code}", 404)
+
+    rankings = [
+        ranking async for ranking in best_packages(country, metric, limit, unlimited)
+    ]
+    return _json(best_payload(country, metric, unlimited, rankings))
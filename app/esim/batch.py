@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .catalogue import current_generation
+from .models import Country, eSIMPackage
+from .serializers import eSIMPackageBatchSerializer
+
+BATCH_MAX_KEYS = 500
+BATCH_LOOKUPS = ("id", "slug", "external_id")
+CACHE_TIMEOUT = 60 * 10
+# Paket her değiştiğinde (`updated_at`) ya da yeni nesil yayınlandığında anahtar değişir
+CACHE_KEY = "esim:package:{generation}:{id}:{version}"
+
+
+def normalize_keys(keys, by):
+    """İstek anahtarlarını doğrular, tekrarları sırayı bozmadan ayıklar"""
+    if by not in BATCH_LOOKUPS:
+        raise ValueError(f"by şunlardan biri olmalı: {', '.join(BATCH_LOOKUPS)}")
+    if not isinstance(keys, list) or not keys:
+        raise ValueError("keys boş olmayan bir liste olmalı")
+    if len(keys) > BATCH_MAX_KEYS:
+        raise ValueError(f"En fazla {BATCH_MAX_KEYS} anahtar gönderilebilir")
+
+    if by == "id":
+        try:
+            keys = [int(key) for key in keys]
+        except (TypeError, ValueError):
+            raise ValueError("id anahtarları tam sayı olmalı")
+    else:
+        keys = [str(key) for key in keys]
+    return list(dict.fromkeys(keys))
+
+
+def _resolve(keys, by):
+    """Anahtarları (paket id, updated_at) çiftlerine çözer"""
+    # Aynı slug birden çok pakette olabilir: aktif ve en güncel olan kazanır
+    rows = (
+        eSIMPackage.objects.filter(**{f"{by}__in": keys})
+        .order_by("-is_active", "-updated_at", "-id")
+        .values_list(by, "id", "updated_at")
+    )
+    found = {}
+    for key, pk, updated_at in rows:
+        found.setdefault(key, (pk, updated_at))
+    return found
+
+
+def _cache_key(generation, pk, updated_at):
+    return CACHE_KEY.format(
+        generation=generation, id=pk, version=updated_at.timestamp()
+    )
+
+
+def _fetch(ids):
+    queryset = (
+        eSIMPackage.objects.filter(id__in=ids)
+        .select_related("provider")
+        .prefetch_related(
+            Prefetch("countries", queryset=Country.objects.only("code", "name"))
+        )
+    )
+    return {pkg.id: (pkg, eSIMPackageBatchSerializer(pkg).data) for pkg in queryset}
+
+
+def lookup_packages(keys, by="id"):
+    """
+    Paketleri çözer; (istek sırasındaki paketler, bulunamayanlar) döner.
+
+    Anahtarlar önce hafif bir sorguyla paket id ve `updated_at` değerlerine
+    çözülür; serileştirilmiş paketler bu sürümle önbelleğe yazılır, böylece
+    admin düzenlemeleri ve toplu işlemler yayını beklemeden görünür.
+    Bulunamayan anahtarlar önbelleğe alınmaz.
+    """
+    keys = normalize_keys(keys, by)
+    generation = current_generation()
+    resolved = _resolve(keys, by)
+
+    cache_keys = {
+        _cache_key(generation, pk, updated_at): pk
+        for pk, updated_at in resolved.values()
+    }
+    payloads = {
+        cache_keys[cache_key]: payload
+        for cache_key, payload in cache.get_many(list(cache_keys)).items()
+    }
+
+    misses = {pk for pk, _ in resolved.values()} - payloads.keys()
+    if misses:
+        fetched = _fetch(misses)
+        payloads.update({pk: payload for pk, (_, payload) in fetched.items()})
+        cache.set_many(
+            {
+                _cache_key(generation, pk, pkg.updated_at): payload
+                for pk, (pkg, payload) in fetched.items()
+            },
+            CACHE_TIMEOUT,
+        )
+
+    packages, missing = [], []
+    for key in keys:
+        pk = resolved[key][0] if key in resolved else None
+        if pk in payloads:
+            packages.append(payloads[pk])
+        else:
+            missing.append(key)
+    return packages, missing
@@ -0,0 +1,105 @@
+"""
+Admin toplu işlemlerinin (aktif/pasif yapma, silme) arka planda parça parça
+çalıştırılması.
+
+Seçim, admin'de tıklandığı andaki birincil anahtarlar olarak, ardışık id'ler
+`[ilk, son]` aralıklarına sıkıştırılıp JSON ile göreve aktarılır (görev
+mesajında sorgu ya da pickle taşınmaz). Görev id'leri `BULK_BATCH_SIZE`'lık
+parçalar halinde işler; her parça kendi kısa transaction'ındadır. Böylece
+"tümünü seç" tabloyu tek bir büyük transaction'da kilitlemez; iş parçalar
+arasında iptal edilebilir.
+"""
+
+import logging
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import eSIMPackage
+from .progress import cancel_requested, report
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 2000
+BULK_ACTIONS = {
+    "activate": "aktif hale getirildi",
+    "deactivate": "pasif hale getirildi",
+    "delete": "silindi",
+}
+
+
+def freeze_selection(queryset):
+    """Admin seçimini görev mesajına sığacak şekilde id aralıkları olarak paketler"""
+    ranges = []
+    pks = queryset.order_by("pk").values_list("pk", flat=True)
+    for pk in pks.iterator(chunk_size=BULK_BATCH_SIZE):
+        if ranges and ranges[-1][1] == pk - 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+
+def _selection_size(selection):
+    return sum(last - first + 1 for first, last in selection)
+
+
+def _batches(selection):
+    ids = (pk for first, last in selection for pk in range(first, last + 1))
+    while batch := list(islice(ids, BULK_BATCH_SIZE)):
+        yield batch
+
+
+def _apply(action, ids):
+    packages = eSIMPackage.objects.filter(pk__in=ids)
+    if action == "delete":
+        # OfferedPackage, ülke ve sıralama satırları parça ile birlikte silinir
+        packages.delete()
+    else:
+        packages.update(is_active=action == "activate", updated_at=timezone.now())
+
+
+def run_bulk_action(action, selection, task_id=None):
+    """
+    Seçili paketlere işlemi parça parça uygular.
+
+    `{"status", "processed", "total", "message"}` döndürür; iptal edilirse
+    o ana kadar işlenen parçalar kalıcıdır.
+    """
+    if action not in BULK_ACTIONS:
+        raise ValueError(f"Geçersiz toplu işlem: {action}")
+
+    total = _selection_size(selection)
+    processed = 0
+    report(f"{total} paket işlenecek", done=0, total=total)
+
+    for batch in _batches(selection):
+        if task_id and cancel_requested(task_id):
+            message = f"İptal edildi: {processed}/{total} paket {BULK_ACTIONS[action]}"
+            logger.info(message)
+            return {
+                "status": "cancelled",
+                "processed": processed,
+                "total": total,
+                "message": message,
+            }
+
+        with transaction.atomic():
+            _apply(action, batch)
+
+        processed += len(batch)
+        report(
+            f"{processed}/{total} paket {BULK_ACTIONS[action]}",
+            done=processed,
+            total=total,
+        )
+
+    message = f"{processed} paket {BULK_ACTIONS[action]}"
+    logger.info(message)
+    return {
+        "status": "success",
+        "processed": processed,
+        "total": total,
+        "message": message,
+    }
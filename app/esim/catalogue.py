@@ -0,0 +1,44 @@
+import logging
+import time
+
+from .plans import update_plan_keys
+from .progress import report
+from .rankings import rebuild_rankings
+from .search import update_country_codes, update_search_vectors
+from .snapshot import get_snapshot, write_snapshot
+from .stats import rebuild_catalogue_stats
+from .supported_countries import refresh_all_supported_countries
+
+logger = logging.getLogger(__name__)
+
+
+def _run_step(label, func, *args):
+    # Bir okuma modelinin hatası diğerlerinin yayınlanmasını engellememeli
+    try:
+        func(*args)
+    except Exception as exc:
+        logger.error(f"{label} hatası: {exc}")
+
+
+def publish_catalogue():
+    """Senkronizasyon sonrası katalog okuma modellerini yeni bir nesil olarak yayınlar"""
+    generation = time.time_ns()
+    steps = [
+        ("Arama vektörü güncelleme", update_search_vectors),
+        ("Plan anahtarları", update_plan_keys),
+        ("Ülke kodları", update_country_codes),
+        ("Katalog snapshot yazma", write_snapshot, generation),
+        ("Katalog istatistikleri", rebuild_catalogue_stats),
+        ("Paket sıralamaları", rebuild_rankings),
+        ("Ülke listesi önbelleği", refresh_all_supported_countries, False),
+    ]
+    for index, (label, func, *args) in enumerate(steps):
+        report(f"Katalog yayınlama: {label}", done=index, total=len(steps))
+        _run_step(label, func, *args)
+    return generation
+
+
+def current_generation():
+    """Yayınlanmış güncel katalog neslini döndürür (snapshot yoksa 0)"""
+    snapshot = get_snapshot()
+    return snapshot.generation if snapshot else 0
@@ -0,0 +1,140 @@
+"""
+Eski pasif paketlerin parça parça temizlenmesi.
+
+Adaylar (`is_active=False`, `updated_at` eşiğin öncesinde) id aralıkları
+halinde işlenir; her aralık kendi kısa transaction'ında kilitlenir, istenirse
+`ArchivedPackage` tablosuna sıkıştırılmış olarak kopyalanır ve silinir.
+Başka bir işlemin kilitlediği satırlar atlanır (bir sonraki çalıştırmada
+silinir). Aralık genişliği parça başına süre bütçesine göre ayarlanır.
+"""
+
+import json
+import logging
+import time
+import zlib
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import ArchivedPackage, eSIMPackage
+from .progress import cancel_requested, report
+
+logger = logging.getLogger(__name__)
+
+CLEANUP_BATCH_SIZE = 1000
+CLEANUP_TIME_BUDGET = 0.5
+MIN_WINDOW = 100
+MAX_WINDOW = 50000
+
+# Arşive kopyalanmayan, diğer alanlardan yeniden üretilebilen alanlar
+_DERIVED_FIELDS = {"search_vector"}
+ARCHIVE_FIELDS = [
+    field.attname
+    for field in eSIMPackage._meta.concrete_fields
+    if field.name not in _DERIVED_FIELDS
+]
+
+
+def stale_packages(days):
+    cutoff_date = timezone.now() - timedelta(days=days)
+    return eSIMPackage.objects.filter(is_active=False, updated_at__lt=cutoff_date)
+
+
+def _archive(rows):
+    ArchivedPackage.objects.bulk_create(
+        ArchivedPackage(
+            package_id=row["id"],
+            provider_id=row["provider_id"],
+            name=row["name"],
+            external_id=row["external_id"],
+            package_updated_at=row["updated_at"],
+            data=zlib.compress(json.dumps(row, cls=DjangoJSONEncoder).encode()),
+        )
+        for row in rows
+    )
+
+
+def _delete_window(candidates, low, high, archive):
+    """`[low, high)` aralığındaki adayları kilitleyip siler; silinen sayıyı döndürür"""
+    with transaction.atomic():
+        rows = list(
+            candidates.filter(id__gte=low, id__lt=high)
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("id")
+            .values(*ARCHIVE_FIELDS)
+        )
+        if not rows:
+            return 0
+        if archive:
+            _archive(rows)
+        # OfferedPackage, ülke ve sıralama satırları parça ile birlikte silinir
+        eSIMPackage.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+    return len(rows)
+
+
+def run_cleanup(
+    days=30,
+    archive=False,
+    batch_size=CLEANUP_BATCH_SIZE,
+    time_budget=CLEANUP_TIME_BUDGET,
+    task_id=None,
+):
+    """
+    `days` günden uzun süredir güncellenmeyen pasif paketleri id aralıkları
+    halinde siler (`archive` ile önce arşivler).
+
+    `{"status", "deleted", "archived", "batches", "seconds", "rows_per_second",
+    "message"}` döndürür; iptal edilirse o ana kadar silinen parçalar kalıcıdır.
+    """
+    candidates = stale_packages(days)
+    bounds = candidates.aggregate(low=Min("id"), high=Max("id"))
+    started = time.monotonic()
+    deleted = batches = 0
+    window = max(MIN_WINDOW, batch_size)
+    status = "success"
+
+    low = bounds["low"]
+    while low is not None and low <= bounds["high"]:
+        if task_id and cancel_requested(task_id):
+            status = "cancelled"
+            break
+
+        batch_started = time.monotonic()
+        deleted += _delete_window(candidates, low, low + window, archive)
+        batches += 1
+        low += window
+
+        # Yavaş parçada aralık daraltılır, hızlı parçada genişletilir
+        elapsed = time.monotonic() - batch_started
+        if elapsed > time_budget:
+            window = max(MIN_WINDOW, window // 2)
+        elif elapsed < time_budget / 2:
+            window = min(MAX_WINDOW, window * 2)
+
+        report(
+            f"{deleted} paket silindi (id < {low})",
+            done=min(low, bounds["high"] + 1) - bounds["low"],
+            total=bounds["high"] + 1 - bounds["low"],
+        )
+
+    seconds = time.monotonic() - started
+    rows_per_second = round(deleted / seconds, 1) if seconds else 0
+    message = (
+        f"{deleted} paket {'arşivlenip ' if archive else ''}silindi "
+        f"({batches} parça, {seconds:.1f} sn, {rows_per_second} satır/sn)"
+    )
+    if status == "cancelled":
+        message = f"İptal edildi: {message}"
+    logger.info(message)
+    return {
+        "status": status,
+        "deleted": deleted,
+        "archived": deleted if archive else 0,
+        "batches": batches,
+        "seconds": round(seconds, 2),
+        "rows_per_second": rows_per_second,
+        "message": message,
+    }
@@ -0,0 +1,289 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max, Prefetch
+
+from .catalogue import current_generation
+from .models import Country, OfferedPackage, eSIMPackage
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow yoksa sadece CSV.gz üretilebilir
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BATCH_SIZE = 10000
+GZIP_FLUSH_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "arrow", "csv": "csv.gz"}
+EXPORT_DATASETS = ("packages", "package_countries", "offered_packages")
+
+
+def export_queryset(provider_slug=None, country_code=None, updated_since=None):
+    """Dışa aktarılacak aktif paketler (provider ve ülkeler önceden yüklenmiş)"""
+    queryset = (
+        eSIMPackage.objects.filter(is_active=True)
+        .select_related("provider")
+        .prefetch_related(
+            Prefetch("countries", queryset=Country.objects.only("code", "name"))
+        )
+        .order_by("id")
+    )
+    if provider_slug:
+        queryset = queryset.filter(provider__slug=provider_slug)
+    if country_code:
+        queryset = queryset.filter(countries__code=country_code)
+    if updated_since:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    return queryset
+
+
+def package_record(pkg):
+    return {
+        "id": pkg.id,
+        "external_id": pkg.external_id,
+        "slug": pkg.slug,
+        "name": pkg.name,
+        "provider": {"name": pkg.provider.name, "slug": pkg.provider.slug},
+        "price": str(pkg.price),
+        "data_amount_mb": pkg.data_amount_mb,
+        "validity_days": pkg.validity_days,
+        "countries": [{"code": c.code, "name": c.name} for c in pkg.countries.all()],
+        "updated_at": pkg.updated_at.isoformat(),
+    }
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Paketleri sunucu taraflı cursor ile okuyup satır satır JSON üretir"""
+    for pkg in queryset.iterator(chunk_size=chunk_size):
+        if orjson is not None:
+            yield orjson.dumps(package_record(pkg)).decode() + "\n"
+        else:
+            yield json.dumps(package_record(pkg), ensure_ascii=False) + "\n"
+
+
+def gzip_stream(lines):
+    """Metin satırlarını akış halinde gzip'ler; bellekte en fazla bir tampon tutar"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= GZIP_FLUSH_BYTES:
+            chunk = compressor.compress(b"".join(buffer))
+            buffer, size = [], 0
+            if chunk:
+                yield chunk
+    yield compressor.compress(b"".join(buffer)) + compressor.flush()
+
+
+def _datasets():
+    # (sütun adı, arrow tipi) listesi ve aynı sırada değer üreten queryset
+    active = eSIMPackage.objects.filter(is_active=True)
+    return {
+        "packages": (
+            [
+                ("id", "int64"),
+                ("external_id", "string"),
+                ("slug", "string"),
+                ("name", "string"),
+                ("provider_id", "int64"),
+                ("provider_slug", "string"),
+                ("price", "decimal"),
+                ("data_amount_mb", "int64"),
+                ("validity_days", "int64"),
+                ("is_offered", "bool"),
+                ("updated_at", "timestamp"),
+            ],
+            active.order_by("id").values_list(
+                "id",
+                "external_id",
+                "slug",
+                "name",
+                "provider_id",
+                "provider__slug",
+                "price",
+                "data_amount_mb",
+                "validity_days",
+                "is_offered",
+                "updated_at",
+            ),
+        ),
+        "package_countries": (
+            [
+                ("package_id", "int64"),
+                ("country_code", "string"),
+                ("country_name", "string"),
+            ],
+            eSIMPackage.countries.through.objects.filter(esimpackage__is_active=True)
+            .order_by("esimpackage_id")
+            .values_list("esimpackage_id", "country__code", "country__name"),
+        ),
+        "offered_packages": (
+            [
+                ("id", "int64"),
+                ("package_id", "int64"),
+                ("title", "string"),
+                ("cost_price", "decimal"),
+                ("cost_multiplier", "decimal"),
+                ("sales_multiplier", "decimal"),
+                ("sale_price", "decimal"),
+                ("end_user_sales", "bool"),
+                ("dealer_sale", "bool"),
+                ("status", "bool"),
+            ],
+            OfferedPackage.objects.order_by("id").values_list(
+                "id",
+                "esim_id",
+                "title",
+                "cost_price",
+                "cost_multiplier",
+                "sales_multiplier",
+                "sale_price",
+                "end_user_sales",
+                "dealer_sale",
+                "status",
+            ),
+        ),
+    }
+
+
+def _arrow_schema(columns):
+    types = {
+        "int64": pa.int64(),
+        "string": pa.string(),
+        "decimal": pa.decimal128(12, 2),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _iter_batches(queryset, size=EXPORT_BATCH_SIZE):
+    batch = []
+    for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_arrow(path, export_format, columns, queryset):
+    schema = _arrow_schema(columns)
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    try:
+        for batch in _iter_batches(queryset):
+            arrays = [
+                pa.array([row[i] for row in batch], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+    finally:
+        writer.close()
+
+
+def _write_csv(path, columns, queryset):
+    with gzip.open(path, "wt", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow([name for name, _ in columns])
+        for batch in _iter_batches(queryset):
+            writer.writerows(batch)
+
+
+def export_root():
+    return Path(
+        getattr(
+            settings,
+            "ESIM_EXPORT_DIR",
+            Path(settings.BASE_DIR) / "var" / "exports",
+        )
+    )
+
+
+def _check_format(export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Desteklenmeyen format: {export_format}")
+    if export_format != "csv" and pa is None:
+        raise ValueError(f"{export_format} formatı için pyarrow kurulu olmalı")
+
+
+def export_dataset(dataset, export_format, directory):
+    """Tek bir veri setini verilen klasöre yazar ve dosya yolunu döndürür"""
+    _check_format(export_format)
+    columns, queryset = _datasets()[dataset]
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{dataset}.{EXPORT_FORMATS[export_format]}"
+    # Aynı süreçteki eşzamanlı iş parçacıkları da ayrı geçici dosyaya yazar
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=f"{path.name}.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp_path = Path(tmp.name)
+
+    try:
+        if export_format == "csv":
+            _write_csv(tmp_path, columns, queryset)
+        else:
+            _write_arrow(tmp_path, export_format, columns, queryset)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return path
+
+
+def _offered_version():
+    # Sunulan paket fiyatları admin'de senkronizasyondan bağımsız düzenlenir
+    state = OfferedPackage.objects.aggregate(count=Count("id"), last=Max("updated_at"))
+    last = state["last"].strftime("%Y%m%d%H%M%S%f") if state["last"] else "0"
+    return f"offered-{state['count']}-{last}"
+
+
+def cached_export(dataset, export_format):
+    """
+    Güncel katalog nesli için dışa aktarım dosyasını döndürür.
+
+    Dosya bu nesil için daha önce üretildiyse yeniden üretilmez; yeni nesle
+    geçildiğinde eski neslin klasörleri silinir. `offered_packages` ayrıca
+    sunulan paketlerin sayısı ve son `updated_at` değeriyle anahtarlanır.
+    Yayınlanmış nesil yoksa her çağrıda yeniden üretilir.
+    """
+    _check_format(export_format)
+    generation = current_generation()
+    root = export_root()
+    directory = root / str(generation)
+    if dataset == "offered_packages":
+        directory = directory / _offered_version()
+    path = directory / f"{dataset}.{EXPORT_FORMATS[export_format]}"
+    if generation and path.exists():
+        return path
+
+    path = export_dataset(dataset, export_format, directory)
+    for old in root.iterdir():
+        if old.is_dir() and old.name != str(generation):
+            shutil.rmtree(old, ignore_errors=True)
+    if dataset == "offered_packages":
+        for old in directory.parent.glob("offered-*"):
+            if old != directory:
+                shutil.rmtree(old, ignore_errors=True)
+    return path
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+GB_QUANT = Decimal("0.01")
+PRICE_PER_GB_QUANT = Decimal("0.0001")
+
+
+def format_package_name(name, provider_slug):
+    """Provider'a özel paket adını "Ülke,Süre/Veri" biçimine çevirir"""
+    if provider_slug == "esimaccess":
+        parts = name.split(" ")
+        if len(parts) == 3:
+            country = parts[0]
+            data = parts[1]
+            validity = parts[2]
+            return f"{country},{validity}/{data}"
+        return name
+
+    elif provider_slug == "esimgo":
+        parts = name.split(", ")
+        if len(parts) >= 5:
+            country = parts[3]
+            data = parts[1]
+            validity = parts[2].replace(" ", " ")
+            return f"{country},{validity}/{data}"
+        return name
+
+    return name
+
+
+def display_fields(name, provider_slug, price, data_amount_mb, detail):
+    """Senkronizasyonda bir kez hesaplanıp saklanan gösterim alanlarını döndürür"""
+    # data_amount_mb pozitif tamsayıdır; sınırsız paketler sağlayıcı verisinde işaretlenir
+    is_unlimited = isinstance(detail, dict) and detail.get("unlimited") is True
+
+    data_amount_gb = None
+    price_per_gb = None
+    if not is_unlimited and data_amount_mb and data_amount_mb > 0:
+        gb = Decimal(data_amount_mb) / 1024
+        data_amount_gb = gb.quantize(GB_QUANT)
+        if price is not None:
+            price_per_gb = (Decimal(str(price)) / gb).quantize(PRICE_PER_GB_QUANT)
+
+    return {
+        "formatted_name": format_package_name(name or "", provider_slug)[:255],
+        "data_amount_gb": data_amount_gb,
+        "price_per_gb": price_per_gb,
+        "is_unlimited": is_unlimited,
+    }
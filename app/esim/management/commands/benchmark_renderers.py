@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from app.esim import views
+from simmaxi.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+
+ENDPOINTS = {
+    "packages": (
+        "/esim/api/packages/",
+        views.EsimPackageViewSet.as_view({"get": "list"}),
+    ),
+    "search": ("/esim/api/search/", views.search_packages),
+    "countries": (
+        "/esim/api/countries/",
+        views.CountryPackageViewSet.as_view({"get": "list"}),
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Paket listesi yanıtlarını JSON, orjson ve MessagePack renderer'larıyla karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=200,
+            help="Her renderer için tekrar sayısı (varsayılan: 200)",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=100,
+            help="search uç noktasının sayfa boyutu (varsayılan: 100)",
+        )
+
+    def _measure(self, renderer, data, iterations):
+        timings = []
+        payload = b""
+        for _ in range(iterations):
+            start = time.perf_counter()
+            payload = renderer.render(data, renderer.media_type, {})
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p99 = timings[max(0, int(len(timings) * 0.99) - 1)]
+        return statistics.median(timings), p99, len(payload)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        factory = APIRequestFactory()
+
+        renderers = [("json", JSONRenderer()), ("orjson", ORJSONRenderer())]
+        if msgpack is not None:
+            renderers.append(("msgpack", MessagePackRenderer()))
+
+        self.stdout.write(self.style.SUCCESS("⏱️ Renderer Karşılaştırması"))
+        self.stdout.write("=" * 50)
+        self.stdout.write(f"Tekrar: {iterations}")
+
+        for name, (path, view) in ENDPOINTS.items():
+            params = {"page_size": options["page_size"]} if name == "search" else {}
+            response = view(factory.get(path, params))
+            if response.status_code != 200:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"\n{name}: HTTP {response.status_code}, atlandı"
+                    )
+                )
+                continue
+
+            self.stdout.write(f"\n📦 {name} ({path}):")
+            for label, renderer in renderers:
+                p50, p99, size = self._measure(renderer, response.data, iterations)
+                self.stdout.write(
+                    f"  {label:<8}: p50 {p50:.2f} ms, p99 {p99:.2f} ms, {size / 1024:.1f} KB"
+                )
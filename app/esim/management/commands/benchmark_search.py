@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from app.esim.models import eSIMPackage
+from app.esim.search import apply_search
+
+DEFAULT_TERMS = ["europe 10gb 30 days", "turkey", "türkiye", "global", "usa 5gb"]
+
+
+class Command(BaseCommand):
+    help = "Tam metin paket aramasını eski icontains aramasıyla karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "terms", nargs="*", help="Aranacak ifadeler (varsayılan: örnek set)"
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="Her ifade için tekrar sayısı (varsayılan: 50)",
+        )
+        parser.add_argument(
+            "--page-size", type=int, default=20, help="Sayfa boyutu (varsayılan: 20)"
+        )
+
+    def _measure(self, build_queryset, iterations, page_size):
+        timings = []
+        count = 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            queryset = build_queryset()
+            count = queryset.count()
+            list(queryset[:page_size])
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        return count, statistics.median(timings), p95
+
+    def handle(self, *args, **options):
+        terms = options["terms"] or DEFAULT_TERMS
+        iterations = options["iterations"]
+        page_size = options["page_size"]
+        active = eSIMPackage.objects.filter(is_active=True)
+
+        self.stdout.write(self.style.SUCCESS("⏱️ Paket Arama Karşılaştırması"))
+        self.stdout.write("=" * 50)
+        self.stdout.write(f"Aktif paket: {active.count()}, tekrar: {iterations}")
+
+        for term in terms:
+            legacy = self._measure(
+                lambda: active.filter(name__icontains=term), iterations, page_size
+            )
+            fulltext = self._measure(
+                lambda: apply_search(active, term), iterations, page_size
+            )
+
+            self.stdout.write(f"\n🔎 '{term}':")
+            self.stdout.write(
+                f"  icontains : {legacy[0]} sonuç, p50 {legacy[1]:.2f} ms, p95 {legacy[2]:.2f} ms"
+            )
+            self.stdout.write(
+                f"  full-text : {fulltext[0]} sonuç, p50 {fulltext[1]:.2f} ms, p95 {fulltext[2]:.2f} ms"
+            )
@@ -1,7 +1,11 @@
 from django.core.management.base import BaseCommand
-from app.esim.models import eSIMPackage
-from django.utils import timezone
-from datetime import timedelta
+
+from app.esim.cleanup import (
+    CLEANUP_BATCH_SIZE,
+    CLEANUP_TIME_BUDGET,
+    run_cleanup,
+    stale_packages,
+)
 
 
 class Command(BaseCommand):
@@ -17,20 +21,31 @@ class Command(BaseCommand):
         parser.add_argument(
             "--dry-run", action="store_true", help="Sadece göster, silme işlemi yapma"
         )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help="Silmeden önce paketleri arşiv tablosuna kopyala",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=CLEANUP_BATCH_SIZE,
+            help=f"Başlangıç id aralığı genişliği (varsayılan: {CLEANUP_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=CLEANUP_TIME_BUDGET,
+            help=f"Parça başına hedef süre, saniye (varsayılan: {CLEANUP_TIME_BUDGET})",
+        )
 
     def handle(self, *args, **options):
         days = options["days"]
         dry_run = options["dry_run"]
 
-        cutoff_date = timezone.now() - timedelta(days=days)
-
-        packages_to_delete = eSIMPackage.objects.filter(
-            is_active=False, updated_at__lt=cutoff_date
-        )
-
-        count = packages_to_delete.count()
-
         if dry_run:
+            packages_to_delete = stale_packages(days).select_related("provider")
+            count = packages_to_delete.count()
             self.stdout.write(
                 self.style.WARNING(
                     f"🔍 DRY RUN: {count} paket silinecek (son {days} gün içinde güncellenmemiş pasif paketler)"
@@ -44,7 +59,10 @@ class Command(BaseCommand):
             if count > 10:
                 self.stdout.write(f"  ... ve {count - 10} paket daha")
         else:
-            packages_to_delete.delete()
-            self.stdout.write(
-                self.style.SUCCESS(f"✅ {count} adet eski pasif paket silindi")
+            result = run_cleanup(
+                days,
+                archive=options["archive"],
+                batch_size=options["batch_size"],
+                time_budget=options["time_budget"],
             )
+            self.stdout.write(self.style.SUCCESS(f"✅ {result['message']}"))
@@ -1,49 +1,48 @@
 from django.core.management.base import BaseCommand
-from app.esim.models import eSIMPackage, Provider, Country
-from django.db.models import Count, Q
+from app.esim.stats import read_catalogue_stats, rebuild_catalogue_stats
 
 
 class Command(BaseCommand):
     help = "eSIM paket istatistiklerini gösterir"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Göstermeden önce istatistikleri yeniden hesapla",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="Gösterilecek ülke sayısı (varsayılan: 10)",
+        )
+
     def handle(self, *args, **options):
+        if options["refresh"]:
+            rebuild_catalogue_stats()
+        stats = read_catalogue_stats()
+
         self.stdout.write(self.style.SUCCESS("📊 eSIM Paket İstatistikleri"))
         self.stdout.write("=" * 50)
-        providers = Provider.objects.annotate(
-            total_packages=Count("esimpackage"),
-            active_packages=Count("esimpackage", filter=Q(esimpackage__is_active=True)),
-        )
+        self.stdout.write(f"Hesaplanma zamanı: {stats['computed_at']}")
 
-        for provider in providers:
-            self.stdout.write(f"\n🏢 {provider.name}:")
-            self.stdout.write(f"  Toplam Paket: {provider.total_packages}")
-            self.stdout.write(f"  Aktif Paket: {provider.active_packages}")
-            self.stdout.write(
-                f"  Pasif Paket: {provider.total_packages - provider.active_packages}"
-            )
+        for provider in stats["providers"]:
+            self.stdout.write(f"\n🏢 {provider['name']}:")
+            self.stdout.write(f"  Toplam Paket: {provider['total_packages']}")
+            self.stdout.write(f"  Aktif Paket: {provider['active_packages']}")
+            self.stdout.write(f"  Pasif Paket: {provider['inactive_packages']}")
 
         self.stdout.write(f"\n🌍 Ülke Bazlı İstatistikler:")
-        countries_with_packages = (
-            Country.objects.annotate(
-                package_count=Count(
-                    "esimpackage", filter=Q(esimpackage__is_active=True)
-                )
-            )
-            .filter(package_count__gt=0)
-            .order_by("-package_count")[:10]
-        )
-
-        for country in countries_with_packages:
+        for country in stats["countries"][: options["top"]]:
             self.stdout.write(
-                f"  {country.code} ({country.name}): {country.package_count} paket"
+                f"  {country['rank']}. {country['code']} ({country['name']}): {country['package_count']} paket"
             )
 
-        total_packages = eSIMPackage.objects.count()
-        active_packages = eSIMPackage.objects.filter(is_active=True).count()
-
+        general = stats["general"]
         self.stdout.write(f"\n📈 Genel İstatistikler:")
-        self.stdout.write(f"  Toplam Paket: {total_packages}")
-        self.stdout.write(f"  Aktif Paket: {active_packages}")
-        self.stdout.write(f"  Pasif Paket: {total_packages - active_packages}")
-        self.stdout.write(f"  Toplam Provider: {Provider.objects.count()}")
-        self.stdout.write(f"  Paket bulunan ülke: {countries_with_packages.count()}")
+        self.stdout.write(f"  Toplam Paket: {general['total_packages']}")
+        self.stdout.write(f"  Aktif Paket: {general['active_packages']}")
+        self.stdout.write(f"  Pasif Paket: {general['inactive_packages']}")
+        self.stdout.write(f"  Toplam Provider: {general['total_providers']}")
+        self.stdout.write(f"  Paket bulunan ülke: {general['countries_with_packages']}")
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from app.esim.exports import (
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    cached_export,
+    export_dataset,
+    pa,
+)
+
+
+class Command(BaseCommand):
+    help = "Aktif kataloğu, ülke eşleşmelerini ve sunulan paket fiyatlarını analiz için dışa aktarır"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=list(EXPORT_FORMATS),
+            default="parquet" if pa else "csv",
+            help="Çıktı formatı (varsayılan: pyarrow varsa parquet, yoksa csv)",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            help="Dosyaların yazılacağı klasör (verilmezse nesil önbelleği kullanılır)",
+        )
+        parser.add_argument(
+            "--dataset",
+            choices=EXPORT_DATASETS,
+            action="append",
+            help="Sadece belirtilen veri setlerini aktar (tekrarlanabilir)",
+        )
+
+    def handle(self, *args, **options):
+        export_format = options["format"]
+        datasets = options["dataset"] or EXPORT_DATASETS
+
+        for dataset in datasets:
+            started = time.monotonic()
+            try:
+                if options["output"]:
+                    path = export_dataset(dataset, export_format, options["output"])
+                else:
+                    path = cached_export(dataset, export_format)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            elapsed = time.monotonic() - started
+            size_kb = path.stat().st_size / 1024
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✅ {dataset}: {path} ({size_kb:.1f} KB, {elapsed:.2f} sn)"
+                )
+            )
@@ -0,0 +1,118 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = [
+    "/esim/api/search/?page_size=20",
+    "/esim/api/async/search/?page_size=20",
+    "/esim/api/search/?search=europe&page_size=20",
+    "/esim/api/async/search/?search=europe&page_size=20",
+    "/esim/api/countries/",
+    "/esim/api/async/countries/",
+    "/esim/api/stats/",
+    "/esim/api/async/stats/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Katalog okuma uç noktalarını eşzamanlı istemcilerle yük altında ölçer. "
+        "Karşılaştırma için sunucuları ayrı portlarda başlatın, örn. "
+        "`gunicorn simmaxi.wsgi:application -w 4 -b :8001` ve "
+        "`uvicorn simmaxi.asgi:application --workers 4 --port 8002`, sonra "
+        "`--target gunicorn=http://127.0.0.1:8001 --target uvicorn=http://127.0.0.1:8002`"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="etiket=taban_url (birden fazla verilebilir)",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Ölçülecek yol (varsayılan: senkron/asenkron örnek set)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Eşzamanlı istemci sayısı (varsayılan: 32)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Her yol için istek sayısı (varsayılan: 500)",
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=30, help="İstek zaman aşımı (sn)"
+        )
+
+    def _request(self, url, timeout):
+        start = time.perf_counter()
+        try:
+            with urlopen(url, timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (HTTPError, URLError, OSError):
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    def _run(self, url, total, concurrency, timeout):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(
+                pool.map(lambda _: self._request(url, timeout), range(total))
+            )
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(ms for ms, ok in results if ok)
+        errors = sum(1 for _, ok in results if not ok)
+        if not timings:
+            return None, errors
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        p99 = timings[max(0, int(len(timings) * 0.99) - 1)]
+        return (len(timings) / elapsed, statistics.median(timings), p95, p99), errors
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            label, sep, base_url = target.partition("=")
+            if not sep or not base_url:
+                raise CommandError(f"Geçersiz hedef: {target} (etiket=url bekleniyor)")
+            targets.append((label, base_url.rstrip("/")))
+        paths = options["paths"] or DEFAULT_PATHS
+
+        self.stdout.write(self.style.SUCCESS("⏱️ Katalog Yük Testi"))
+        self.stdout.write("=" * 50)
+        self.stdout.write(
+            f"Eşzamanlılık: {options['concurrency']}, yol başına istek: {options['requests']}"
+        )
+
+        for path in paths:
+            self.stdout.write(f"\n🔗 {path}")
+            for label, base_url in targets:
+                stats, errors = self._run(
+                    base_url + path,
+                    options["requests"],
+                    options["concurrency"],
+                    options["timeout"],
+                )
+                if stats is None:
+                    self.stdout.write(
+                        self.style.ERROR(f"  {label:<10}: tüm istekler başarısız")
+                    )
+                    continue
+                rps, p50, p95, p99 = stats
+                self.stdout.write(
+                    f"  {label:<10}: {rps:.0f} istek/sn, p50 {p50:.1f} ms, "
+                    f"p95 {p95:.1f} ms, p99 {p99:.1f} ms, hata {errors}"
+                )
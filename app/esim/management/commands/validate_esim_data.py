@@ -1,68 +1,53 @@
 from django.core.management.base import BaseCommand
-from app.esim.models import eSIMPackage, Country
-from decimal import Decimal
+
+from app.esim.validation import run_validation
 
 
 class Command(BaseCommand):
     help = "eSIM paket verilerini doğrular ve hatalı olanları listeler"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help=(
+                "Sadece son doğrulamadan beri değişen paketleri kontrol et "
+                "(önceki sorunlar ve ülke ataması değişiklikleri tekrar raporlanmaz)"
+            ),
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS("🔍 eSIM Paket Verisi Doğrulaması"))
         self.stdout.write("=" * 50)
 
-        issues = []
-
-        active_packages = eSIMPackage.objects.filter(is_active=True)
-
-        for pkg in active_packages:
-            pkg_issues = []
-
-            if pkg.price <= Decimal("0"):
-                pkg_issues.append("Fiyat 0 veya negatif")
+        result = run_validation(incremental=options["incremental"])
+        if result["mode"] == "incremental":
+            self.stdout.write(f"Artımlı mod: {result['since']} sonrası değişenler")
 
-            if pkg.data_amount_mb <= 0:
-                pkg_issues.append("Veri miktarı 0 veya negatif")
-
-            if pkg.validity_days <= 0:
-                pkg_issues.append("Geçerlilik süresi 0 veya negatif")
-
-            if not pkg.name or pkg.name.strip() == "" or pkg.name == "Unnamed Package":
-                pkg_issues.append("İsim boş veya varsayılan")
-
-            if not pkg.countries.exists():
-                pkg_issues.append("Hiç ülke atanmamış")
-
-            if pkg_issues:
-                issues.append({"package": pkg, "issues": pkg_issues})
-
-        if issues:
+        issues = result["issues"]
+        problematic_count = result["problematic_count"]
+        if problematic_count:
             self.stdout.write(
-                self.style.ERROR(f"❌ {len(issues)} pakette sorun bulundu:")
+                self.style.ERROR(f"❌ {problematic_count} pakette sorun bulundu:")
             )
 
             for item in issues[:20]:
-                pkg = item["package"]
-                self.stdout.write(f"\n📦 {pkg.name} ({pkg.provider.name}):")
+                self.stdout.write(f"\n📦 {item['package_name']} ({item['provider']}):")
                 for issue in item["issues"]:
                     self.stdout.write(f"  ⚠️  {issue}")
 
-            if len(issues) > 20:
-                self.stdout.write(f"\n... ve {len(issues) - 20} sorun daha")
+            if problematic_count > 20:
+                self.stdout.write(f"\n... ve {problematic_count - 20} sorun daha")
         else:
             self.stdout.write(
                 self.style.SUCCESS("✅ Tüm aktif paketler geçerli veri içeriyor")
             )
 
-        # Özet istatistikler
-        total_active = active_packages.count()
-        problematic_count = len(issues)
-        success_rate = (
-            ((total_active - problematic_count) / total_active * 100)
-            if total_active > 0
-            else 0
-        )
+        self.stdout.write("\n📋 Kural bazında:")
+        for rule in result["rules"]:
+            self.stdout.write(f"  {rule['message']}: {rule['count']}")
 
         self.stdout.write(f"\n📊 Özet:")
-        self.stdout.write(f"  Toplam aktif paket: {total_active}")
+        self.stdout.write(f"  Kontrol edilen aktif paket: {result['total_active']}")
         self.stdout.write(f"  Sorunlu paket: {problematic_count}")
-        self.stdout.write(f"  Başarı oranı: {success_rate:.1f}%")
+        self.stdout.write(f"  Başarı oranı: {result['success_rate']:.1f}%")
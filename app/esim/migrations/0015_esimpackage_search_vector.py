@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0014_esimpackage_slug"),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        # "Türkiye" / "turkiye" gibi yazımların eşleşmesi için aksan duyarsız,
+        # kök bulmayan (dil bağımsız) arama konfigürasyonu
+        migrations.RunSQL(
+            sql=(
+                "CREATE TEXT SEARCH CONFIGURATION esim_search (COPY = simple);"
+                "ALTER TEXT SEARCH CONFIGURATION esim_search "
+                "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;"
+            ),
+            reverse_sql="DROP TEXT SEARCH CONFIGURATION IF EXISTS esim_search;",
+        ),
+        migrations.AddField(
+            model_name="esimpackage",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="esimpackage",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="esim_package_search_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0015_esimpackage_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogueStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("general", "Genel"),
+                            ("provider", "Sağlayıcı"),
+                            ("country", "Ülke"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("code", models.CharField(blank=True, max_length=100)),
+                ("name", models.CharField(blank=True, max_length=255)),
+                ("total_packages", models.PositiveIntegerField(default=0)),
+                ("active_packages", models.PositiveIntegerField(default=0)),
+                ("rank", models.PositiveIntegerField(blank=True, null=True)),
+                ("details", models.JSONField(blank=True, default=dict)),
+                ("computed_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Katalog İstatistiği",
+                "verbose_name_plural": "Katalog İstatistikleri",
+                "ordering": ["scope", "rank", "name"],
+            },
+        ),
+    ]
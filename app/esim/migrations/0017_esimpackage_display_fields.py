@@ -0,0 +1,101 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:36
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+# app.esim.formatting'in bu migration anındaki kopyası; sonraki değişiklikler
+# geçmiş migration'ın davranışını değiştirmemeli
+def format_package_name(name, provider_slug):
+    if provider_slug == "esimaccess":
+        parts = name.split(" ")
+        if len(parts) == 3:
+            return f"{parts[0]},{parts[2]}/{parts[1]}"
+        return name
+    if provider_slug == "esimgo":
+        parts = name.split(", ")
+        if len(parts) >= 5:
+            return f"{parts[3]},{parts[2]}/{parts[1]}"
+        return name
+    return name
+
+
+def display_fields(name, provider_slug, price, data_amount_mb, detail):
+    is_unlimited = isinstance(detail, dict) and detail.get("unlimited") is True
+    data_amount_gb = None
+    price_per_gb = None
+    if not is_unlimited and data_amount_mb and data_amount_mb > 0:
+        gb = Decimal(data_amount_mb) / 1024
+        data_amount_gb = gb.quantize(Decimal("0.01"))
+        if price is not None:
+            price_per_gb = (Decimal(str(price)) / gb).quantize(Decimal("0.0001"))
+    return {
+        "formatted_name": format_package_name(name or "", provider_slug)[:255],
+        "data_amount_gb": data_amount_gb,
+        "price_per_gb": price_per_gb,
+        "is_unlimited": is_unlimited,
+    }
+
+
+def backfill_display_fields(apps, schema_editor):
+    eSIMPackage = apps.get_model("esim", "eSIMPackage")
+    fields = ["formatted_name", "data_amount_gb", "price_per_gb", "is_unlimited"]
+    batch = []
+    packages = eSIMPackage.objects.select_related("provider").iterator(chunk_size=2000)
+    for pkg in packages:
+        for field, value in display_fields(
+            pkg.name, pkg.provider.slug, pkg.price, pkg.data_amount_mb, pkg.detail
+        ).items():
+            setattr(pkg, field, value)
+        batch.append(pkg)
+        if len(batch) >= 2000:
+            eSIMPackage.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        eSIMPackage.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0016_cataloguestats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="esimpackage",
+            name="data_amount_gb",
+            field=models.DecimalField(
+                db_index=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=10,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="esimpackage",
+            name="formatted_name",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="esimpackage",
+            name="is_unlimited",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="esimpackage",
+            name="price_per_gb",
+            field=models.DecimalField(
+                db_index=True,
+                decimal_places=4,
+                editable=False,
+                max_digits=12,
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_display_fields, migrations.RunPython.noop),
+    ]
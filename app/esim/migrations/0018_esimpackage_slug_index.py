@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0017_esimpackage_display_fields"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="esimpackage",
+            name="slug",
+            field=models.TextField(db_index=True, max_length=90),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0018_esimpackage_slug_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageRanking",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[
+                            ("price_per_gb", "GB Başına Fiyat"),
+                            ("price_per_day", "Gün Başına Fiyat"),
+                            ("price", "Toplam Fiyat"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("is_unlimited", models.BooleanField(default=False)),
+                ("rank", models.PositiveIntegerField()),
+                ("value", models.DecimalField(decimal_places=4, max_digits=12)),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "country",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="esim.country"
+                    ),
+                ),
+                (
+                    "package",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="esim.esimpackage",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Paket Sıralaması",
+                "verbose_name_plural": "Paket Sıralamaları",
+                "ordering": ["country", "metric", "is_unlimited", "rank"],
+                "indexes": [
+                    models.Index(
+                        fields=["country", "metric", "is_unlimited", "rank"],
+                        name="esim_ranking_lookup",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0019_packageranking"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="esimpackage",
+            name="plan_key",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=32
+            ),
+        ),
+    ]
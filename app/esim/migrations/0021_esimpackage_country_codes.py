@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:53
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0020_esimpackage_plan_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="esimpackage",
+            name="country_codes",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=20),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="esimpackage",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["country_codes"], name="esim_package_countries_gin"
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE esim_esimpackage AS p
+                SET country_codes = k.codes
+                FROM (
+                    SELECT pc.esimpackage_id AS id,
+                        array_agg(c.code ORDER BY c.code) AS codes
+                    FROM esim_esimpackage_countries AS pc
+                    JOIN esim_country AS c ON c.id = pc.country_id
+                    GROUP BY pc.esimpackage_id
+                ) AS k
+                WHERE k.id = p.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
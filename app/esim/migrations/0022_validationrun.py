@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0021_esimpackage_country_codes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ValidationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("incremental", models.BooleanField(default=False)),
+                ("watermark", models.DateTimeField(blank=True, null=True)),
+                ("total_checked", models.PositiveIntegerField(default=0)),
+                ("problematic_count", models.PositiveIntegerField(default=0)),
+                ("rule_counts", models.JSONField(blank=True, default=dict)),
+                ("samples", models.JSONField(blank=True, default=list)),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Doğrulama Çalıştırması",
+                "verbose_name_plural": "Doğrulama Çalıştırmaları",
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="esimpackage",
+            index=models.Index(fields=["updated_at"], name="esim_package_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0022_validationrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedPackage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("package_id", models.BigIntegerField(db_index=True)),
+                ("provider_id", models.BigIntegerField(null=True)),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "external_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("package_updated_at", models.DateTimeField()),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("data", models.BinaryField()),
+            ],
+            options={
+                "verbose_name": "Arşivlenmiş Paket",
+                "verbose_name_plural": "Arşivlenmiş Paketler",
+                "ordering": ["-archived_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("esim", "0023_archivedpackage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="offeredpackage",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,7 +1,14 @@
+import json
+import zlib
 from decimal import Decimal
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.db import models
 
+from .formatting import display_fields
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -48,7 +55,7 @@ class eSIMPackage(TimeStampedModel):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     validity_days = models.PositiveIntegerField()
     data_amount_mb = models.PositiveIntegerField()
-    slug = models.TextField(max_length=90)
+    slug = models.TextField(max_length=90, db_index=True)
     detail = models.JSONField()
     is_active = models.BooleanField(default=False)
     provider = models.ForeignKey(Provider, on_delete=models.CASCADE)
@@ -57,15 +64,62 @@ class eSIMPackage(TimeStampedModel):
     is_offered = models.BooleanField(
         default=False, verbose_name="Sunulan Paket olarak işaretle"
     )
+    # İsim, slug, provider ve ülke adlarından senkronizasyon sonunda üretilir
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Gösterim alanları: her kayıtta save() içinde bir kez hesaplanır
+    formatted_name = models.CharField(
+        max_length=255, blank=True, db_index=True, editable=False
+    )
+    data_amount_gb = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, db_index=True, editable=False
+    )
+    price_per_gb = models.DecimalField(
+        max_digits=12, decimal_places=4, null=True, db_index=True, editable=False
+    )
+    is_unlimited = models.BooleanField(default=False, editable=False)
+    # Aynı ülke seti/veri/süre = aynı plan; senkronizasyon sonunda hesaplanır
+    plan_key = models.CharField(
+        max_length=32, blank=True, db_index=True, editable=False
+    )
+    # Ülke kodlarının sıralı kopyası; admin araması M2M join'i yerine bunu kullanır
+    country_codes = ArrayField(
+        models.CharField(max_length=20), default=list, blank=True, editable=False
+    )
+
+    DISPLAY_FIELDS = (
+        "formatted_name",
+        "data_amount_gb",
+        "price_per_gb",
+        "is_unlimited",
+    )
 
     def __str__(self):
         return f"{self.name} - ${self.price}"
 
+    def refresh_display_fields(self):
+        for field, value in display_fields(
+            self.name,
+            self.provider.slug,
+            self.price,
+            self.data_amount_mb,
+            self.detail,
+        ).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.refresh_display_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *self.DISPLAY_FIELDS}
+        super().save(*args, **kwargs)
+
     @property
     def data_display(self):
-        if self.data_amount_mb >= 1024:
-            gb = self.data_amount_mb / 1024
-            return f"{gb:.1f} GB"
+        if self.is_unlimited:
+            return "Unlimited"
+        if self.data_amount_gb is not None and self.data_amount_mb >= 1024:
+            return f"{self.data_amount_gb:.1f} GB"
         return f"{self.data_amount_mb} MB"
 
     @property
@@ -76,6 +130,11 @@ class eSIMPackage(TimeStampedModel):
         verbose_name = "eSIM Paketi"
         verbose_name_plural = "eSIM Paketleri"
         ordering = ["-updated_at"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="esim_package_search_gin"),
+            GinIndex(fields=["country_codes"], name="esim_package_countries_gin"),
+            models.Index(fields=["updated_at"], name="esim_package_updated_idx"),
+        ]
 
 
 class OfferedPackage(models.Model):
@@ -101,6 +160,9 @@ class OfferedPackage(models.Model):
     sale_price = models.DecimalField(
         "Satış Fiyatı", max_digits=12, decimal_places=2, editable=False
     )
+    # Admin'deki fiyat düzenlemeleri senkronizasyondan bağımsızdır; dışa aktarım
+    # önbelleği bu alanla geçersiz kılınır
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         # esim paketinden fiyatı çek
@@ -115,3 +177,116 @@ class OfferedPackage(models.Model):
         )
 
         super().save(*args, **kwargs)
+
+
+class CatalogueStats(models.Model):
+    """Senkronizasyon sonunda hesaplanan katalog istatistikleri (okuma modeli)"""
+
+    SCOPE_GENERAL = "general"
+    SCOPE_PROVIDER = "provider"
+    SCOPE_COUNTRY = "country"
+    SCOPE_CHOICES = [
+        (SCOPE_GENERAL, "Genel"),
+        (SCOPE_PROVIDER, "Sağlayıcı"),
+        (SCOPE_COUNTRY, "Ülke"),
+    ]
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    code = models.CharField(max_length=100, blank=True)
+    name = models.CharField(max_length=255, blank=True)
+    total_packages = models.PositiveIntegerField(default=0)
+    active_packages = models.PositiveIntegerField(default=0)
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.get_scope_display()} - {self.name or self.code}"
+
+    class Meta:
+        verbose_name = "Katalog İstatistiği"
+        verbose_name_plural = "Katalog İstatistikleri"
+        ordering = ["scope", "rank", "name"]
+
+
+class ArchivedPackage(models.Model):
+    """Temizlikte silinen paketlerin sıkıştırılmış kopyası"""
+
+    package_id = models.BigIntegerField(db_index=True)
+    provider_id = models.BigIntegerField(null=True)
+    name = models.CharField(max_length=255)
+    external_id = models.CharField(max_length=255, blank=True, null=True)
+    package_updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+    # Paket satırı ve ülke kodları, zlib ile sıkıştırılmış JSON olarak
+    data = models.BinaryField()
+
+    def __str__(self):
+        return f"{self.name} (#{self.package_id})"
+
+    @property
+    def payload(self):
+        return json.loads(zlib.decompress(self.data))
+
+    class Meta:
+        verbose_name = "Arşivlenmiş Paket"
+        verbose_name_plural = "Arşivlenmiş Paketler"
+        ordering = ["-archived_at"]
+
+
+class ValidationRun(models.Model):
+    """Paket veri doğrulamasının sonucu; artımlı çalıştırmaların filigranını tutar"""
+
+    incremental = models.BooleanField(default=False)
+    # Doğrulanan paketlerin en büyük updated_at değeri; artımlı çalıştırma buradan devam eder
+    watermark = models.DateTimeField(null=True, blank=True)
+    total_checked = models.PositiveIntegerField(default=0)
+    problematic_count = models.PositiveIntegerField(default=0)
+    rule_counts = models.JSONField(default=dict, blank=True)
+    samples = models.JSONField(default=list, blank=True)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Doğrulama {self.started_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        verbose_name = "Doğrulama Çalıştırması"
+        verbose_name_plural = "Doğrulama Çalıştırmaları"
+        ordering = ["-started_at"]
+
+
+class PackageRanking(models.Model):
+    """Ülke başına aktif paketlerin fiyat/değer sıralaması (okuma modeli)"""
+
+    METRIC_PRICE_PER_GB = "price_per_gb"
+    METRIC_PRICE_PER_DAY = "price_per_day"
+    METRIC_PRICE = "price"
+    METRIC_CHOICES = [
+        (METRIC_PRICE_PER_GB, "GB Başına Fiyat"),
+        (METRIC_PRICE_PER_DAY, "Gün Başına Fiyat"),
+        (METRIC_PRICE, "Toplam Fiyat"),
+    ]
+
+    country = models.ForeignKey(Country, on_delete=models.CASCADE)
+    package = models.ForeignKey(eSIMPackage, on_delete=models.CASCADE)
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    # Sınırsız paketler kendi aralarında sıralanır
+    is_unlimited = models.BooleanField(default=False)
+    rank = models.PositiveIntegerField()
+    value = models.DecimalField(max_digits=12, decimal_places=4)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.country_id} - {self.metric} #{self.rank}"
+
+    class Meta:
+        verbose_name = "Paket Sıralaması"
+        verbose_name_plural = "Paket Sıralamaları"
+        ordering = ["country", "metric", "is_unlimited", "rank"]
+        indexes = [
+            models.Index(
+                fields=["country", "metric", "is_unlimited", "rank"],
+                name="esim_ranking_lookup",
+            ),
+        ]
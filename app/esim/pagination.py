@@ -0,0 +1,66 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+# Bu sayının altındaki tahminlerde kesin COUNT(*) yapılır
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def _table_estimate(queryset):
+    # Filtresiz sorgularda tablonun istatistikteki satır sayısı (hiç ANALYZE yoksa -1)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+def _plan_estimate(queryset):
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+def estimated_count(queryset, threshold=ESTIMATED_COUNT_THRESHOLD):
+    """
+    Sorgunun satır sayısını PostgreSQL planlayıcı tahmininden döndürür.
+
+    Filtresiz sorgularda `pg_class.reltuples`, filtreli sorgularda `EXPLAIN`
+    tahmini kullanılır; tahmin `threshold` altındaysa kesin sayım yapılır.
+    `(sayı, kesin_mi)` döndürür.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.count(), True
+
+    query = queryset.query
+    estimate = -1
+    if not query.where and not query.distinct and query.group_by in (None, True):
+        estimate = _table_estimate(queryset)
+    if estimate < 0:
+        estimate = _plan_estimate(queryset)
+
+    if estimate < threshold:
+        return queryset.count(), True
+    return int(estimate), False
+
+
+class EstimatedCountPaginator(Paginator):
+    """Büyük tablolarda COUNT(*) yerine planlayıcı tahminini kullanan paginator"""
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, "query"):
+            return super().count
+        return estimated_count(self.object_list)[0]
+
+
+class CountryPackagePagination(PageNumberPagination):
+    """Bir ülkenin paket listesini sayfalar"""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
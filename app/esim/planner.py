@@ -0,0 +1,173 @@
+"""
+Çok ülkeli seyahat planlayıcı.
+
+İstenen ülkeler bir bitmask'e eşlenir (ülke i -> bit i); her paketin kapsamı
+bu ülkelerden hangilerini kapsadığını gösteren bir mask olur. Küresel
+(`is_global`) ülkelere bağlı paketler tüm ülkeleri kapsar. Aday paketler önce
+mask başına en ucuza indirilir, sonra daha ucuz ya da eşit fiyatlı bir üst
+kümesi olan mask'ler atılır. Kalan adaylar üzerinde 2^k durumlu dinamik
+programlama en düşük toplam fiyatlı kombinasyonu bulur.
+"""
+
+from decimal import Decimal
+
+from .models import Country, eSIMPackage
+from .snapshot import get_snapshot
+
+MAX_PLAN_COUNTRIES = 12
+
+
+class PlannerError(ValueError):
+    pass
+
+
+def _candidates_from_snapshot(snapshot, codes, global_codes, days, min_data):
+    masks = {}
+    for bit, code in enumerate(codes):
+        for row in snapshot.country_rows(code):
+            masks[row] = masks.get(row, 0) | (1 << bit)
+    full = (1 << len(codes)) - 1
+    for code in global_codes:
+        for row in snapshot.country_rows(code):
+            masks[row] = full
+
+    columns = snapshot.columns
+    price, validity, data, ids = (
+        columns["price_cents"],
+        columns["validity_days"],
+        columns["data_amount_mb"],
+        columns["id"],
+    )
+    for row, mask in masks.items():
+        if validity[row] >= days and data[row] >= min_data:
+            yield mask, price[row], ids[row]
+
+
+def _candidates_from_db(codes, global_codes, days, min_data):
+    links = eSIMPackage.countries.through.objects.filter(
+        country__code__in=[*codes, *global_codes],
+        esimpackage__is_active=True,
+        esimpackage__validity_days__gte=days,
+        esimpackage__data_amount_mb__gte=min_data,
+    ).values_list("esimpackage_id", "country__code", "esimpackage__price")
+
+    bits = {code: 1 << bit for bit, code in enumerate(codes)}
+    full = (1 << len(codes)) - 1
+    masks = {}
+    prices = {}
+    for package_id, code, price in links:
+        mask = full if code in global_codes else bits[code]
+        masks[package_id] = masks.get(package_id, 0) | mask
+        prices[package_id] = int(price * 100)
+    for package_id, mask in masks.items():
+        yield mask, prices[package_id], package_id
+
+
+def _prune(candidates):
+    # Mask başına en ucuz paket
+    cheapest = {}
+    for mask, cents, package_id in candidates:
+        current = cheapest.get(mask)
+        if current is None or (cents, package_id) < current:
+            cheapest[mask] = (cents, package_id)
+
+    # Fiyatı artan sırada gez: önceden tutulan bir üst küme varsa mask gereksizdir
+    kept = []
+    for mask, (cents, package_id) in sorted(
+        cheapest.items(), key=lambda item: (item[1][0], -bin(item[0]).count("1"))
+    ):
+        if any(other & mask == mask for other, _, _ in kept):
+            continue
+        kept.append((mask, cents, package_id))
+    return kept
+
+
+def _solve(candidates, country_count):
+    full = (1 << country_count) - 1
+    by_country = [[] for _ in range(country_count)]
+    for candidate in candidates:
+        for bit in range(country_count):
+            if candidate[0] & (1 << bit):
+                by_country[bit].append(candidate)
+
+    # cost[S]: S kümesini kapsayan en ucuz (fiyat, paket sayısı)
+    infinity = (float("inf"), 0)
+    cost = [infinity] * (full + 1)
+    choice = [None] * (full + 1)
+    cost[0] = (0, 0)
+    for state in range(full):
+        if cost[state] is infinity:
+            continue
+        uncovered = ~state & full
+        lowest = (uncovered & -uncovered).bit_length() - 1
+        cents, count = cost[state]
+        for mask, package_cents, package_id in by_country[lowest]:
+            target = state | mask
+            candidate = (cents + package_cents, count + 1)
+            if candidate < cost[target]:
+                cost[target] = candidate
+                choice[target] = (state, mask, package_id)
+
+    if choice[full] is None:
+        return None, []
+    plan = []
+    state = full
+    while state:
+        previous, mask, package_id = choice[state]
+        plan.append((package_id, mask & ~previous))
+        state = previous
+    return cost[full][0], plan[::-1]
+
+
+def plan_trip(country_codes, days, min_data_mb=0, use_snapshot=True):
+    """
+    Ülkelerin tamamını `days` gün kapsayan en ucuz paket kombinasyonunu bulur.
+    `use_snapshot=False` adayları snapshot yerine güncel veritabanından okur.
+
+    Dönüş: {"total_cents", "packages": [(paket id, kapsadığı kodlar)], "uncovered"}
+    """
+    codes = list(dict.fromkeys(code.strip().upper() for code in country_codes))
+    codes = [code for code in codes if code]
+    if not codes:
+        raise PlannerError("En az bir ülke kodu gerekli")
+    if len(codes) > MAX_PLAN_COUNTRIES:
+        raise PlannerError(f"En fazla {MAX_PLAN_COUNTRIES} ülke planlanabilir")
+    if days < 1:
+        raise PlannerError("days en az 1 olmalı")
+
+    global_codes = set(
+        Country.objects.filter(is_global=True).values_list("code", flat=True)
+    ) - set(codes)
+
+    snapshot = get_snapshot() if use_snapshot else None
+    if snapshot is not None:
+        candidates = _candidates_from_snapshot(
+            snapshot, codes, global_codes, days, min_data_mb
+        )
+    else:
+        candidates = _candidates_from_db(codes, global_codes, days, min_data_mb)
+    candidates = _prune(candidates)
+
+    reachable = 0
+    for mask, _, _ in candidates:
+        reachable |= mask
+    uncovered = [code for bit, code in enumerate(codes) if not reachable & (1 << bit)]
+    if uncovered:
+        return {"total_cents": None, "packages": [], "uncovered": uncovered}
+
+    total_cents, plan = _solve(candidates, len(codes))
+    return {
+        "total_cents": total_cents,
+        "packages": [
+            (
+                package_id,
+                [code for bit, code in enumerate(codes) if covers & (1 << bit)],
+            )
+            for package_id, covers in plan
+        ],
+        "uncovered": [],
+    }
+
+
+def cents_to_price(cents):
+    return (Decimal(cents) / 100).quantize(Decimal("0.01"))
@@ -0,0 +1,105 @@
+import logging
+
+from django.db import connection
+from django.db.models import Count, Min, Prefetch
+
+from .models import Country, eSIMPackage
+
+logger = logging.getLogger(__name__)
+
+# Plan anahtarı: md5(sıralı ülke kodları | veri (MB ya da "unlimited") | gün)
+_UPDATE_PLAN_KEYS_SQL = """
+UPDATE {package} AS p
+SET plan_key = k.plan_key
+FROM (
+    SELECT p2.id,
+        CASE WHEN count(c.id) = 0 THEN ''
+        ELSE md5(
+            string_agg(c.code, ',' ORDER BY c.code) || '|'
+            || CASE WHEN p2.is_unlimited THEN 'unlimited'
+                    ELSE p2.data_amount_mb::text END
+            || '|' || p2.validity_days
+        ) END AS plan_key
+    FROM {package} AS p2
+    LEFT JOIN {package_countries} AS pc ON pc.esimpackage_id = p2.id
+    LEFT JOIN {country} AS c ON c.id = pc.country_id
+    GROUP BY p2.id
+) AS k
+WHERE k.id = p.id AND p.plan_key IS DISTINCT FROM k.plan_key
+"""
+
+MAX_COMPARE_GROUPS = 200
+
+
+def update_plan_keys():
+    """Tüm paketlerin plan anahtarını tek bir UPDATE ile yeniler (sadece değişenler yazılır)"""
+    sql = _UPDATE_PLAN_KEYS_SQL.format(
+        package=eSIMPackage._meta.db_table,
+        package_countries=eSIMPackage.countries.through._meta.db_table,
+        country=Country._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        updated = cursor.rowcount
+    logger.info(f"{updated} paketin plan anahtarı güncellendi")
+    return updated
+
+
+def comparable_offers(country_code=None, limit=50):
+    """
+    Birden fazla provider'da bulunan eşdeğer planları gruplayarak döndürür.
+
+    Gruplar ve teklifleri tek sorguda okunur (plan anahtarları alt sorgu);
+    her grubun teklifleri fiyata göre artan sıradadır.
+    """
+    groups = eSIMPackage.objects.filter(is_active=True).exclude(plan_key="")
+    if country_code:
+        groups = groups.filter(countries__code=country_code)
+    groups = (
+        groups.values("plan_key")
+        .annotate(
+            providers=Count("provider", distinct=True),
+            data=Min("data_amount_mb"),
+            validity=Min("validity_days"),
+        )
+        .filter(providers__gt=1)
+        .order_by("data", "validity", "plan_key")
+        .values("plan_key")[:limit]
+    )
+
+    offers = (
+        eSIMPackage.objects.filter(is_active=True, plan_key__in=groups)
+        .select_related("provider")
+        .prefetch_related(
+            Prefetch("countries", queryset=Country.objects.only("code", "name"))
+        )
+        .order_by("data_amount_mb", "validity_days", "plan_key", "price", "id")
+    )
+
+    grouped = {}
+    for pkg in offers:
+        group = grouped.get(pkg.plan_key)
+        if group is None:
+            group = grouped[pkg.plan_key] = {
+                "plan_key": pkg.plan_key,
+                "data_amount_mb": pkg.data_amount_mb,
+                "data_amount_gb": pkg.data_amount_gb,
+                "is_unlimited": pkg.is_unlimited,
+                "validity_days": pkg.validity_days,
+                "countries": [
+                    {"code": c.code, "name": c.name} for c in pkg.countries.all()
+                ],
+                "best_price": pkg.price,
+                "best_provider": pkg.provider.slug,
+                "offers": [],
+            }
+        group["offers"].append(
+            {
+                "id": pkg.id,
+                "formatted_name": pkg.formatted_name,
+                "provider": {"name": pkg.provider.name, "slug": pkg.provider.slug},
+                "price": pkg.price,
+                "price_per_gb": pkg.price_per_gb,
+            }
+        )
+    return list(grouped.values())
@@ -0,0 +1,173 @@
+"""
+Senkronizasyon görevlerinin canlı ilerleme kaydı.
+
+Görev, `tracked` ile sarıldığında ilerleme önbellekte görev id'si anahtarıyla
+tutulur; senkronizasyon hattı (servisler, katalog yayınlama) `report()` ile
+sayfa/ülke/paket ilerlemesi yazar. Admin ilerleme sayfası ve
+`/esim/api/tasks/<id>/` bu anahtarı okur; izlenen bir görev yoksa `report()`
+hiçbir şey yapmaz. Celery sonuç backend'i kullanılmaz: görev bittiğinde
+sonucun özeti (büyük listeler kısaltılarak) aynı kayda yazılır.
+"""
+
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from celery.exceptions import Retry
+from django.core.cache import cache
+from django.utils import timezone
+
+PROGRESS_KEY = "esim:sync-progress:{task_id}"
+CANCEL_KEY = "esim:sync-cancel:{task_id}"
+PROGRESS_TIMEOUT = 60 * 60 * 24
+MAX_EVENTS = 30
+RESULT_LIST_LIMIT = 10
+
+_current = ContextVar("sync_progress", default=None)
+
+
+def _now():
+    return timezone.now().isoformat()
+
+
+def read_progress(task_ids):
+    """Görevlerin son ilerleme kayıtlarını döndürür (kaydı olmayanlar None)"""
+    keys = {PROGRESS_KEY.format(task_id=task_id): task_id for task_id in task_ids}
+    found = cache.get_many(list(keys))
+    return {task_id: found.get(key) for key, task_id in keys.items()}
+
+
+def summarize_result(result):
+    """Görev sonucunu kayda sığacak şekilde kısaltır (listelerden ilk birkaç öğe)"""
+    summary = {}
+    for key, value in result.items():
+        if isinstance(value, (list, tuple)):
+            summary[key] = list(value[:RESULT_LIST_LIMIT])
+            summary[f"{key}_total"] = len(value)
+        else:
+            summary[key] = value
+    return summary
+
+
+def mark_pending(task_id, label=""):
+    """Görev için kayıt yoksa kuyrukta kaydı açar (mevcut kaydı ezmez)"""
+    state = SyncProgress.initial_state(task_id)
+    state.update(label=label, message="Kuyrukta", updated_at=state["started_at"])
+    cache.add(PROGRESS_KEY.format(task_id=task_id), state, PROGRESS_TIMEOUT)
+
+
+def enqueue(task, label, *args, cancellable=False):
+    """
+    Görevi kuyruğa alır ve id'sini döndürür. İlk kayıt görevden önce yazılır;
+    böylece ilerleme sayfası worker başlamadan açılabilir ve worker'ın yazdığı
+    kaydın üzerine yazılmaz.
+    """
+    task_id = str(uuid.uuid4())
+    SyncProgress(task_id).update(
+        status="pending", label=label, message="Kuyrukta", cancellable=cancellable
+    )
+    task.apply_async(args, task_id=task_id)
+    return task_id
+
+
+def request_cancel(task_id):
+    """Görevden bir sonraki parçadan önce durmasını ister"""
+    cache.set(CANCEL_KEY.format(task_id=task_id), True, PROGRESS_TIMEOUT)
+    SyncProgress(task_id).update(message="İptal istendi")
+
+
+def cancel_requested(task_id):
+    return bool(cache.get(CANCEL_KEY.format(task_id=task_id)))
+
+
+class SyncProgress:
+    def __init__(self, task_id):
+        self.key = PROGRESS_KEY.format(task_id=task_id)
+        self.state = cache.get(self.key) or self.initial_state(task_id)
+
+    @staticmethod
+    def initial_state(task_id):
+        return {
+            "task_id": task_id,
+            "label": "",
+            "status": "pending",
+            "message": "",
+            "done": None,
+            "total": None,
+            "events": [],
+            "cancellable": False,
+            "result": None,
+            "started_at": _now(),
+        }
+
+    def update(self, message=None, **fields):
+        self.state.update(fields, updated_at=_now())
+        if message:
+            self.state["message"] = message
+            events = self.state["events"]
+            events.append({"at": self.state["updated_at"], "message": message})
+            del events[:-MAX_EVENTS]
+        cache.set(self.key, self.state, PROGRESS_TIMEOUT)
+
+    def finish(self, result):
+        result = result if isinstance(result, dict) else {}
+        status = result.get("status")
+        if status not in ("error", "cancelled"):
+            status = "success"
+        self.update(
+            status=status,
+            message=result.get("message") or "Tamamlandı",
+            result=summarize_result(result),
+            finished_at=_now(),
+        )
+
+
+def report(message, done=None, total=None):
+    """
+    Aktif görevin ilerlemesine bir adım yazar. Sayı verilmeyen adımlar önceki
+    adımın sayılarını temizler; çubuk ilgisiz bir aşamada eski oranı göstermez.
+    """
+    progress = _current.get()
+    if progress is not None:
+        progress.update(message, done=done, total=total)
+
+
+@contextmanager
+def track_progress(task_id, label):
+    progress = SyncProgress(task_id)
+    # Kuyruğa alırken verilen (daha açıklayıcı) etiket korunur
+    progress.update(
+        status="running", label=progress.state["label"] or label, message="Başladı"
+    )
+    token = _current.set(progress)
+    try:
+        yield progress
+    except Retry:
+        progress.update(status="retrying", message="Hata alındı, yeniden denenecek")
+        raise
+    except Exception as exc:
+        progress.update(status="error", message=str(exc))
+        raise
+    finally:
+        _current.reset(token)
+
+
+def tracked(label):
+    """`bind=True` görevlerin ilerlemesini görev id'si ile kaydeder"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(task, *args, **kwargs):
+            if not task.request.id:
+                return func(task, *args, **kwargs)
+            with track_progress(
+                task.request.id, label.format(*args, **kwargs)
+            ) as progress:
+                result = func(task, *args, **kwargs)
+                progress.finish(result)
+                return result
+
+        return wrapper
+
+    return decorator
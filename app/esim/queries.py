@@ -0,0 +1,255 @@
+"""Senkron ve asenkron katalog view'larının ortak sorgu/yanıt yardımcıları"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F, Prefetch
+
+from .models import Country, eSIMPackage
+from .search import apply_search
+from .serializers import parse_field_selection
+from .snapshot import ORDERING_COLUMNS
+
+
+def is_requested(params, path, default=True):
+    """`?fields=` / `?include=` seçimine göre alanın yanıtta yer alıp almadığı"""
+    selected = parse_field_selection(params.get("fields"))
+    included = parse_field_selection(params.get("include")) or {}
+    *parents, name = path.split(".")
+    for part in parents:
+        selected = (selected or {}).get(part) or None
+        included = included.get(part) or {}
+    if name in included:
+        return True
+    if selected:
+        return name in selected
+    return default
+
+
+def with_relations(queryset, with_provider, with_countries):
+    if with_provider:
+        queryset = queryset.select_related("provider")
+    if with_countries:
+        queryset = queryset.prefetch_related(
+            Prefetch("countries", queryset=Country.objects.only("code", "name"))
+        )
+    return queryset
+
+
+def _parse_decimal(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        number = None
+    if number is None or not number.is_finite() or number < 0:
+        raise ValueError(f"{name} sıfır veya pozitif bir sayı olmalı")
+    return number
+
+
+def _parse_int(params, name, default=None, minimum=0):
+    value = params.get(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or number < minimum:
+        raise ValueError(f"{name} en az {minimum} olan bir tam sayı olmalı")
+    return number
+
+
+def parse_search_params(params):
+    """Arama parametrelerini okur ve dönüştürür; geçersiz değerlerde ValueError fırlatır"""
+    ordering = params.get("ordering")
+    if ordering and ordering.lstrip("-") not in ORDERING_COLUMNS:
+        raise ValueError(
+            f"ordering şunlardan biri olmalı: {', '.join(ORDERING_COLUMNS)}"
+        )
+
+    page = _parse_int(params, "page", default=1, minimum=1)
+    page_size = _parse_int(params, "page_size", default=20, minimum=1)
+    return {
+        "country_code": params.get("country"),
+        "provider_slug": params.get("provider"),
+        "min_price": _parse_decimal(params, "min_price"),
+        "max_price": _parse_decimal(params, "max_price"),
+        "min_data": _parse_int(params, "min_data"),
+        "max_data": _parse_int(params, "max_data"),
+        "min_validity": _parse_int(params, "min_validity"),
+        "max_validity": _parse_int(params, "max_validity"),
+        "search_term": params.get("search"),
+        "ordering": ordering,
+        "fields": params.get("fields"),
+        "page": page,
+        "page_size": page_size,
+        "start": (page - 1) * page_size,
+        "end": page * page_size,
+        "selected": parse_field_selection(params.get("fields")),
+        "included": parse_field_selection(params.get("include")) or {},
+        "with_provider": is_requested(params, "provider"),
+        "with_countries": is_requested(params, "countries"),
+    }
+
+
+def snapshot_search(snapshot, search):
+    """Snapshot üzerinde filtreleme; (toplam, sayfadaki id'ler) döndürür"""
+    return snapshot.search(
+        country_code=search["country_code"],
+        provider_slug=search["provider_slug"],
+        min_price=search["min_price"],
+        max_price=search["max_price"],
+        min_data=search["min_data"],
+        max_data=search["max_data"],
+        min_validity=search["min_validity"],
+        max_validity=search["max_validity"],
+        ordering=search["ordering"],
+        offset=search["start"],
+        limit=search["page_size"],
+    )
+
+
+def package_lookup_queryset(search):
+    """
+    Snapshot'ın seçtiği sayfa id'lerini yükler. Son yayından sonra pasifleşen
+    paketler atlanır; bu yüzden sayfa kısa gelebilir ve `total_count` bir
+    sonraki yayına kadar snapshot neslinin sayısıdır.
+    """
+    return with_relations(
+        eSIMPackage.objects.filter(is_active=True),
+        search["with_provider"],
+        search["with_countries"],
+    )
+
+
+def ordering_expression(ordering):
+    """`-price_per_gb` gibi sıralamayı boş değerler her yönde sonda olacak şekilde çevirir"""
+    field = F(ordering.lstrip("-"))
+    if ordering.startswith("-"):
+        return field.desc(nulls_last=True)
+    return field.asc(nulls_last=True)
+
+
+def search_queryset(search):
+    """Metin araması (ya da snapshot yokken) kullanılan SQL sorgusu"""
+    queryset = eSIMPackage.objects.filter(is_active=True)
+
+    if search["country_code"]:
+        queryset = queryset.filter(countries__code=search["country_code"])
+
+    if search["provider_slug"]:
+        queryset = queryset.filter(provider__slug=search["provider_slug"])
+
+    if search["min_price"] is not None:
+        queryset = queryset.filter(price__gte=search["min_price"])
+
+    if search["max_price"] is not None:
+        queryset = queryset.filter(price__lte=search["max_price"])
+
+    if search["min_data"] is not None:
+        queryset = queryset.filter(data_amount_mb__gte=search["min_data"])
+
+    if search["max_data"] is not None:
+        queryset = queryset.filter(data_amount_mb__lte=search["max_data"])
+
+    if search["min_validity"] is not None:
+        queryset = queryset.filter(validity_days__gte=search["min_validity"])
+
+    if search["max_validity"] is not None:
+        queryset = queryset.filter(validity_days__lte=search["max_validity"])
+
+    if search["search_term"]:
+        queryset = apply_search(queryset, search["search_term"])
+
+    if search["ordering"]:
+        queryset = queryset.order_by(
+            ordering_expression(search["ordering"]), "-updated_at"
+        )
+
+    return queryset
+
+
+def page_queryset(queryset, search):
+    # Bir fazla satır okunur: sonraki sayfanın varlığı tahmini sayıya bırakılmaz
+    return with_relations(queryset, search["with_provider"], search["with_countries"])[
+        search["start"] : search["end"] + 1
+    ]
+
+
+def package_record(pkg, search):
+    record = {
+        "id": pkg.id,
+        "name": pkg.name,
+        "formatted_name": pkg.formatted_name,
+        "price": pkg.price,
+        "data_amount_mb": pkg.data_amount_mb,
+        "data_amount_gb": "Unlimited" if pkg.is_unlimited else pkg.data_amount_gb,
+        "price_per_gb": pkg.price_per_gb,
+        "validity_days": pkg.validity_days,
+        "created_at": pkg.created_at,
+        "updated_at": pkg.updated_at,
+    }
+    if search["with_provider"]:
+        record["provider"] = {"name": pkg.provider.name, "slug": pkg.provider.slug}
+    if search["with_countries"]:
+        record["countries"] = [
+            {"code": c.code, "name": c.name} for c in pkg.countries.all()
+        ]
+    if search["selected"]:
+        record = {
+            key: value
+            for key, value in record.items()
+            if key in search["selected"] or key in search["included"]
+        }
+    return record
+
+
+def _echo(value):
+    # filters_applied, istekteki gibi metin olarak döner
+    return None if value is None else str(value)
+
+
+def search_payload(search, packages, total_count, count_exact=True):
+    page, page_size = search["page"], search["page_size"]
+    packages = list(packages)
+    has_next = len(packages) > page_size
+    packages = packages[:page_size]
+    if count_exact:
+        has_next = search["end"] < total_count
+    elif not has_next and (packages or page == 1):
+        # Son sayfaya ulaşıldı: toplam artık kesin
+        total_count, count_exact = search["start"] + len(packages), True
+    elif has_next:
+        total_count = max(total_count, search["end"] + 1)
+
+    return {
+        "status": "success",
+        "data": {
+            "packages": [package_record(pkg, search) for pkg in packages],
+            "pagination": {
+                "page": page,
+                "page_size": page_size,
+                "total_count": total_count,
+                # False ise total_count planlayıcı tahminidir
+                "total_count_exact": count_exact,
+                "total_pages": (total_count + page_size - 1) // page_size,
+                "has_next": has_next,
+                "has_previous": page > 1,
+            },
+            "filters_applied": {
+                "country_code": search["country_code"],
+                "provider_slug": search["provider_slug"],
+                "min_price": _echo(search["min_price"]),
+                "max_price": _echo(search["max_price"]),
+                "min_data": _echo(search["min_data"]),
+                "max_data": _echo(search["max_data"]),
+                "min_validity": _echo(search["min_validity"]),
+                "max_validity": _echo(search["max_validity"]),
+                "search_term": search["search_term"],
+                "ordering": search["ordering"],
+                "fields": search["fields"],
+            },
+        },
+    }
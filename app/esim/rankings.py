@@ -0,0 +1,178 @@
+import logging
+
+from django.db import transaction
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Prefetch,
+    Q,
+    Window,
+)
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Country, PackageRanking, eSIMPackage
+from .serializers import eSIMPackageBatchSerializer
+
+logger = logging.getLogger(__name__)
+
+# Ülke/metrik/sınırsız grubu başına saklanan en iyi paket sayısı
+RANKING_DEPTH = 50
+BULK_SIZE = 2000
+
+Link = eSIMPackage.countries.through
+
+# metrik -> (değer ifadesi, ek filtre, sınırsız paketler dahil mi)
+METRICS = {
+    PackageRanking.METRIC_PRICE_PER_GB: (
+        F("esimpackage__price_per_gb"),
+        Q(esimpackage__price_per_gb__isnull=False),
+        False,
+    ),
+    PackageRanking.METRIC_PRICE_PER_DAY: (
+        ExpressionWrapper(
+            F("esimpackage__price") / F("esimpackage__validity_days"),
+            output_field=DecimalField(max_digits=12, decimal_places=4),
+        ),
+        Q(esimpackage__validity_days__gt=0),
+        True,
+    ),
+    PackageRanking.METRIC_PRICE: (F("esimpackage__price"), Q(), True),
+}
+
+
+def changed_country_ids(since):
+    """`since` sonrasında paketi değişen (veya paketi çıkarılan) ülkeler"""
+    current = Link.objects.filter(esimpackage__updated_at__gte=since).values_list(
+        "country_id", flat=True
+    )
+    ranked = PackageRanking.objects.filter(package__updated_at__gte=since).values_list(
+        "country_id", flat=True
+    )
+    return set(current) | set(ranked)
+
+
+def _ranked_rows(country_ids, metric):
+    value, extra_filter, with_unlimited = METRICS[metric]
+    links = Link.objects.filter(
+        Q(country_id__in=country_ids) & Q(esimpackage__is_active=True) & extra_filter
+    )
+    if not with_unlimited:
+        links = links.filter(esimpackage__is_unlimited=False)
+
+    return (
+        links.annotate(
+            value=value,
+            rank=Window(
+                RowNumber(),
+                partition_by=[F("country_id"), F("esimpackage__is_unlimited")],
+                order_by=[
+                    value.asc(),
+                    F("esimpackage__price").asc(),
+                    F("esimpackage_id").asc(),
+                ],
+            ),
+        )
+        .filter(rank__lte=RANKING_DEPTH)
+        .values_list(
+            "country_id", "esimpackage_id", "esimpackage__is_unlimited", "rank", "value"
+        )
+    )
+
+
+def rebuild_rankings(country_ids=None):
+    """
+    Paket sıralamalarını yeniden hesaplar.
+
+    `country_ids` verilmezse yalnızca son hesaplamadan beri paketi değişen
+    ülkeler yeniden sıralanır; hiç sıralama yoksa tüm ülkeler hesaplanır.
+    """
+    now = timezone.now()
+    if country_ids is None:
+        last = PackageRanking.objects.aggregate(last=Max("computed_at"))["last"]
+        if last is None:
+            country_ids = set(Link.objects.values_list("country_id", flat=True))
+        else:
+            country_ids = changed_country_ids(last)
+    country_ids = list(country_ids)
+    if not country_ids:
+        return 0
+
+    rows = [
+        PackageRanking(
+            country_id=country_id,
+            package_id=package_id,
+            metric=metric,
+            is_unlimited=is_unlimited,
+            rank=rank,
+            value=value,
+            computed_at=now,
+        )
+        for metric in METRICS
+        for country_id, package_id, is_unlimited, rank, value in _ranked_rows(
+            country_ids, metric
+        )
+    ]
+
+    with transaction.atomic():
+        PackageRanking.objects.filter(country_id__in=country_ids).delete()
+        PackageRanking.objects.bulk_create(rows, batch_size=BULK_SIZE)
+
+    logger.info(
+        f"Paket sıralamaları güncellendi: {len(country_ids)} ülke, {len(rows)} satır"
+    )
+    return len(rows)
+
+
+def best_packages(country, metric, limit, unlimited=False):
+    """Ülkenin en iyi `limit` paketini tek indeksli sorguyla döndürür"""
+    return (
+        PackageRanking.objects.filter(
+            country=country, metric=metric, is_unlimited=unlimited
+        )
+        .select_related("package__provider")
+        .prefetch_related(
+            Prefetch(
+                "package__countries", queryset=Country.objects.only("code", "name")
+            )
+        )
+        .order_by("rank")[:limit]
+    )
+
+
+def parse_best_params(params):
+    """metric/unlimited/limit parametrelerini okur; geçersizse ValueError fırlatır"""
+    metric = params.get("metric", PackageRanking.METRIC_PRICE_PER_GB)
+    unlimited = params.get("unlimited") in ("1", "true", "True")
+    metrics = dict(PackageRanking.METRIC_CHOICES)
+
+    if metric not in metrics:
+        raise ValueError(f"metric şunlardan biri olmalı: {', '.join(metrics)}")
+    if unlimited and metric == PackageRanking.METRIC_PRICE_PER_GB:
+        raise ValueError("Sınırsız paketler GB başına fiyatla sıralanamaz")
+    try:
+        limit = max(1, min(int(params.get("limit", 10)), RANKING_DEPTH))
+    except ValueError:
+        limit = 10
+    return metric, unlimited, limit
+
+
+def best_payload(country, metric, unlimited, rankings):
+    return {
+        "status": "success",
+        "data": {
+            "country": {"code": country.code, "name": country.name},
+            "metric": metric,
+            "unlimited": unlimited,
+            "packages": [
+                {
+                    "rank": ranking.rank,
+                    "value": ranking.value,
+                    "package": eSIMPackageBatchSerializer(ranking.package).data,
+                }
+                for ranking in rankings
+            ],
+        },
+    }
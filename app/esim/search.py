@@ -0,0 +1,114 @@
+import logging
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+from .models import Country, Provider, eSIMPackage
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "esim_search"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# "30Days" -> "30 Days": birleşik yazılmış sayı/birimler ayrı kelime olarak da aranabilsin
+_UPDATE_SEARCH_VECTORS_SQL = """
+UPDATE {package} AS p
+SET search_vector = v.vector
+FROM (
+    SELECT p2.id,
+        setweight(to_tsvector('{config}', p2.name || ' '
+            || regexp_replace(p2.name, '(\\d)([[:alpha:]])', '\\1 \\2', 'g')), 'A')
+        || setweight(to_tsvector('{config}', coalesce(p2.slug, '')), 'B')
+        || setweight(to_tsvector('{config}', coalesce((
+            SELECT string_agg(c.name || ' ' || c.code, ' ')
+            FROM {package_countries} AS pc
+            JOIN {country} AS c ON c.id = pc.country_id
+            WHERE pc.esimpackage_id = p2.id
+        ), '')), 'B')
+        || setweight(to_tsvector('{config}', pr.name || ' ' || pr.slug), 'C')
+        AS vector
+    FROM {package} AS p2
+    JOIN {provider} AS pr ON pr.id = p2.provider_id
+    WHERE p2.is_active {and_ids}
+) AS v
+WHERE v.id = p.id AND p.search_vector IS DISTINCT FROM v.vector
+"""
+
+
+def update_search_vectors(package_ids=None):
+    """Aktif paketlerin tam metin arama vektörlerini yeniler (sadece değişenler yazılır)"""
+    sql = _UPDATE_SEARCH_VECTORS_SQL.format(
+        config=SEARCH_CONFIG,
+        package=eSIMPackage._meta.db_table,
+        package_countries=eSIMPackage.countries.through._meta.db_table,
+        country=Country._meta.db_table,
+        provider=Provider._meta.db_table,
+        and_ids="" if package_ids is None else "AND p2.id = ANY(%s)",
+    )
+    params = [] if package_ids is None else [list(package_ids)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        updated = cursor.rowcount
+    if package_ids is None:
+        logger.info(f"{updated} paketin arama vektörü güncellendi")
+    return updated
+
+
+_UPDATE_COUNTRY_CODES_SQL = """
+UPDATE {package} AS p
+SET country_codes = k.codes
+FROM (
+    SELECT p2.id,
+        coalesce(
+            array_agg(c.code ORDER BY c.code) FILTER (WHERE c.id IS NOT NULL),
+            '{{}}'
+        ) AS codes
+    FROM {package} AS p2
+    LEFT JOIN {package_countries} AS pc ON pc.esimpackage_id = p2.id
+    LEFT JOIN {country} AS c ON c.id = pc.country_id
+    {where}
+    GROUP BY p2.id
+) AS k
+WHERE k.id = p.id AND p.country_codes IS DISTINCT FROM k.codes
+"""
+
+
+def update_country_codes(package_ids=None):
+    """Paketlerin `country_codes` kopyasını M2M tablosundan yeniler (sadece değişenler yazılır)"""
+    sql = _UPDATE_COUNTRY_CODES_SQL.format(
+        package=eSIMPackage._meta.db_table,
+        package_countries=eSIMPackage.countries.through._meta.db_table,
+        country=Country._meta.db_table,
+        where="" if package_ids is None else "WHERE p2.id = ANY(%s)",
+    )
+    params = [] if package_ids is None else [list(package_ids)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        updated = cursor.rowcount
+    if package_ids is None:
+        logger.info(f"{updated} paketin ülke kodları güncellendi")
+    return updated
+
+
+def build_search_query(term):
+    """Kullanıcı girdisini önek eşleşmeli bir tsquery'ye çevirir ("europe 10gb" -> europe:* & 10gb:*)"""
+    tokens = _TOKEN_RE.findall(term.lower())
+    if not tokens:
+        return None
+    raw = " & ".join(f"{token}:*" for token in tokens)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def apply_search(queryset, term):
+    """Queryset'i tam metin sorgusuyla filtreler ve alaka skoruna göre sıralar"""
+    query = build_search_query(term)
+    if query is None:
+        return queryset
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-updated_at")
+    )
@@ -1,41 +1,148 @@
 from rest_framework import serializers
-from .models import Country, eSIMPackage
+from .models import Country, Provider, eSIMPackage
 
 
-class eSIMPackageSerializer(serializers.ModelSerializer):
-    formatted_name = serializers.SerializerMethodField()
+def parse_field_selection(value):
+    """
+    `?fields=` / `?include=` değerini ağaç yapısına çevirir.
+
+    "id,price,eSIMPackages.id" -> {"id": {}, "price": {}, "eSIMPackages": {"id": {}}}
+    Parametre hiç verilmemişse None döner.
+    """
+    if value is None:
+        return None
+    selection = {}
+    for path in value.split(","):
+        node = selection
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return selection
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer alanlarını `fields` ve `include` seçimine göre daraltır.
+
+    `optional_fields` içindeki alanlar yalnızca `include` ile ya da `fields`
+    içinde açıkça istendiğinde döner. En dıştaki serializer seçimi istekten
+    okur; iç içe serializer'lar kendi dallarını üst serializer'dan alır.
+    """
+
+    optional_fields = ()
+
+    def __init__(self, *args, fields=None, include=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._selected_fields = fields
+        self._included_fields = include
+
+    def _field_selection(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        request = self.context.get("request")
+        if parent is None and request is not None:
+            if self._selected_fields is None:
+                self._selected_fields = parse_field_selection(
+                    request.query_params.get("fields")
+                )
+            if self._included_fields is None:
+                self._included_fields = parse_field_selection(
+                    request.query_params.get("include")
+                )
+        return self._selected_fields, self._included_fields or {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected, included = self._field_selection()
+
+        for name in self.optional_fields:
+            if name not in included and not (selected and name in selected):
+                fields.pop(name, None)
+        if selected:
+            for name in list(fields):
+                if name not in selected and name not in included:
+                    fields.pop(name)
+
+        for name, field in fields.items():
+            child = getattr(field, "child", field)
+            if isinstance(child, DynamicFieldsMixin):
+                child._selected_fields = (selected or {}).get(name) or None
+                child._included_fields = included.get(name)
+        return fields
+
+
+class CountryBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Country
+        fields = ["code", "name"]
+
+
+class eSIMPackageSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Sadece `?include=countries` ile döner; istenmezse sorgulanmaz
+    countries = CountryBriefSerializer(many=True, read_only=True)
+
+    optional_fields = ("countries",)
 
     class Meta:
         model = eSIMPackage
-        fields = ["id", "name", "formatted_name", "provider", "price", "data_amount_mb"]
-
-    def get_formatted_name(self, obj):
-        if obj.provider.slug == "esimaccess":
-            parts = obj.name.split(" ")
-            if len(parts) == 3:
-                country = parts[0]
-                data = parts[1]
-                validity = parts[2]
-                return f"{country},{validity}/{data}"
-            return obj.name
-
-        elif obj.provider.slug == "esimgo":
-            parts = obj.name.split(", ")
-            if len(parts) >= 5:
-                country = parts[3]
-                data = parts[1]
-                validity = parts[2].replace(" ", " ")
-                return f"{country},{validity}/{data}"
-            return obj.name
-
-        return obj.name
-
-
-class CountryEsimSerializer(serializers.ModelSerializer):
+        fields = [
+            "id",
+            "name",
+            "formatted_name",
+            "provider",
+            "price",
+            "data_amount_mb",
+            "data_amount_gb",
+            "price_per_gb",
+            "is_unlimited",
+            "countries",
+        ]
+
+
+class ProviderBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Provider
+        fields = ["name", "slug"]
+
+
+class eSIMPackageBatchSerializer(eSIMPackageSerializer):
+    # Toplu sorguda provider ve ülkeler her zaman döner
+    provider = ProviderBriefSerializer(read_only=True)
+
+    optional_fields = ()
+
+    class Meta(eSIMPackageSerializer.Meta):
+        fields = [
+            *eSIMPackageSerializer.Meta.fields,
+            "slug",
+            "external_id",
+            "validity_days",
+            "is_active",
+        ]
+
+
+class CountryEsimSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Sadece aktif paketlerin ilk sayfası; tamamı /country/<id>/packages/ altında
     eSIMPackages = eSIMPackageSerializer(
-        many=True, read_only=True, source="esimpackage_set"
+        many=True, read_only=True, source="active_packages"
+    )
+    package_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Country
+        fields = ["id", "name", "code", "package_count", "eSIMPackages"]
+
+
+class CountrySummarySerializer(serializers.ModelSerializer):
+    package_count = serializers.IntegerField(read_only=True)
+    min_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    cheapest_per_gb = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
     )
 
     class Meta:
         model = Country
-        fields = ["name", "code", "eSIMPackages"]
+        fields = ["id", "name", "code", "package_count", "min_price", "cheapest_per_gb"]
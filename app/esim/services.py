@@ -8,8 +8,13 @@ from typing import Optional, List, Dict, Any
 import time
 
 from app.esim.models import Country, Provider, eSIMPackage
+from app.esim.progress import report
+from app.esim.signals import deferred_country_refresh
 from django.utils import timezone
 
+# Senkronizasyon ilerlemesi kaç pakette bir yazılır
+PROGRESS_EVERY = 50
+
 
 class BaseService:
     def __init__(self, base_url, headers=None, timeout=10):
@@ -127,6 +132,7 @@ class Esimgo:
 
             all_bundles.extend(bundles)
             print(f"[INFO] Sayfa {page} - {len(bundles)} kayıt alındı.")
+            report(f"eSIM Go sayfa {page}: {len(bundles)} paket alındı")
 
             if len(bundles) < page_size:
                 break
@@ -238,7 +244,7 @@ class Esimgo:
         """eSIM paketlerini veritabanı ile senkronize eder"""
         created, updated = 0, 0
 
-        for pkg in packages:
+        for index, pkg in enumerate(packages, 1):
             try:
                 name = pkg.get("description") or pkg.get("title") or "Unnamed Package"
                 price = Decimal(str(pkg.get("price") or 0))
@@ -283,6 +289,8 @@ class Esimgo:
 
                 obj, is_created = eSIMPackage.objects.update_or_create(
                     defaults={
+                        # Mevcut paket kaydedilirken provider tekrar sorgulanmasın
+                        "provider": provider,
                         "name": name,
                         "price": price,
                         "validity_days": validity,
@@ -310,7 +318,8 @@ class Esimgo:
 
                 if all_country_codes:
                     countries_qs = Country.objects.filter(code=iso_codes)
-                    obj.countries.set(countries_qs)
+                    with deferred_country_refresh():
+                        obj.countries.set(countries_qs)
 
                 if is_created:
                     created += 1
@@ -320,6 +329,13 @@ class Esimgo:
             except Exception as e:
                 print(f"[ERROR] Paket işlenirken hata: {e} - Paket: {pkg}")
 
+            if index % PROGRESS_EVERY == 0 or index == len(packages):
+                report(
+                    f"{provider.name}: {index}/{len(packages)} paket işlendi",
+                    done=index,
+                    total=len(packages),
+                )
+
         print(
             f"[✓] {provider.name} - {created} paket oluşturuldu, {updated} paket güncellendi."
         )
@@ -352,6 +368,7 @@ class EsimMaxi:
         """Tüm eSIM paketlerini çeker"""
         print("[INFO] eSIM Access - Tüm paketler çekiliyor...")
         data = self.service.post(endpoint="package/list", json={})
+        report("eSIM Access paket listesi alındı")
         provider = self._get_or_create_provider()
         self.sync_esim_packages(data["obj"]["packageList"], provider)
 
@@ -442,7 +459,7 @@ class EsimMaxi:
         """eSIM paketlerini veritabanı ile senkronize eder"""
         created, updated = 0, 0
 
-        for pkg in packages:
+        for index, pkg in enumerate(packages, 1):
             try:
                 name = pkg.get("name", "Unnamed Package")
                 slug = pkg.get("slug", "Unnamed Slug")
@@ -468,6 +485,7 @@ class EsimMaxi:
                     name=name,
                     provider=provider,
                     defaults={
+                        "provider": provider,
                         "price": price,
                         "validity_days": validity,
                         "data_amount_mb": data_mb,
@@ -489,7 +507,8 @@ class EsimMaxi:
                     country_codes.append(target_country)
                 if country_codes:
                     countries = Country.objects.filter(code__in=country_codes)
-                    obj.countries.set(countries)
+                    with deferred_country_refresh():
+                        obj.countries.set(countries)
                 if is_created:
                     created += 1
                 else:
@@ -498,6 +517,13 @@ class EsimMaxi:
             except Exception as e:
                 print(f"[ERROR] Paket işlenirken hata: {e} - Paket: {pkg}")
 
+            if index % PROGRESS_EVERY == 0 or index == len(packages):
+                report(
+                    f"{provider.name}: {index}/{len(packages)} paket işlendi",
+                    done=index,
+                    total=len(packages),
+                )
+
         print(
             f"[✓] eSIM Access - {created} paket oluşturuldu, {updated} paket güncellendi."
         )
@@ -525,6 +551,7 @@ class eSIMService:
         print(
             f"[INFO] {country_code} ülkesi için tüm provider'lar senkronize ediliyor..."
         )
+        report(f"{country_code} ülkesi senkronize ediliyor")
 
         self.esim_go.update_country_packages(country_code)
         self.esim_access.update_country_packages(country_code)
@@ -1,6 +1,13 @@
-from django.db.models.signals import post_save, pre_save
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from celery.signals import before_task_publish
+from django.db.models.signals import m2m_changed, post_save, pre_save
 from django.dispatch import receiver
-from .models import eSIMPackage, OfferedPackage
+from django.utils import timezone
+from .models import Country, eSIMPackage, OfferedPackage
+from .progress import mark_pending
+from .search import update_country_codes
 
 
 @receiver(post_save, sender=eSIMPackage)
@@ -23,3 +30,62 @@ def create_offered_package(sender, instance, created, **kwargs):
     else:
         # Eğer işaret kaldırıldıysa, ilgili OfferedPackage varsa sil
         OfferedPackage.objects.filter(esim=instance).delete()
+
+
+_country_refresh_deferred = ContextVar("country_refresh_deferred", default=False)
+
+
+@contextmanager
+def deferred_country_refresh():
+    """Blok içindeki ülke değişikliklerinde paket başına güncelleme yapılmaz"""
+    # Senkronizasyon paketleri zaten `updated_at` ile kaydeder; ülke kodları
+    # sonunda `publish_catalogue` içinde tek bir UPDATE ile yenilenir
+    token = _country_refresh_deferred.set(True)
+    try:
+        yield
+    finally:
+        _country_refresh_deferred.reset(token)
+
+
+@receiver(m2m_changed, sender=eSIMPackage.countries.through)
+def sync_country_codes(sender, instance, action, reverse, pk_set, **kwargs):
+    if _country_refresh_deferred.get():
+        return
+    # Ülke tarafından (country.esimpackage_set) temizlemede paketler önceden alınır
+    if reverse and action == "pre_clear":
+        instance._cleared_package_ids = list(
+            instance.esimpackage_set.values_list("id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        package_ids = [instance.pk]
+    elif action == "post_clear":
+        package_ids = instance.__dict__.pop("_cleared_package_ids", [])
+    else:
+        package_ids = pk_set
+
+    if package_ids:
+        # Ülke eklenip çıkarılması paketin değişmesi sayılır: artımlı sıralama
+        # ve doğrulama `updated_at` üzerinden bu paketleri yeniden ele alır
+        eSIMPackage.objects.filter(pk__in=package_ids).update(updated_at=timezone.now())
+        update_country_codes(package_ids)
+
+
+@receiver(post_save, sender=Country)
+def refresh_country_codes(sender, instance, created, **kwargs):
+    # Kod değiştiyse bağlı paketlerin kopyası yenilenir (değişmeyen satırlar yazılmaz)
+    if not created:
+        package_ids = list(instance.esimpackage_set.values_list("id", flat=True))
+        if package_ids:
+            update_country_codes(package_ids)
+
+
+@before_task_publish.connect
+def record_queued_task(sender=None, headers=None, **kwargs):
+    # `.delay()` ile kuyruğa alınan görevler de /esim/api/tasks/<id>/ ile izlenebilir
+    task_id = (headers or {}).get("id")
+    if task_id and sender and sender.startswith("app.esim."):
+        mark_pending(task_id)
@@ -0,0 +1,301 @@
+"""
+Aktif paket kataloğunun değişmez, sütunlu ikili anlık görüntüsü.
+
+Her senkronizasyonun sonunda `write_snapshot` aktif paketleri tek bir dosyaya
+yazar. Her worker dosyayı `mmap` ile açar ve sütunları kopyalamadan
+`memoryview` üzerinden okur; dosya atomik olarak (`os.replace`) değiştirildiği
+için yeni nesil bir sonraki istekte kendiliğinden yüklenir.
+
+Dosya düzeni (little-endian):
+    başlık   : magic(4s) version(H) pad(2x) generation(q) index_len(I) pad(4x)
+    indeks   : JSON (satır sayısı, sütun/bitset offset'leri, provider slug'ları)
+    sütunlar : id, price_cents, data_amount_mb, validity_days, provider_id,
+               price_per_gb (1/10000 birim; boşsa NULL_PRICE_PER_GB) (int64)
+    bitsetler: ülke başına satır bitseti (satır i -> bayt i // 8, bit i % 8)
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Provider, eSIMPackage
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SMXC"
+VERSION = 2
+HEADER = struct.Struct("<4sHxxqIxxxx")
+COLUMNS = (
+    "id",
+    "price_cents",
+    "data_amount_mb",
+    "validity_days",
+    "provider_id",
+    "price_per_gb",
+)
+ORDERING_COLUMNS = {
+    "price": "price_cents",
+    "price_per_gb": "price_per_gb",
+    "data_amount_mb": "data_amount_mb",
+    "validity_days": "validity_days",
+}
+# Sınırsız/verisiz paketler her iki yönde de sona düşer
+NULL_PRICE_PER_GB = 1 << 62
+
+# Bayt değeri -> içindeki set bitlerin pozisyonları
+_BIT_POSITIONS = tuple(
+    tuple(bit for bit in range(8) if value & (1 << bit)) for value in range(256)
+)
+
+_lock = threading.Lock()
+_current = None
+
+
+def snapshot_path():
+    return Path(
+        getattr(
+            settings,
+            "ESIM_CATALOGUE_SNAPSHOT_PATH",
+            Path(settings.BASE_DIR) / "var" / "catalogue.snapshot",
+        )
+    )
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _to_cents(value):
+    return int((Decimal(str(value)) * 100).to_integral_value())
+
+
+def _to_ten_thousandths(value):
+    if value is None:
+        return NULL_PRICE_PER_GB
+    return int((Decimal(str(value)) * 10000).to_integral_value())
+
+
+def write_snapshot(generation):
+    """Aktif paketlerin anlık görüntüsünü yazar ve atomik olarak yayınlar"""
+    rows = list(
+        eSIMPackage.objects.filter(is_active=True)
+        .order_by("-updated_at", "-id")
+        .values_list(
+            "id",
+            "price",
+            "data_amount_mb",
+            "validity_days",
+            "provider_id",
+            "price_per_gb",
+        )
+    )
+    row_count = len(rows)
+    row_index = {row[0]: i for i, row in enumerate(rows)}
+    bitset_len = (row_count + 7) // 8
+
+    bitsets = {}
+    links = eSIMPackage.countries.through.objects.filter(
+        esimpackage__is_active=True
+    ).values_list("esimpackage_id", "country__code")
+    for package_id, code in links.iterator(chunk_size=5000):
+        i = row_index.get(package_id)
+        if i is None:
+            continue
+        bitset = bitsets.setdefault(code, bytearray(bitset_len))
+        bitset[i >> 3] |= 1 << (i & 7)
+
+    columns = {
+        "id": [row[0] for row in rows],
+        "price_cents": [_to_cents(row[1]) for row in rows],
+        "data_amount_mb": [row[2] for row in rows],
+        "validity_days": [row[3] for row in rows],
+        "provider_id": [row[4] for row in rows],
+        "price_per_gb": [_to_ten_thousandths(row[5]) for row in rows],
+    }
+
+    # Offset'ler indeksin boyutuna bağlı olduğundan önce göreli hesaplanır
+    relative = 0
+    column_offsets = {}
+    for name in COLUMNS:
+        column_offsets[name] = relative
+        relative = _align(relative + 8 * row_count)
+    country_offsets = {}
+    for code in sorted(bitsets):
+        country_offsets[code] = relative
+        relative = _align(relative + bitset_len)
+
+    index = {
+        "rows": row_count,
+        "bitset_len": bitset_len,
+        "columns": column_offsets,
+        "countries": country_offsets,
+        "providers": dict(Provider.objects.values_list("slug", "id")),
+    }
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+    data_start = _align(HEADER.size + len(index_bytes))
+
+    path = snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    with open(tmp_path, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, VERSION, generation, len(index_bytes)))
+        fh.write(index_bytes)
+        for name in COLUMNS:
+            fh.seek(data_start + column_offsets[name])
+            fh.write(struct.pack(f"<{row_count}q", *columns[name]))
+        for code, offset in country_offsets.items():
+            fh.seek(data_start + offset)
+            fh.write(bitsets[code])
+        fh.truncate(data_start + relative)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    os.replace(tmp_path, path)
+    logger.info(
+        f"Katalog snapshot yazıldı: {row_count} paket, {len(bitsets)} ülke, nesil {generation}"
+    )
+    return path
+
+
+class CatalogueSnapshot:
+    """mmap edilmiş katalog snapshot'ı üzerinde filtreleme/sıralama/sayfalama"""
+
+    def __init__(self, path, key):
+        self.key = key
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        view = self._view = memoryview(self._mm)
+
+        magic, version, generation, index_len = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Geçersiz katalog snapshot dosyası: {path}")
+
+        index = json.loads(bytes(view[HEADER.size : HEADER.size + index_len]))
+        data_start = _align(HEADER.size + index_len)
+
+        self.generation = generation
+        self.row_count = index["rows"]
+        self.providers = index["providers"]
+        self._bitset_len = index["bitset_len"]
+        self._country_offsets = {
+            code: data_start + offset for code, offset in index["countries"].items()
+        }
+        self.columns = {}
+        for name, offset in index["columns"].items():
+            start = data_start + offset
+            self.columns[name] = view[start : start + 8 * self.row_count].cast("q")
+
+    def country_rows(self, code):
+        """Ülkeyi kapsayan paketlerin satır numaraları"""
+        offset = self._country_offsets.get(code)
+        if offset is None:
+            return []
+        bitset = self._view[offset : offset + self._bitset_len]
+        rows = []
+        for byte_index, value in enumerate(bitset):
+            if value:
+                base = byte_index << 3
+                rows.extend(base + bit for bit in _BIT_POSITIONS[value])
+        return rows
+
+    def search(
+        self,
+        country_code=None,
+        provider_slug=None,
+        min_price=None,
+        max_price=None,
+        min_data=None,
+        max_data=None,
+        min_validity=None,
+        max_validity=None,
+        ordering=None,
+        offset=0,
+        limit=20,
+    ):
+        """Filtreleri uygular; (toplam, sayfadaki paket id'leri) döndürür"""
+        if country_code:
+            rows = self.country_rows(country_code)
+        else:
+            rows = range(self.row_count)
+
+        columns = self.columns
+        predicates = []
+        if provider_slug:
+            provider_id = self.providers.get(provider_slug)
+            if provider_id is None:
+                return 0, []
+            predicates.append((columns["provider_id"], provider_id, provider_id))
+        if min_price is not None or max_price is not None:
+            predicates.append(
+                (
+                    columns["price_cents"],
+                    _to_cents(min_price) if min_price is not None else None,
+                    _to_cents(max_price) if max_price is not None else None,
+                )
+            )
+        if min_data is not None or max_data is not None:
+            predicates.append((columns["data_amount_mb"], min_data, max_data))
+        if min_validity is not None or max_validity is not None:
+            predicates.append((columns["validity_days"], min_validity, max_validity))
+
+        for column, low, high in predicates:
+            if low is not None and high is not None:
+                rows = [i for i in rows if low <= column[i] <= high]
+            elif low is not None:
+                rows = [i for i in rows if column[i] >= low]
+            else:
+                rows = [i for i in rows if column[i] <= high]
+
+        if ordering:
+            field = ordering.lstrip("-")
+            column = columns[ORDERING_COLUMNS[field]]
+            # Sıralama kararlı; eşitlikte snapshot'ın -updated_at düzeni korunur
+            if ordering[0] == "-":
+                # Değerler negatiflenir; boş GB fiyatı (sentinel) azalan sırada da sonda kalır
+                rows = sorted(
+                    rows,
+                    key=lambda i: (
+                        NULL_PRICE_PER_GB
+                        if column[i] == NULL_PRICE_PER_GB
+                        else -column[i]
+                    ),
+                )
+            else:
+                rows = sorted(rows, key=column.__getitem__)
+
+        ids = columns["id"]
+        page_rows = rows[offset : offset + limit]
+        return len(rows), [ids[i] for i in page_rows]
+
+
+def get_snapshot():
+    """Güncel snapshot'ı döndürür; dosya değiştiyse atomik olarak yeniden yükler"""
+    global _current
+
+    path = snapshot_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    current = _current
+    if current is not None and current.key == key:
+        return current
+
+    with _lock:
+        if _current is None or _current.key != key:
+            try:
+                _current = CatalogueSnapshot(path, key)
+            except (OSError, ValueError) as exc:
+                logger.error(f"Katalog snapshot yüklenemedi: {exc}")
+                return current
+        return _current
@@ -0,0 +1,142 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import CatalogueStats, Country, Provider, eSIMPackage
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_catalogue_stats():
+    """Katalog istatistiklerini küme tabanlı sorgularla hesaplar ve saklar"""
+    now = timezone.now()
+
+    general = eSIMPackage.objects.aggregate(
+        total=Count("id"), active=Count("id", filter=Q(is_active=True))
+    )
+    providers = Provider.objects.annotate(
+        total=Count("esimpackage"),
+        active=Count("esimpackage", filter=Q(esimpackage__is_active=True)),
+    ).order_by("-active", "name")
+    countries = (
+        Country.objects.annotate(
+            total=Count("esimpackage"),
+            active=Count("esimpackage", filter=Q(esimpackage__is_active=True)),
+        )
+        .filter(active__gt=0)
+        .order_by("-active", "name")
+    )
+
+    rows = [
+        CatalogueStats(
+            scope=CatalogueStats.SCOPE_PROVIDER,
+            code=provider.slug,
+            name=provider.name,
+            total_packages=provider.total,
+            active_packages=provider.active,
+            rank=rank,
+            computed_at=now,
+        )
+        for rank, provider in enumerate(providers, start=1)
+    ]
+    rows += [
+        CatalogueStats(
+            scope=CatalogueStats.SCOPE_COUNTRY,
+            code=country.code,
+            name=country.name,
+            total_packages=country.total,
+            active_packages=country.active,
+            rank=rank,
+            computed_at=now,
+        )
+        for rank, country in enumerate(countries, start=1)
+    ]
+    country_count = sum(1 for row in rows if row.scope == CatalogueStats.SCOPE_COUNTRY)
+    rows.append(
+        CatalogueStats(
+            scope=CatalogueStats.SCOPE_GENERAL,
+            name="general",
+            total_packages=general["total"],
+            active_packages=general["active"],
+            details={
+                "total_providers": len(rows) - country_count,
+                "total_countries": Country.objects.count(),
+                "countries_with_packages": country_count,
+            },
+            computed_at=now,
+        )
+    )
+
+    with transaction.atomic():
+        CatalogueStats.objects.all().delete()
+        CatalogueStats.objects.bulk_create(rows)
+
+    logger.info(f"Katalog istatistikleri güncellendi ({len(rows)} satır)")
+    return rows
+
+
+# API sözleşmesi: provider'lar `slug`, ülkeler `package_count` (aktif paket) ile
+# döner; yeni alanlar sadece bunların yanına eklenir.
+def _provider_dict(row):
+    return {
+        "name": row.name,
+        "slug": row.code,
+        "total_packages": row.total_packages,
+        "active_packages": row.active_packages,
+        "inactive_packages": row.total_packages - row.active_packages,
+        "rank": row.rank,
+    }
+
+
+def _country_dict(row):
+    return {
+        "code": row.code,
+        "name": row.name,
+        "package_count": row.active_packages,
+        "total_packages": row.total_packages,
+        "rank": row.rank,
+    }
+
+
+def _stats_from_rows(rows):
+    stats = {
+        "computed_at": rows[0].computed_at,
+        "general": {},
+        "providers": [],
+        "countries": [],
+    }
+    for row in rows:
+        if row.scope == CatalogueStats.SCOPE_GENERAL:
+            stats["general"] = {
+                "total_packages": row.total_packages,
+                "active_packages": row.active_packages,
+                "inactive_packages": row.total_packages - row.active_packages,
+                **row.details,
+            }
+        elif row.scope == CatalogueStats.SCOPE_PROVIDER:
+            stats["providers"].append(_provider_dict(row))
+        else:
+            stats["countries"].append(_country_dict(row))
+
+    stats["providers"].sort(key=lambda item: item["rank"])
+    stats["countries"].sort(key=lambda item: item["rank"])
+    return stats
+
+
+def read_catalogue_stats():
+    """Saklanan istatistikleri tek sorguda okur; hiç hesaplanmamışsa önce hesaplar"""
+    rows = list(CatalogueStats.objects.all())
+    if not rows:
+        rows = rebuild_catalogue_stats()
+    return _stats_from_rows(rows)
+
+
+async def aread_catalogue_stats():
+    """`read_catalogue_stats`'ın asenkron ORM ile çalışan karşılığı"""
+    rows = [row async for row in CatalogueStats.objects.all()]
+    if not rows:
+        rows = await sync_to_async(rebuild_catalogue_stats)()
+    return _stats_from_rows(rows)
@@ -0,0 +1,110 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Country, Provider
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 60 * 60 * 6
+CACHE_KEY = "esim:supported-countries:{provider}"
+LAST_GOOD_KEY = "esim:supported-countries:{provider}:last-good"
+
+# Bu provider'ların listesi dış API'den gelir; istek sırasında asla çağrılmaz
+REMOTE_PROVIDERS = ["esimgo"]
+
+
+def _fetch(provider):
+    if provider == "all":
+        countries = Country.objects.order_by("name").values_list("code", "name")
+        return [{"code": code, "name": name} for code, name in countries]
+
+    if provider == "esimgo":
+        from .services import Esimgo
+
+        esim_go_countries = Esimgo().get_countries()
+        return [{"code": c, "name": c} for c in esim_go_countries]
+
+    countries = (
+        Country.objects.filter(
+            esimpackage__provider__slug=provider, esimpackage__is_active=True
+        )
+        .distinct()
+        .order_by("name")
+        .values_list("code", "name")
+    )
+    return [{"code": code, "name": name} for code, name in countries]
+
+
+def refresh_supported_countries(provider):
+    """Provider'ın ülke listesini kaynağından çekip önbelleğe yazar"""
+    countries = _fetch(provider)
+    if provider in REMOTE_PROVIDERS and not countries:
+        # Provider erişilemiyor: son başarılı liste yerinde kalsın
+        logger.warning(f"{provider} ülke listesi alınamadı, önbellek korunuyor")
+        return None
+
+    entry = {"countries": countries, "refreshed_at": timezone.now().isoformat()}
+    cache.set(CACHE_KEY.format(provider=provider), entry, CACHE_TIMEOUT)
+    if provider in REMOTE_PROVIDERS:
+        # Süresiz yedek sadece dış API'den gelen, yeniden üretilemeyen listeler için
+        cache.set(LAST_GOOD_KEY.format(provider=provider), entry, None)
+    return entry
+
+
+def _check_provider(provider, exists):
+    if provider != "all" and provider not in REMOTE_PROVIDERS and not exists():
+        raise ValueError(f"Bilinmeyen provider: {provider}")
+
+
+def refresh_all_supported_countries(include_remote=True):
+    """Tüm provider'ların ülke listelerini yeniler"""
+    providers = ["all", *Provider.objects.values_list("slug", flat=True)]
+    providers = [p for p in providers if p not in REMOTE_PROVIDERS]
+    if include_remote:
+        providers += REMOTE_PROVIDERS
+
+    refreshed = 0
+    for provider in providers:
+        try:
+            if refresh_supported_countries(provider) is not None:
+                refreshed += 1
+        except Exception as exc:
+            logger.error(f"{provider} ülke listesi yenilenemedi: {exc}")
+    return refreshed
+
+
+def cached_supported_countries(provider):
+    """
+    Önbellekteki ülke listesini döndürür: (entry, stale).
+
+    Uzak provider'lar için önbellek boşsa son başarılı liste döner ve
+    `stale=True` işaretlenir; liste hiç yoksa `(None, True)` döner.
+    Veritabanı kaynaklı listeler önbellekte yoksa yerinde hesaplanır.
+    Bilinmeyen provider'lar önbelleğe yazılmadan ValueError ile reddedilir.
+    """
+    entry = cache.get(CACHE_KEY.format(provider=provider))
+    if entry is not None:
+        return entry, False
+
+    if provider in REMOTE_PROVIDERS:
+        return cache.get(LAST_GOOD_KEY.format(provider=provider)), True
+
+    _check_provider(provider, Provider.objects.filter(slug=provider).exists)
+    return refresh_supported_countries(provider), False
+
+
+async def acached_supported_countries(provider):
+    """`cached_supported_countries`'ın asenkron önbellek erişimli karşılığı"""
+    entry = await cache.aget(CACHE_KEY.format(provider=provider))
+    if entry is not None:
+        return entry, False
+
+    if provider in REMOTE_PROVIDERS:
+        return await cache.aget(LAST_GOOD_KEY.format(provider=provider)), True
+
+    exists = await Provider.objects.filter(slug=provider).aexists()
+    _check_provider(provider, lambda: exists)
+    return await sync_to_async(refresh_supported_countries)(provider), False
@@ -1,15 +1,23 @@
 from celery import shared_task
-from django.utils import timezone
-from datetime import timedelta
 import logging
 
+from .bulk import run_bulk_action
+from .catalogue import publish_catalogue
+from .cleanup import run_cleanup
+from .progress import report, tracked
 from .services import eSIMService, EsimMaxi, Esimgo
-from .models import eSIMPackage, Country, Provider
+from .models import Country, Provider
+from .validation import run_validation
+from .supported_countries import (
+    refresh_all_supported_countries,
+    refresh_supported_countries,
+)
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, max_retries=3)
+@tracked("Tüm paketlerin senkronizasyonu")
 def sync_all_esim_packages(self):
     print("TASK WORKING!")
     """Tüm eSIM paketlerini senkronize eder"""
@@ -17,6 +25,7 @@ def sync_all_esim_packages(self):
         logger.info("Tüm eSIM paketleri senkronizasyonu başlatıldı")
         service = eSIMService()
         service.sync_all_providers()
+        publish_catalogue()
         logger.info("Tüm eSIM paketleri başarıyla senkronize edildi")
         return {"status": "success", "message": "Tüm paketler senkronize edildi"}
     except Exception as exc:
@@ -27,12 +36,14 @@ def sync_all_esim_packages(self):
 
 
 @shared_task(bind=True, max_retries=3)
+@tracked("{} ülkesi senkronizasyonu")
 def sync_country_esim_packages(self, country_code):
     """Belirli bir ülke için eSIM paketlerini senkronize eder"""
     try:
         logger.info(f"{country_code} için eSIM paket senkronizasyonu başlatıldı")
         service = eSIMService()
         service.sync_country_packages(country_code)
+        publish_catalogue()
         logger.info(f"{country_code} ülkesi eSIM paketleri başarıyla senkronize edildi")
         return {
             "status": "success",
@@ -46,12 +57,14 @@ def sync_country_esim_packages(self, country_code):
 
 
 @shared_task(bind=True, max_retries=3)
+@tracked("{} ülkesi güncellemesi")
 def update_country_esim_packages(self, country_code):
     """Belirli bir ülke için eSIM paketlerini günceller"""
     try:
         logger.info(f"{country_code} ülkesi eSIM paketleri güncellemesi başlatıldı")
         service = eSIMService()
         service.update_country_packages(country_code)
+        publish_catalogue()
         logger.info(f"{country_code} ülkesi eSIM paketleri başarıyla güncellendi")
         return {"status": "success", "message": f"{country_code} paketleri güncellendi"}
     except Exception as exc:
@@ -61,13 +74,15 @@ def update_country_esim_packages(self, country_code):
         return {"status": "error", "message": str(exc)}
 
 
-@shared_task
-def sync_esimaccess_packages():
+@shared_task(bind=True)
+@tracked("eSIM Access senkronizasyonu")
+def sync_esimaccess_packages(self):
     """Sadece eSIM Access paketlerini senkronize eder"""
     try:
         logger.info("eSIM Access paketleri senkronizasyonu başlatıldı")
         esim_access = EsimMaxi()
         esim_access.get_all_esim()
+        publish_catalogue()
         logger.info("eSIM Access paketleri başarıyla senkronize edildi")
 
         return {
@@ -79,14 +94,16 @@ def sync_esimaccess_packages():
         return {"status": "error", "message": str(exc)}
 
 
-@shared_task
-def sync_esimgo_packages():
+@shared_task(bind=True)
+@tracked("eSIM Go senkronizasyonu")
+def sync_esimgo_packages(self):
     """Sadece eSIM Go paketlerini senkronize eder"""
 
     try:
         logger.info("eSIM Go paketleri senkronizasyonu başlatıldı")
         esim_go = Esimgo()
         esim_go.get_all_esim()
+        publish_catalogue()
         logger.info("eSIM Go paketleri başarıyla senkronize edildi")
 
         return {"status": "success", "message": "eSIM Go paketleri senkronize edildi"}
@@ -95,13 +112,15 @@ def sync_esimgo_packages():
         return {"status": "error", "message": str(exc)}
 
 
-@shared_task
-def update_esimgo_packages():
+@shared_task(bind=True)
+@tracked("eSIM Go güncellemesi")
+def update_esimgo_packages(self):
     """eSIM Go paketlerini günceller (önce pasif hale getirir)"""
     try:
         logger.info("eSIM Go paketleri güncellemesi başlatıldı")
         esim_go = Esimgo()
         esim_go.update_all_packages()
+        publish_catalogue()
         logger.info("eSIM Go paketleri başarıyla güncellendi")
         return {"status": "success", "message": "eSIM Go paketleri güncellendi"}
     except Exception as exc:
@@ -109,31 +128,62 @@ def update_esimgo_packages():
         return {"status": "error", "message": str(exc)}
 
 
-@shared_task
-def cleanup_old_packages(days=30):
-    """Eski ve pasif paketleri temizler"""
+@shared_task(bind=True)
+@tracked("Desteklenen ülke listelerinin yenilenmesi")
+def refresh_supported_countries_cache(self, provider=None):
+    """Desteklenen ülke listelerini önbellekte yeniler"""
     try:
-        logger.info(f"{days} gün öncesine ait pasif paketler temizleniyor")
-        cutoff_date = timezone.now() - timedelta(days=days)
+        if provider:
+            refreshed = 1 if refresh_supported_countries(provider) else 0
+        else:
+            refreshed = refresh_all_supported_countries()
+        logger.info(f"{refreshed} ülke listesi önbellekte yenilendi")
+        return {"status": "success", "message": f"{refreshed} ülke listesi yenilendi"}
+    except Exception as exc:
+        logger.error(f"Ülke listesi yenileme hatası: {exc}")
+        return {"status": "error", "message": str(exc)}
 
-        deleted_count, _ = eSIMPackage.objects.filter(
-            is_active=False, updated_at__lt=cutoff_date
-        ).delete()
 
-        logger.info(f"{deleted_count} adet eski pasif paket silindi")
-        return {"status": "success", "message": f"{deleted_count} paket silindi"}
+@shared_task(bind=True)
+@tracked("Toplu paket işlemi: {}")
+def bulk_package_action(self, action, selection):
+    """Admin toplu işlemini parça parça uygular ve kataloğu yeniden yayınlar"""
+    try:
+        result = run_bulk_action(action, selection, task_id=self.request.id)
+        if result["processed"]:
+            report("Katalog yayınlanıyor")
+            publish_catalogue()
+        return result
+    except Exception as exc:
+        logger.error(f"Toplu paket işlemi hatası ({action}): {exc}")
+        return {"status": "error", "message": str(exc)}
+
+
+@shared_task(bind=True)
+@tracked("Eski paket temizliği")
+def cleanup_old_packages(self, days=30, archive=False):
+    """Eski ve pasif paketleri parça parça temizler (istenirse önce arşivler)"""
+    try:
+        logger.info(f"{days} gün öncesine ait pasif paketler temizleniyor")
+        return run_cleanup(days, archive=archive, task_id=self.request.id)
     except Exception as exc:
         logger.error(f"Paket temizleme hatası: {exc}")
         return {"status": "error", "message": str(exc)}
 
 
-@shared_task
-def batch_sync_countries(country_codes):
+@shared_task(bind=True)
+@tracked("Toplu ülke senkronizasyonu")
+def batch_sync_countries(self, country_codes):
     """Birden fazla ülke için toplu senkronizasyon"""
     results = []
     service = eSIMService()
 
-    for country_code in country_codes:
+    for index, country_code in enumerate(country_codes, 1):
+        report(
+            f"{country_code} ({index}/{len(country_codes)})",
+            done=index - 1,
+            total=len(country_codes),
+        )
         try:
             logger.info(f"Toplu senkronizasyon: {country_code}")
             service.sync_country_packages(country_code)
@@ -146,6 +196,8 @@ def batch_sync_countries(country_codes):
 
     success_count = len([r for r in results if r["status"] == "success"])
     error_count = len([r for r in results if r["status"] == "error"])
+    if success_count:
+        publish_catalogue()
 
     logger.info(
         f"Toplu senkronizasyon tamamlandı. Başarılı: {success_count}, Hatalı: {error_count}"
@@ -159,13 +211,19 @@ def batch_sync_countries(country_codes):
     }
 
 
-@shared_task
-def batch_update_countries(country_codes):
+@shared_task(bind=True)
+@tracked("Toplu ülke güncellemesi")
+def batch_update_countries(self, country_codes):
     """Birden fazla ülke için toplu güncelleme"""
     results = []
     service = eSIMService()
 
-    for country_code in country_codes:
+    for index, country_code in enumerate(country_codes, 1):
+        report(
+            f"{country_code} ({index}/{len(country_codes)})",
+            done=index - 1,
+            total=len(country_codes),
+        )
         try:
             logger.info(f"Toplu güncelleme: {country_code}")
             service.update_country_packages(country_code)
@@ -178,6 +236,8 @@ def batch_update_countries(country_codes):
 
     success_count = len([r for r in results if r["status"] == "success"])
     error_count = len([r for r in results if r["status"] == "error"])
+    if success_count:
+        publish_catalogue()
 
     logger.info(
         f"Toplu güncelleme tamamlandı. Başarılı: {success_count}, Hatalı: {error_count}"
@@ -191,59 +251,13 @@ def batch_update_countries(country_codes):
     }
 
 
-@shared_task
-def validate_package_data():
+@shared_task(bind=True)
+@tracked("Paket veri doğrulaması")
+def validate_package_data(self, incremental=False):
     """Paket verilerini doğrular ve raporlar"""
     try:
         logger.info("Paket veri doğrulaması başlatıldı")
-
-        issues = []
-        active_packages = eSIMPackage.objects.filter(is_active=True)
-
-        for pkg in active_packages:
-            pkg_issues = []
-
-            if pkg.price <= 0:
-                pkg_issues.append("Fiyat 0 veya negatif")
-            if pkg.data_amount_mb <= 0:
-                pkg_issues.append("Veri miktarı 0 veya negatif")
-            if pkg.validity_days <= 0:
-                pkg_issues.append("Geçerlilik süresi 0 veya negatif")
-            if not pkg.name or pkg.name.strip() == "" or pkg.name == "Unnamed Package":
-                pkg_issues.append("İsim boş veya varsayılan")
-            if not pkg.countries.exists():
-                pkg_issues.append("Hiç ülke atanmamış")
-
-            if pkg_issues:
-                issues.append(
-                    {
-                        "package_id": pkg.id,
-                        "package_name": pkg.name,
-                        "provider": pkg.provider.name,
-                        "issues": pkg_issues,
-                    }
-                )
-
-        total_active = active_packages.count()
-        problematic_count = len(issues)
-        success_rate = (
-            ((total_active - problematic_count) / total_active * 100)
-            if total_active > 0
-            else 0
-        )
-
-        logger.info(
-            f"Veri doğrulaması tamamlandı. {problematic_count}/{total_active} pakette sorun bulundu"
-        )
-
-        return {
-            "status": "success",
-            "total_active": total_active,
-            "problematic_count": problematic_count,
-            "success_rate": round(success_rate, 2),
-            "issues": issues[:50],
-        }
-
+        return run_validation(incremental=incremental)
     except Exception as exc:
         logger.error(f"Veri doğrulaması hatası: {exc}")
         return {"status": "error", "message": str(exc)}
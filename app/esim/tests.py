@@ -0,0 +1,1272 @@
+import csv
+import gzip
+import json
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from itertools import combinations
+from pathlib import Path
+from unittest import mock
+
+import redis
+from django.conf import settings as django_settings
+from django.contrib.admin import site as admin_site
+from django.contrib.auth import get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from simmaxi import db_router, throttling
+from simmaxi.db_router import (
+    STICKY_CACHE_KEY,
+    STICKY_COOKIE,
+    PrimaryStickinessMiddleware,
+    ReplicaRouter,
+    replica_reads,
+)
+
+from .admin import CountryAdmin, eSIMPackageAdmin
+from .batch import BATCH_MAX_KEYS, lookup_packages
+from .bulk import freeze_selection, run_bulk_action
+from .exports import cached_export
+from .formatting import display_fields
+from .cleanup import run_cleanup
+from .models import (
+    ArchivedPackage,
+    Country,
+    OfferedPackage,
+    PackageRanking,
+    Provider,
+    eSIMPackage,
+)
+from .planner import cents_to_price, plan_trip
+from .progress import (
+    RESULT_LIST_LIMIT,
+    SyncProgress,
+    cancel_requested,
+    enqueue,
+    read_progress,
+    report,
+    tracked,
+)
+from .rankings import best_packages, rebuild_rankings
+from .queries import (
+    ordering_expression,
+    parse_search_params,
+    search_queryset,
+    snapshot_search,
+)
+from .search import (
+    apply_search,
+    build_search_query,
+    update_country_codes,
+    update_search_vectors,
+)
+from .signals import deferred_country_refresh
+from .snapshot import get_snapshot, write_snapshot
+from .supported_countries import CACHE_KEY, LAST_GOOD_KEY
+from .tasks import validate_package_data
+from .validation import run_validation
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+class AdminChangelistQueryCountTests(TestCase):
+    """Provider ve ülke listelerinin sorgu sayısı satır sayısından bağımsız olmalı"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="secret"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _add_rows(self, start, count):
+        for i in range(start, start + count):
+            provider = Provider.objects.create(
+                name=f"Provider {i}", slug=f"provider-{i}", api_key="key"
+            )
+            country = Country.objects.create(
+                name=f"Country {i}", code=f"C{i}", flag="https://example.com/f.png"
+            )
+            for active in (True, False):
+                package = eSIMPackage.objects.create(
+                    name=f"Package {i} {active}",
+                    price="5.00",
+                    validity_days=7,
+                    data_amount_mb=1024,
+                    slug=f"package-{i}-{active}",
+                    detail={},
+                    is_active=active,
+                    provider=provider,
+                )
+                package.countries.add(country)
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def _assert_constant(self, url):
+        self._add_rows(0, 2)
+        baseline = self._query_count(url)
+        self._add_rows(2, 20)
+        with self.assertNumQueries(baseline):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_provider_changelist(self):
+        self._assert_constant(reverse("admin:esim_provider_changelist"))
+
+    def test_country_changelist(self):
+        self._assert_constant(reverse("admin:esim_country_changelist"))
+
+    def test_package_changelist(self):
+        self._assert_constant(reverse("admin:esim_esimpackage_changelist"))
+
+    def test_package_search_by_country(self):
+        self._add_rows(0, 3)
+        url = reverse("admin:esim_esimpackage_changelist")
+        for term in ("C1", "country 1"):
+            response = self.client.get(url, {"q": term})
+            self.assertEqual(
+                sorted(pkg.name for pkg in response.context["cl"].result_list),
+                ["Package 1 False", "Package 1 True"],
+            )
+
+    def test_package_search_by_country_keeps_filters(self):
+        self._add_rows(0, 3)
+        url = reverse("admin:esim_esimpackage_changelist")
+        response = self.client.get(url, {"q": "C1", "is_active__exact": "1"})
+        self.assertEqual(
+            [pkg.name for pkg in response.context["cl"].result_list],
+            ["Package 1 True"],
+        )
+
+    def test_country_code_change_refreshes_packages(self):
+        self._add_rows(0, 1)
+        country = Country.objects.get(code="C0")
+        country.code = "X0"
+        country.save()
+        self.assertEqual(
+            list(
+                eSIMPackage.objects.order_by()
+                .values_list("country_codes", flat=True)
+                .distinct()
+            ),
+            [["X0"]],
+        )
+
+    def test_sync_defers_country_code_refresh(self):
+        self._add_rows(0, 2)
+        package = eSIMPackage.objects.get(name="Package 0 True")
+        countries = Country.objects.filter(code__in=["C0", "C1"])
+        with CaptureQueriesContext(connection) as queries:
+            with deferred_country_refresh():
+                package.countries.set(countries)
+        self.assertFalse(
+            any(query["sql"].startswith("UPDATE") for query in queries),
+        )
+        package.refresh_from_db()
+        self.assertEqual(package.country_codes, ["C0"])
+        update_country_codes()
+        package.refresh_from_db()
+        self.assertEqual(package.country_codes, ["C0", "C1"])
+
+    def test_country_changelist_sorted_by_package_count(self):
+        url = reverse("admin:esim_country_changelist")
+        ordering = CountryAdmin.list_display.index("package_count") + 1
+        self._assert_constant(f"{url}?o=-{ordering}")
+
+
+class CleanupTests(TestCase):
+    """Temizlik sadece eski pasif paketleri silmeli, istenirse arşivlemeli"""
+
+    def setUp(self):
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        self.country = Country.objects.create(
+            name="Country", code="CC", flag="https://example.com/f.png"
+        )
+        old = timezone.now() - timedelta(days=60)
+        for i in range(5):
+            for active in (True, False):
+                package = eSIMPackage.objects.create(
+                    name=f"Package {i} {active}",
+                    price="5.00",
+                    validity_days=7,
+                    data_amount_mb=1024,
+                    slug=f"package-{i}-{active}",
+                    detail={"i": i},
+                    is_active=active,
+                    provider=provider,
+                )
+                package.countries.add(self.country)
+                if i < 3:
+                    eSIMPackage.objects.filter(pk=package.pk).update(updated_at=old)
+
+    def test_deletes_stale_inactive_packages(self):
+        result = run_cleanup(days=30)
+        self.assertEqual((result["status"], result["deleted"]), ("success", 3))
+        self.assertEqual(result["archived"], 0)
+        self.assertEqual(eSIMPackage.objects.filter(is_active=False).count(), 2)
+        self.assertEqual(eSIMPackage.objects.filter(is_active=True).count(), 5)
+        self.assertEqual(self.country.esimpackage_set.count(), 7)
+        self.assertFalse(ArchivedPackage.objects.exists())
+
+    def test_archives_before_delete(self):
+        result = run_cleanup(days=30, archive=True)
+        self.assertEqual(result["archived"], 3)
+        archived = ArchivedPackage.objects.get(name="Package 0 False")
+        payload = archived.payload
+        self.assertEqual(payload["id"], archived.package_id)
+        self.assertEqual(payload["detail"], {"i": 0})
+        self.assertEqual(payload["country_codes"], ["CC"])
+        self.assertFalse(eSIMPackage.objects.filter(pk=archived.package_id).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskStatusTests(TestCase):
+    """Görev durumu sonuç backend'i olmadan id ile okunabilmeli"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="user", password="secret")
+        )
+
+    def test_anonymous_is_rejected(self):
+        response = APIClient().get(reverse("task_status", args=["missing"]))
+        self.assertEqual(response.status_code, 401)
+
+    def test_unknown_task(self):
+        response = self.client.get(reverse("task_status", args=["missing"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_finished_task_summary(self):
+        result = validate_package_data.apply(kwargs={"incremental": False})
+        response = self.client.get(reverse("task_status", args=[result.id]))
+        self.assertEqual(response.status_code, 200)
+        task = response.json()["task"]
+        self.assertEqual(task["status"], "success")
+        self.assertEqual(task["label"], "Paket veri doğrulaması")
+        self.assertEqual(task["result"]["mode"], "full")
+
+    def test_large_lists_are_truncated(self):
+        results = [{"country": f"C{i}", "status": "success"} for i in range(25)]
+        SyncProgress("batch").finish({"status": "completed", "results": results})
+        task = self.client.get(reverse("task_status", args=["batch"])).json()["task"]
+        self.assertEqual(len(task["result"]["results"]), RESULT_LIST_LIMIT)
+        self.assertEqual(task["result"]["results_total"], 25)
+
+
+class SearchParamsTests(TestCase):
+    """Geçersiz sayısal arama parametreleri iki yolda da 400 döndürmeli"""
+
+    def test_invalid_numbers_are_rejected(self):
+        for name in ("search_packages", "async_search_packages"):
+            for params in (
+                {"min_price": "abc"},
+                {"max_price": "NaN"},
+                {"min_data": "1.5"},
+                {"max_validity": "-1"},
+                {"page": "0"},
+            ):
+                with self.subTest(view=name, params=params):
+                    response = self.client.get(reverse(name), params)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.json()["status"], "error")
+
+
+class AsyncThrottleTests(TestCase):
+    """Asenkron katalog uç noktaları senkronlarla aynı kovadan harcamalı"""
+
+    def setUp(self):
+        throttling._breaker["open_until"] = 0.0
+
+    def test_async_views_are_throttled(self):
+        bucket = mock.Mock(return_value=[0, "0"])
+        with mock.patch("simmaxi.throttling._token_bucket", return_value=bucket):
+            for name, args in (
+                ("async_search_packages", []),
+                ("async_get_supported_countries", []),
+                ("async_package_stats", []),
+                ("async_get_best_packages", ["TR"]),
+            ):
+                with self.subTest(view=name):
+                    response = self.client.get(reverse(name, args=args))
+                    self.assertEqual(response.status_code, 429)
+                    self.assertIn("Retry-After", response)
+        self.assertEqual(
+            {call.kwargs["keys"][0] for call in bucket.call_args_list},
+            {"throttle:bucket:catalogue_anon:127.0.0.1"},
+        )
+
+
+class ThrottleBreakerTests(TestCase):
+    """Redis kesintisinde throttle her istekte bağlantı denememeli"""
+
+    def setUp(self):
+        throttling._breaker["open_until"] = 0.0
+        self.addCleanup(throttling._breaker.update, open_until=0.0)
+
+    def test_outage_skips_redis_until_breaker_closes(self):
+        bucket = mock.Mock(side_effect=redis.ConnectionError("bağlantı yok"))
+        with mock.patch("simmaxi.throttling._token_bucket", return_value=bucket):
+            for _ in range(3):
+                response = self.client.get(reverse("get_package_stats"))
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(bucket.call_count, 1)
+
+            throttling._breaker["open_until"] = 0.0
+            self.client.get(reverse("get_package_stats"))
+            self.assertEqual(bucket.call_count, 2)
+
+
+class PackageStatsContractTests(TestCase):
+    """İstatistik yanıtı eski alan adlarını korumalı"""
+
+    def test_baseline_keys(self):
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        country = Country.objects.create(
+            name="Country", code="CC", flag="https://example.com/f.png"
+        )
+        package = eSIMPackage.objects.create(
+            name="Package",
+            price="5.00",
+            validity_days=7,
+            data_amount_mb=1024,
+            slug="package",
+            detail={},
+            is_active=True,
+            provider=provider,
+        )
+        package.countries.add(country)
+
+        for name in ("get_package_stats", "async_package_stats"):
+            with self.subTest(view=name):
+                data = self.client.get(reverse(name)).json()["data"]
+                self.assertLessEqual(
+                    {"name", "slug", "total_packages", "active_packages"},
+                    set(data["providers"][0]),
+                )
+                self.assertEqual(data["providers"][0]["slug"], "provider")
+                self.assertLessEqual(
+                    {"code", "name", "package_count"}, set(data["top_countries"][0])
+                )
+                self.assertEqual(data["top_countries"][0]["package_count"], 1)
+                self.assertLessEqual(
+                    {"total_packages", "total_providers", "total_countries"},
+                    set(data["general"]),
+                )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SupportedCountriesCacheTests(TestCase):
+    """Bilinmeyen provider'lar önbelleğe yazılmadan reddedilmeli"""
+
+    def setUp(self):
+        cache.clear()
+        Provider.objects.create(name="Provider", slug="provider", api_key="key")
+
+    def test_unknown_provider_is_rejected(self):
+        for name in ("get_supported_countries", "async_get_supported_countries"):
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name), {"provider": "nope"})
+                self.assertEqual(response.status_code, 400)
+        self.assertIsNone(cache.get(CACHE_KEY.format(provider="nope")))
+
+    def test_database_provider_has_no_last_good_entry(self):
+        response = self.client.get(
+            reverse("get_supported_countries"), {"provider": "provider"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(cache.get(CACHE_KEY.format(provider="provider")))
+        self.assertIsNone(cache.get(LAST_GOOD_KEY.format(provider="provider")))
+
+
+def use_temporary_snapshot(test):
+    """Testin snapshot dosyasını geçici bir dizine yönlendirir"""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    settings = override_settings(
+        ESIM_CATALOGUE_SNAPSHOT_PATH=Path(directory.name) / "snapshot"
+    )
+    settings.enable()
+    test.addCleanup(settings.disable)
+
+
+class PlannerTests(TestCase):
+    """Planlayıcı tüm ülkeleri kapsamalı ve kaba kuvvetle aynı en ucuz planı bulmalı"""
+
+    # isim -> (kapsadığı ülkeler, fiyat, geçerlilik, aktif)
+    FIXTURE = {
+        "A": (["AA"], "5.00", 10, True),
+        "B": (["BB"], "5.00", 10, True),
+        "AB": (["AA", "BB"], "8.00", 10, True),
+        "C": (["CC"], "4.00", 10, True),
+        "ABC": (["AA", "BB", "CC"], "13.00", 10, True),
+        "GLOBAL": (["GL"], "20.00", 30, True),
+        "INACTIVE": (["AA", "BB", "CC"], "1.00", 10, False),
+        "SHORT": (["AA", "BB", "CC"], "2.00", 3, True),
+    }
+
+    def setUp(self):
+        use_temporary_snapshot(self)
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        countries = {
+            code: Country.objects.create(
+                name=code,
+                code=code,
+                flag="https://example.com/f.png",
+                is_global=code == "GL",
+            )
+            for code in ("AA", "BB", "CC", "GL")
+        }
+        self.packages = {}
+        for name, (codes, price, validity, active) in self.FIXTURE.items():
+            package = eSIMPackage.objects.create(
+                name=name,
+                price=price,
+                validity_days=validity,
+                data_amount_mb=1024,
+                slug=name.lower(),
+                detail={},
+                is_active=active,
+                provider=provider,
+            )
+            package.countries.set([countries[code] for code in codes])
+            self.packages[name] = package
+
+    def _brute_force(self, codes, days):
+        eligible = [
+            (name, set(covers), Decimal(price))
+            for name, (covers, price, validity, active) in self.FIXTURE.items()
+            if active and validity >= days
+        ]
+        best = None
+        for size in range(1, len(eligible) + 1):
+            for combo in combinations(eligible, size):
+                covered = set().union(*(covers for _, covers, _ in combo))
+                if "GL" in covered or set(codes) <= covered:
+                    total = sum(price for _, _, price in combo)
+                    best = total if best is None else min(best, total)
+        return best
+
+    def _assert_plan(self, codes, days, use_snapshot):
+        plan = plan_trip(codes, days, use_snapshot=use_snapshot)
+        covered = [code for _, covers in plan["packages"] for code in covers]
+        self.assertEqual(sorted(covered), sorted(codes))
+        prices = {
+            package.pk: Decimal(package.price) for package in self.packages.values()
+        }
+        self.assertEqual(
+            sum(prices[package_id] for package_id, _ in plan["packages"]),
+            cents_to_price(plan["total_cents"]),
+        )
+        self.assertEqual(
+            cents_to_price(plan["total_cents"]), self._brute_force(codes, days)
+        )
+        return plan
+
+    def test_optimal_plan_from_database_and_snapshot(self):
+        write_snapshot(1)
+        for use_snapshot in (False, True):
+            for codes, days in (
+                (["AA", "BB", "CC"], 7),
+                (["AA", "CC"], 7),
+                (["BB"], 1),
+                (["AA", "BB", "CC"], 20),
+            ):
+                with self.subTest(codes=codes, days=days, snapshot=use_snapshot):
+                    self._assert_plan(codes, days, use_snapshot)
+
+    def test_skips_inactive_and_short_packages(self):
+        plan = self._assert_plan(["AA", "BB", "CC"], 7, use_snapshot=False)
+        chosen = {package_id for package_id, _ in plan["packages"]}
+        self.assertEqual(chosen, {self.packages["AB"].pk, self.packages["C"].pk})
+
+    def test_uncovered_country(self):
+        Country.objects.filter(code="GL").update(is_global=False)
+        plan = plan_trip(["AA", "ZZ"], 7, use_snapshot=False)
+        self.assertEqual(plan["uncovered"], ["ZZ"])
+
+    def test_view_replans_when_snapshot_is_stale(self):
+        write_snapshot(1)
+        eSIMPackage.objects.filter(pk=self.packages["AB"].pk).update(is_active=False)
+        response = self.client.get(
+            reverse("plan_trip_packages"), {"countries": "AA,BB,CC", "days": 7}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(
+            sorted(item["package"]["name"] for item in data["packages"]),
+            ["ABC"],
+        )
+        self.assertEqual(
+            sum(Decimal(item["package"]["price"]) for item in data["packages"]),
+            Decimal(data["total_price"]),
+        )
+
+
+class SnapshotTests(TestCase):
+    """Snapshot yazılıp okunduğunda SQL ile aynı sonuçları vermeli"""
+
+    def setUp(self):
+        use_temporary_snapshot(self)
+        self.providers = [
+            Provider.objects.create(name=slug, slug=slug, api_key="key")
+            for slug in ("one", "two")
+        ]
+        countries = [
+            Country.objects.create(
+                name=code, code=code, flag="https://example.com/f.png"
+            )
+            for code in ("AA", "BB")
+        ]
+        for i in range(12):
+            package = eSIMPackage.objects.create(
+                name=f"Package {i}",
+                price=f"{i + 1}.50",
+                validity_days=7 * (i % 3 + 1),
+                data_amount_mb=1024 * (i % 4 + 1),
+                slug=f"package-{i}",
+                detail={},
+                is_active=i != 11,
+                provider=self.providers[i % 2],
+            )
+            package.countries.set(countries[: i % 2 + 1])
+
+    def _sql_ids(self, **params):
+        search = parse_search_params(params)
+        queryset = search_queryset(search).order_by(
+            *(
+                [ordering_expression(search["ordering"]), "-updated_at", "-id"]
+                if search["ordering"]
+                else ["-updated_at", "-id"]
+            )
+        )
+        return queryset.count(), list(
+            queryset.values_list("id", flat=True)[search["start"] : search["end"]]
+        )
+
+    def test_round_trip_matches_sql(self):
+        write_snapshot(7)
+        snapshot = get_snapshot()
+        self.assertEqual(snapshot.generation, 7)
+        self.assertEqual(snapshot.row_count, 11)
+        self.assertEqual(len(snapshot.country_rows("AA")), 11)
+        self.assertEqual(len(snapshot.country_rows("BB")), 5)
+        self.assertEqual(snapshot.country_rows("ZZ"), [])
+
+        for params in (
+            {},
+            {"country": "BB"},
+            {"provider": "two", "min_price": "3", "max_price": "9.5"},
+            {"min_data": "2048", "max_validity": "14"},
+            {"ordering": "-price", "page": "2", "page_size": "4"},
+            {"ordering": "data_amount_mb", "country": "AA"},
+            {"provider": "missing"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    snapshot_search(snapshot, parse_search_params(params)),
+                    self._sql_ids(**params),
+                )
+
+    def test_packages_without_price_per_gb_sort_last(self):
+        unlimited = eSIMPackage.objects.create(
+            name="Unlimited",
+            price="30.00",
+            validity_days=7,
+            data_amount_mb=1024,
+            slug="unlimited",
+            detail={"unlimited": True},
+            is_active=True,
+            provider=self.providers[0],
+        )
+        write_snapshot(1)
+        snapshot = get_snapshot()
+        for ordering in ("price_per_gb", "-price_per_gb"):
+            params = {"ordering": ordering, "page_size": "50"}
+            with self.subTest(ordering=ordering):
+                total, ids = snapshot_search(snapshot, parse_search_params(params))
+                self.assertEqual(ids[-1], unlimited.pk)
+                self.assertEqual((total, ids), self._sql_ids(**params))
+
+    def test_search_skips_packages_deactivated_since_publish(self):
+        write_snapshot(1)
+        deactivated = eSIMPackage.objects.get(name="Package 0")
+        eSIMPackage.objects.filter(pk=deactivated.pk).update(is_active=False)
+
+        data = self.client.get(reverse("search_packages"), {"page_size": 50}).json()
+        ids = [package["id"] for package in data["data"]["packages"]]
+        self.assertNotIn(deactivated.pk, ids)
+        self.assertEqual(len(ids), 10)
+        # total_count bir sonraki yayına kadar snapshot neslinin sayısıdır
+        self.assertEqual(data["data"]["pagination"]["total_count"], 11)
+
+    def test_async_search_matches_sync(self):
+        for generation in (None, 1):
+            if generation:
+                write_snapshot(generation)
+            for params in (
+                {},
+                {"country": "BB", "ordering": "-price"},
+                {"search": "package", "page_size": "5"},
+            ):
+                with self.subTest(snapshot=generation, params=params):
+                    self.assertEqual(
+                        self.client.get(
+                            reverse("async_search_packages"), params
+                        ).json(),
+                        self.client.get(reverse("search_packages"), params).json(),
+                    )
+
+    def test_async_snapshot_scan_runs_off_event_loop(self):
+        write_snapshot(1)
+        threads = []
+
+        def scan(snapshot, search):
+            threads.append(threading.get_ident())
+            return snapshot_search(snapshot, search)
+
+        with mock.patch("app.esim.async_views.snapshot_search", side_effect=scan):
+            response = self.client.get(reverse("async_search_packages"))
+        self.assertEqual(response.status_code, 200)
+        # sync_to_async işi ana (senkron) thread'e taşır; event loop ayrı thread'dedir
+        self.assertEqual(threads, [threading.main_thread().ident])
+
+
+class BulkActionTests(TestCase):
+    """Toplu işlem seçimi JSON olarak taşınmalı, parçalanmalı ve iptal edilebilmeli"""
+
+    def setUp(self):
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        for i in range(7):
+            eSIMPackage.objects.create(
+                name=f"Package {i}",
+                price="5.00",
+                validity_days=7,
+                data_amount_mb=1024,
+                slug=f"package-{i}",
+                detail={},
+                is_active=False,
+                provider=provider,
+            )
+        self.ids = list(eSIMPackage.objects.order_by("pk").values_list("pk", flat=True))
+
+    def _selection(self):
+        # Ortada boşluk olan seçim iki aralığa sıkışır
+        queryset = eSIMPackage.objects.exclude(pk=self.ids[3])
+        selection = freeze_selection(queryset)
+        self.assertEqual(
+            selection, [[self.ids[0], self.ids[2]], [self.ids[4], self.ids[6]]]
+        )
+        self.assertEqual(json.loads(json.dumps(selection)), selection)
+        return selection
+
+    @mock.patch("app.esim.bulk.BULK_BATCH_SIZE", 2)
+    def test_activate_in_batches(self):
+        result = run_bulk_action("activate", self._selection())
+        self.assertEqual((result["status"], result["processed"]), ("success", 6))
+        self.assertEqual(
+            list(
+                eSIMPackage.objects.filter(is_active=False).values_list("pk", flat=True)
+            ),
+            [self.ids[3]],
+        )
+
+    def test_delete(self):
+        run_bulk_action("delete", self._selection())
+        self.assertEqual(
+            list(eSIMPackage.objects.values_list("pk", flat=True)), [self.ids[3]]
+        )
+
+    @mock.patch("app.esim.bulk.BULK_BATCH_SIZE", 2)
+    @mock.patch("app.esim.bulk.cancel_requested", side_effect=[False, True])
+    def test_cancel_between_batches(self, cancel_requested):
+        result = run_bulk_action("activate", self._selection(), task_id="task")
+        self.assertEqual((result["status"], result["processed"]), ("cancelled", 2))
+        self.assertEqual(eSIMPackage.objects.filter(is_active=True).count(), 2)
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            run_bulk_action("drop", [])
+
+
+class ValidationTests(TestCase):
+    """Zamanlanmış doğrulama tam çalışmalı; artımlı mod sadece değişenlere bakar"""
+
+    def setUp(self):
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        eSIMPackage.objects.create(
+            name="Free",
+            price="0.00",
+            validity_days=7,
+            data_amount_mb=1024,
+            slug="free",
+            detail={},
+            is_active=True,
+            provider=provider,
+        )
+
+    def test_nightly_run_is_full(self):
+        job = django_settings.CELERY_BEAT_SCHEDULE["validate-package-data"]
+        self.assertFalse(job.get("kwargs", {}).get("incremental"))
+
+    def test_full_run_reports_known_issues_again(self):
+        first = run_validation()
+        self.assertEqual(first["problematic_count"], 1)
+        self.assertEqual(first["issues"][0]["package_name"], "Free")
+        self.assertEqual(run_validation()["problematic_count"], 1)
+        # Artımlı mod değişmeyen sorunlu paketi tekrar raporlamaz
+        incremental = run_validation(incremental=True)
+        self.assertEqual(incremental["mode"], "incremental")
+        self.assertEqual(incremental["problematic_count"], 0)
+
+
+class OfferedExportCacheTests(TestCase):
+    """Sunulan paket dışa aktarımı admin fiyat düzenlemesinde yenilenmeli"""
+
+    def setUp(self):
+        use_temporary_snapshot(self)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(ESIM_EXPORT_DIR=Path(directory.name))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        package = eSIMPackage.objects.create(
+            name="Package",
+            price=Decimal("10.00"),
+            validity_days=7,
+            data_amount_mb=1024,
+            slug="package",
+            detail={},
+            is_active=True,
+            is_offered=True,
+            provider=provider,
+        )
+        self.offered = OfferedPackage.objects.get(esim=package)
+        write_snapshot(3)
+
+    def _sale_prices(self, path):
+        with gzip.open(path, "rt") as fh:
+            return [row["sale_price"] for row in csv.DictReader(fh)]
+
+    def test_price_edit_invalidates_export(self):
+        first = cached_export("offered_packages", "csv")
+        self.assertEqual(cached_export("offered_packages", "csv"), first)
+        self.assertEqual(self._sale_prices(first), ["10.00"])
+
+        self.offered.sales_multiplier = Decimal("1.50")
+        self.offered.save()
+        second = cached_export("offered_packages", "csv")
+        self.assertNotEqual(second, first)
+        self.assertEqual(self._sale_prices(second), ["15.00"])
+        self.assertFalse(first.exists())
+        self.assertEqual(list(second.parent.glob("*.tmp")), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SyncProgressTests(TestCase):
+    """Kuyruğa alma, izleme ve ilerleme uç noktaları aynı kaydı paylaşmalı"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _task(self, task_id):
+        return mock.Mock(request=mock.Mock(id=task_id))
+
+    def test_enqueue_writes_pending_record_first(self):
+        task = mock.Mock()
+        task_id = enqueue(task, "Etiket", "TR", cancellable=True)
+        task.apply_async.assert_called_once_with(("TR",), task_id=task_id)
+        state = read_progress([task_id])[task_id]
+        self.assertEqual(
+            (state["status"], state["label"], state["cancellable"]),
+            ("pending", "Etiket", True),
+        )
+
+    def test_tracked_records_steps_and_result(self):
+        @tracked("{} senkronizasyonu")
+        def sync(task, code):
+            report("Sayfa 1", done=1, total=4)
+            report("Sayfa listesi alındı")
+            return {"status": "success", "message": "Bitti", "items": list(range(20))}
+
+        sync(self._task("t1"), "TR")
+        state = read_progress(["t1"])["t1"]
+        self.assertEqual(state["label"], "TR senkronizasyonu")
+        self.assertEqual((state["status"], state["message"]), ("success", "Bitti"))
+        # Sayısız adım önceki adımın sayılarını temizler
+        self.assertEqual((state["done"], state["total"]), (None, None))
+        self.assertEqual(
+            [event["message"] for event in state["events"]],
+            ["Başladı", "Sayfa 1", "Sayfa listesi alındı", "Bitti"],
+        )
+        self.assertEqual(state["result"]["items_total"], 20)
+
+    def test_tracked_keeps_enqueue_label_and_records_errors(self):
+        @tracked("Genel etiket")
+        def failing(task):
+            raise RuntimeError("patladı")
+
+        task_id = enqueue(mock.Mock(), "Özel etiket")
+        with self.assertRaises(RuntimeError):
+            failing(self._task(task_id))
+        state = read_progress([task_id])[task_id]
+        self.assertEqual(state["label"], "Özel etiket")
+        self.assertEqual((state["status"], state["message"]), ("error", "patladı"))
+
+    def test_report_outside_tracked_task_is_noop(self):
+        report("Hiçbir yere yazılmaz", done=1, total=2)
+
+    def test_admin_status_and_cancel_endpoints(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="secret"
+        )
+        self.client.force_login(admin)
+        task_id = enqueue(mock.Mock(), "Toplu işlem", cancellable=True)
+
+        response = self.client.get(
+            reverse("admin:esim_package_sync_progress_status"),
+            {"task": [task_id, "missing"]},
+        )
+        tasks = response.json()["tasks"]
+        self.assertEqual(tasks[task_id]["status"], "pending")
+        self.assertIsNone(tasks["missing"])
+
+        response = self.client.post(
+            reverse("admin:esim_package_sync_progress_cancel"), {"task": task_id}
+        )
+        self.assertEqual(response.json()["status"], "success")
+        self.assertTrue(cancel_requested(task_id))
+
+
+class EstimatedPaginationTests(TestCase):
+    """Tahmini sayıda has_next gerçek satırlardan belirlenmeli"""
+
+    def setUp(self):
+        use_temporary_snapshot(self)
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        for i in range(3):
+            eSIMPackage.objects.create(
+                name=f"Package {i}",
+                price="5.00",
+                validity_days=7,
+                data_amount_mb=1024,
+                slug=f"package-{i}",
+                detail={},
+                is_active=True,
+                provider=provider,
+            )
+
+    def _pagination(self, page):
+        response = self.client.get(
+            reverse("search_packages"), {"page": page, "page_size": 2}
+        )
+        return response.json()["data"]["pagination"]
+
+    @mock.patch("app.esim.views.estimated_count", return_value=(1000, False))
+    def test_has_next_ignores_estimate(self, estimated_count):
+        first = self._pagination(1)
+        self.assertTrue(first["has_next"])
+        self.assertFalse(first["total_count_exact"])
+
+        last = self._pagination(2)
+        self.assertFalse(last["has_next"])
+        # Son sayfada toplam kesinleşir
+        self.assertEqual(
+            (last["total_count"], last["total_count_exact"], last["total_pages"]),
+            (3, True, 2),
+        )
+
+        beyond = self._pagination(5)
+        self.assertFalse(beyond["has_next"])
+        self.assertFalse(beyond["total_count_exact"])
+
+    @mock.patch("app.esim.views.estimated_count", return_value=(1, False))
+    def test_low_estimate_is_raised(self, estimated_count):
+        first = self._pagination(1)
+        self.assertTrue(first["has_next"])
+        self.assertEqual(first["total_count"], 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, REPLICA_MAX_LAG_SECONDS=5)
+class ReplicaRouterTests(TestCase):
+    """Replika kararı: salt okunur view'lar, yazma sonrası primary, gecikme kontrolü"""
+
+    def setUp(self):
+        cache.clear()
+        db_router._lag_state.update(checked_at=float("-inf"), healthy=False)
+        for name, value in (("_replica_lag", 0), ("replica_configured", True)):
+            patcher = mock.patch.object(db_router, name, return_value=value)
+            setattr(self, name.lstrip("_"), patcher.start())
+            self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(
+            username="reader", password="secret"
+        )
+        self.factory = RequestFactory()
+
+    def read_alias(self, request):
+        with replica_reads(request):
+            return ReplicaRouter().db_for_read(eSIMPackage)
+
+    def jwt_request(self, method="get"):
+        token = RefreshToken.for_user(self.user).access_token
+        return getattr(self.factory, method)("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def write(self, request):
+        # DRF kimlik doğrulamasından sonra kullanıcı Django isteğine de yazılır
+        request.user = self.user
+        return PrimaryStickinessMiddleware(lambda r: None).process_response(
+            request, HttpResponse()
+        )
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.read_alias(self.factory.get("/")), "replica")
+        self.assertEqual(ReplicaRouter().db_for_read(eSIMPackage), "default")
+
+    def test_read_only_post_uses_replica(self):
+        self.assertEqual(self.read_alias(self.factory.post("/")), "replica")
+
+    def test_session_user_does_not_recurse(self):
+        self.client.force_login(self.user)
+        request = self.factory.get("/")
+        request.COOKIES[django_settings.SESSION_COOKIE_NAME] = (
+            self.client.session.session_key
+        )
+        SessionMiddleware(lambda r: None).process_request(request)
+        AuthenticationMiddleware(lambda r: None).process_request(request)
+        with replica_reads(request):
+            self.assertTrue(request.user.is_authenticated)
+            self.assertEqual(ReplicaRouter().db_for_read(eSIMPackage), "replica")
+            self.assertEqual(ReplicaRouter().db_for_read(get_user_model()), "default")
+
+    def test_sticky_cookie_pins_to_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[STICKY_COOKIE] = str(timezone.now().timestamp() + 60)
+        self.assertEqual(self.read_alias(request), "default")
+
+    def test_jwt_user_after_write_reads_primary(self):
+        self.assertEqual(self.read_alias(self.jwt_request()), "replica")
+        response = self.write(self.jwt_request("post"))
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertIsNotNone(cache.get(STICKY_CACHE_KEY.format(user_id=self.user.pk)))
+        self.assertEqual(self.read_alias(self.jwt_request()), "default")
+
+    def test_read_only_post_does_not_pin(self):
+        request = self.jwt_request("post")
+        with replica_reads(request):
+            pass
+        response = self.write(request)
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        for side_effect in ([30], OSError("bağlantı yok")):
+            db_router._lag_state.update(checked_at=float("-inf"), healthy=False)
+            self.replica_lag.side_effect = side_effect
+            with self.subTest(side_effect=side_effect):
+                self.assertEqual(self.read_alias(self.factory.get("/")), "default")
+
+
+class FullTextSearchTests(TestCase):
+    """Arama vektörleri sadece değişen aktif paketler için yazılmalı"""
+
+    def setUp(self):
+        self.provider = Provider.objects.create(
+            name="Airalo", slug="airalo", api_key="key"
+        )
+        country = Country.objects.create(
+            name="Germany", code="DE", flag="https://example.com/f.png"
+        )
+        self.packages = []
+        for name, active in (("Europe 10GB 30Days", True), ("Asia 5GB", False)):
+            package = eSIMPackage.objects.create(
+                name=name,
+                price="5.00",
+                validity_days=30,
+                data_amount_mb=10240,
+                slug=name.lower().replace(" ", "-"),
+                detail={},
+                is_active=active,
+                provider=self.provider,
+            )
+            package.countries.add(country)
+            self.packages.append(package)
+
+    def search(self, term):
+        return list(
+            apply_search(eSIMPackage.objects.all(), term).values_list("name", flat=True)
+        )
+
+    def test_build_search_query(self):
+        self.assertIsNone(build_search_query("  !! "))
+        self.assertIsNotNone(build_search_query("Europe 10GB"))
+
+    def test_only_changed_rows_are_written(self):
+        self.assertEqual(update_search_vectors(), 1)
+        self.assertEqual(update_search_vectors(), 0)
+        eSIMPackage.objects.filter(pk=self.packages[0].pk).update(name="Europe 20GB")
+        self.assertEqual(update_search_vectors(), 1)
+
+    def test_apply_search(self):
+        update_search_vectors()
+        for term in ("europe 10gb", "30 days", "germ", "de", "airalo"):
+            with self.subTest(term=term):
+                self.assertEqual(self.search(term), ["Europe 10GB 30Days"])
+        self.assertEqual(self.search("asia"), [])
+        self.assertEqual(len(self.search("")), 2)
+
+    def test_admin_save_refreshes_vector(self):
+        update_search_vectors()
+        package = self.packages[0]
+        package.name = "Balkans 3GB"
+        package.save()
+        self.assertEqual(self.search("balkans"), [])
+        eSIMPackageAdmin(eSIMPackage, admin_site).save_related(
+            None, mock.Mock(instance=package), [], True
+        )
+        self.assertEqual(self.search("balkans"), ["Balkans 3GB"])
+        self.assertEqual(update_search_vectors(), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BatchLookupTests(TestCase):
+    """Toplu sorgu önbelleği paket değişikliklerini yayını beklemeden yansıtmalı"""
+
+    def setUp(self):
+        cache.clear()
+        self.provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        self.packages = [self.create(i) for i in range(3)]
+
+    def create(self, i):
+        return eSIMPackage.objects.create(
+            name=f"Package {i}",
+            price="5.00",
+            validity_days=7,
+            data_amount_mb=1024,
+            slug=f"package-{i}",
+            external_id=f"ext-{i}",
+            detail={},
+            is_active=True,
+            provider=self.provider,
+        )
+
+    def test_order_and_missing(self):
+        packages, missing = lookup_packages(
+            ["package-2", "nope", "package-0", "package-2"], by="slug"
+        )
+        self.assertEqual([p["slug"] for p in packages], ["package-2", "package-0"])
+        self.assertEqual(missing, ["nope"])
+
+    def test_cache_hit_skips_serialization_queries(self):
+        ids = [package.pk for package in self.packages]
+        first, _ = lookup_packages(ids)
+        # Sadece sürüm sorgusu çalışır
+        with self.assertNumQueries(1):
+            second, _ = lookup_packages(ids)
+        self.assertEqual(first, second)
+
+    def test_edits_and_new_packages_are_visible(self):
+        package = self.packages[0]
+        lookup_packages([package.pk, self.packages[1].pk])
+        self.assertEqual(lookup_packages(["package-9"], by="slug")[1], ["package-9"])
+        package.price = Decimal("9.00")
+        package.save()
+        eSIMPackage.objects.filter(pk=self.packages[1].pk).update(
+            is_active=False, updated_at=timezone.now()
+        )
+        packages, _ = lookup_packages([package.pk, self.packages[1].pk])
+        self.assertEqual(Decimal(packages[0]["price"]), Decimal("9.00"))
+        self.assertFalse(packages[1]["is_active"])
+
+        self.create(9)
+        packages, missing = lookup_packages(["package-9"], by="slug")
+        self.assertEqual((len(packages), missing), (1, []))
+
+    def test_key_limit(self):
+        response = self.client.post(
+            reverse("packages-batch"),
+            {"keys": list(range(BATCH_MAX_KEYS + 1))},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "error")
+        with self.assertRaises(ValueError):
+            lookup_packages([], by="id")
+
+
+class DisplayFieldsTests(TestCase):
+    """Gösterim alanları kayıtta hesaplanmalı, provider tekrar sorgulanmamalı"""
+
+    def setUp(self):
+        self.provider = Provider.objects.create(
+            name="eSIM Go", slug="esimgo", api_key="key"
+        )
+
+    def test_display_fields(self):
+        fields = display_fields(
+            "esim, 10GB, 30 Days, Germany, V2", "esimgo", Decimal("20.00"), 10240, {}
+        )
+        self.assertEqual(fields["formatted_name"], "Germany,30 Days/10GB")
+        self.assertEqual(fields["data_amount_gb"], Decimal("10.00"))
+        self.assertEqual(fields["price_per_gb"], Decimal("2.0000"))
+        self.assertFalse(fields["is_unlimited"])
+        self.assertEqual(
+            display_fields("Turkey 5GB 7Days", "esimaccess", None, 5120, {})[
+                "formatted_name"
+            ],
+            "Turkey,7Days/5GB",
+        )
+
+        unlimited = display_fields(
+            "Plan", "other", Decimal("9"), 1024, {"unlimited": True}
+        )
+        self.assertEqual(
+            (unlimited["is_unlimited"], unlimited["data_amount_gb"]), (True, None)
+        )
+        self.assertIsNone(unlimited["price_per_gb"])
+
+    def test_sync_update_does_not_reload_provider(self):
+        defaults = {
+            "provider": self.provider,
+            "name": "esim, 1GB, 7 Days, France, V2",
+            "price": Decimal("4.00"),
+            "validity_days": 7,
+            "data_amount_mb": 1024,
+            "detail": {},
+            "slug": "france-1gb",
+        }
+        eSIMPackage.objects.update_or_create(
+            external_id="fr-1", provider=self.provider, defaults=defaults
+        )
+        with CaptureQueriesContext(connection) as queries:
+            package, created = eSIMPackage.objects.update_or_create(
+                external_id="fr-1",
+                provider=self.provider,
+                defaults={**defaults, "price": Decimal("5.00")},
+            )
+        self.assertFalse(created)
+        self.assertFalse(
+            any(
+                Provider._meta.db_table in query["sql"].split("FROM", 1)[-1]
+                and query["sql"].startswith("SELECT")
+                for query in queries
+            )
+        )
+        package.refresh_from_db()
+        self.assertEqual(package.formatted_name, "France,7 Days/1GB")
+        self.assertEqual(package.price_per_gb, Decimal("5.0000"))
+
+
+class RankingTests(TestCase):
+    """Sıralamalar en iyi değeri bulmalı, ülke değişikliklerini artımlı yakalamalı"""
+
+    def setUp(self):
+        provider = Provider.objects.create(
+            name="Provider", slug="provider", api_key="key"
+        )
+        self.countries = {
+            code: Country.objects.create(
+                name=code, code=code, flag="https://example.com/f.png"
+            )
+            for code in ("AA", "BB")
+        }
+        # isim -> (fiyat, MB, gün, sınırsız)
+        self.packages = {}
+        for name, (price, data_mb, days, unlimited) in {
+            "cheap-per-gb": ("20.00", 20480, 30, False),
+            "cheap-total": ("3.00", 1024, 7, False),
+            "cheap-per-day": ("9.00", 2048, 30, False),
+            "unlimited": ("25.00", 1024, 10, True),
+        }.items():
+            package = eSIMPackage.objects.create(
+                name=name,
+                price=Decimal(price),
+                validity_days=days,
+                data_amount_mb=data_mb,
+                slug=name,
+                detail={"unlimited": unlimited},
+                is_active=True,
+                provider=provider,
+            )
+            package.countries.add(self.countries["AA"])
+            self.packages[name] = package
+
+    def best(self, code, metric, unlimited=False):
+        return [
+            ranking.package.name
+            for ranking in best_packages(self.countries[code], metric, 10, unlimited)
+        ]
+
+    def test_best_packages_by_metric(self):
+        rebuild_rankings()
+        self.assertEqual(
+            self.best("AA", PackageRanking.METRIC_PRICE_PER_GB),
+            ["cheap-per-gb", "cheap-total", "cheap-per-day"],
+        )
+        self.assertEqual(self.best("AA", PackageRanking.METRIC_PRICE)[0], "cheap-total")
+        self.assertEqual(
+            self.best("AA", PackageRanking.METRIC_PRICE_PER_DAY)[0], "cheap-per-day"
+        )
+        self.assertEqual(
+            self.best("AA", PackageRanking.METRIC_PRICE, unlimited=True),
+            ["unlimited"],
+        )
+
+    def test_incremental_rebuild_tracks_country_changes(self):
+        rebuild_rankings()
+        package = self.packages["cheap-total"]
+        package.countries.add(self.countries["BB"])
+        self.packages["cheap-per-gb"].countries.remove(self.countries["AA"])
+
+        rebuild_rankings()
+        self.assertEqual(self.best("BB", PackageRanking.METRIC_PRICE), ["cheap-total"])
+        self.assertNotIn("cheap-per-gb", self.best("AA", PackageRanking.METRIC_PRICE))
+
+    def test_best_endpoints(self):
+        rebuild_rankings()
+        for name in ("get_best_packages", "async_get_best_packages"):
+            with self.subTest(view=name):
+                data = self.client.get(
+                    reverse(name, args=["aa"]), {"metric": "price", "limit": "2"}
+                ).json()["data"]
+                self.assertEqual(
+                    [row["package"]["slug"] for row in data["packages"]],
+                    ["cheap-total", "cheap-per-day"],
+                )
+                response = self.client.get(reverse(name, args=["zz"]))
+                self.assertEqual(response.status_code, 404)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 from .views import CountryPackageViewSet, EsimPackageViewSet
 
 router = DefaultRouter()
@@ -30,10 +30,37 @@ urlpatterns = [
     path(
         "api/validate/", views.validate_package_data_view, name="validate_package_data"
     ),
+    path("api/tasks/<str:task_id>/", views.task_status_view, name="task_status"),
     path("api/stats/", views.get_package_stats, name="get_package_stats"),
     path(
         "api/countries/", views.get_supported_countries, name="get_supported_countries"
     ),
+    path(
+        "api/countries/<str:code>/best/",
+        views.get_best_packages,
+        name="get_best_packages",
+    ),
     path("api/search/", views.search_packages, name="search_packages"),
+    path("api/planner/", views.plan_trip_packages, name="plan_trip_packages"),
+    path("api/compare/", views.compare_packages, name="compare_packages"),
+    path("api/export/packages/", views.export_packages, name="export_packages"),
+    path("api/export/catalogue/", views.export_catalogue, name="export_catalogue"),
     path("api/sync/", views.eSIMSyncView.as_view(), name="esim_sync"),
+    # ASGI altında worker bloklamayan asenkron okuma uç noktaları
+    path(
+        "api/async/search/",
+        async_views.search_packages,
+        name="async_search_packages",
+    ),
+    path(
+        "api/async/countries/",
+        async_views.get_supported_countries,
+        name="async_get_supported_countries",
+    ),
+    path(
+        "api/async/countries/<str:code>/best/",
+        async_views.get_best_packages,
+        name="async_get_best_packages",
+    ),
+    path("api/async/stats/", async_views.get_package_stats, name="async_package_stats"),
 ]
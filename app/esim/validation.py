@@ -0,0 +1,149 @@
+"""
+Paket veri doğrulaması.
+
+Her kural bir SQL koşuludur (Q); kural başına sayılar tek bir aggregate
+sorgusunda, örnek sorunlu paketler ikinci bir sorguda okunur. Paket başına
+sorgu yapılmaz. Artımlı modda sadece son çalıştırmanın filigranından sonra
+değişen paketler doğrulanır.
+
+Artımlı mod isteğe bağlıdır (komut ve görev parametresi); zamanlanmış
+doğrulama tam çalışır. Artımlı modda önceden sorunlu olup değişmeyen paketler
+tekrar raporlanmaz ve ülke ataması değişiklikleri `updated_at`'i
+güncellemediği için `no_countries` kuralı yakalanmayabilir.
+"""
+
+import logging
+from functools import reduce
+from operator import or_
+
+from django.db.models import (
+    BooleanField,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    Max,
+    OuterRef,
+    Q,
+)
+from django.utils import timezone
+
+from .models import ValidationRun, eSIMPackage
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SIZE = 50
+
+Link = eSIMPackage.countries.through
+
+# kural kodu -> (mesaj, sorunlu paketleri seçen koşul)
+RULES = {
+    "price_not_positive": ("Fiyat 0 veya negatif", Q(price__lte=0)),
+    "data_not_positive": ("Veri miktarı 0 veya negatif", Q(data_amount_mb__lte=0)),
+    "validity_not_positive": (
+        "Geçerlilik süresi 0 veya negatif",
+        Q(validity_days__lte=0),
+    ),
+    "name_missing": (
+        "İsim boş veya varsayılan",
+        Q(name__regex=r"^\s*$") | Q(name="Unnamed Package"),
+    ),
+    "no_countries": (
+        "Hiç ülke atanmamış",
+        Q(~Exists(Link.objects.filter(esimpackage_id=OuterRef("pk")))),
+    ),
+}
+
+ANY_ISSUE = reduce(or_, (predicate for _, predicate in RULES.values()))
+
+
+def _sample_offenders(queryset):
+    flags = {
+        f"issue_{code}": ExpressionWrapper(predicate, output_field=BooleanField())
+        for code, (_, predicate) in RULES.items()
+    }
+    rows = (
+        queryset.filter(ANY_ISSUE)
+        .annotate(**flags)
+        .order_by("id")
+        .values("id", "name", "provider__name", *flags)[:SAMPLE_SIZE]
+    )
+    return [
+        {
+            "package_id": row["id"],
+            "package_name": row["name"],
+            "provider": row["provider__name"],
+            "issues": [code for code in RULES if row[f"issue_{code}"]],
+        }
+        for row in rows
+    ]
+
+
+def validate_packages(since=None):
+    """
+    Aktif paketleri kurallara göre doğrular (`since` verilirse sadece sonrasında
+    değişenleri). `(özet, örnekler)` döndürür; özet toplam, sorunlu sayısı,
+    kural başına sayılar ve doğrulanan en yeni updated_at değerini içerir.
+    Örneklerdeki sorunlar kural kodlarıyla verilir.
+    """
+    queryset = eSIMPackage.objects.filter(is_active=True)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gt=since)
+
+    summary = queryset.aggregate(
+        total=Count("pk"),
+        problematic=Count("pk", filter=ANY_ISSUE),
+        watermark=Max("updated_at"),
+        **{
+            code: Count("pk", filter=predicate)
+            for code, (_, predicate) in RULES.items()
+        },
+    )
+    samples = _sample_offenders(queryset) if summary["problematic"] else []
+    return summary, samples
+
+
+def run_validation(incremental=False):
+    """Doğrulamayı çalıştırır, sonucu `ValidationRun` olarak kaydeder ve raporlar"""
+    started_at = timezone.now()
+    since = None
+    if incremental:
+        last_run = ValidationRun.objects.filter(watermark__isnull=False).first()
+        since = last_run.watermark if last_run else None
+
+    summary, samples = validate_packages(since)
+    total, problematic = summary["total"], summary["problematic"]
+    rule_counts = {code: summary[code] for code in RULES}
+
+    run = ValidationRun.objects.create(
+        incremental=since is not None,
+        watermark=summary["watermark"] or since,
+        total_checked=total,
+        problematic_count=problematic,
+        rule_counts=rule_counts,
+        samples=samples,
+        started_at=started_at,
+        finished_at=timezone.now(),
+    )
+    logger.info(
+        f"Veri doğrulaması tamamlandı ({'artımlı' if run.incremental else 'tam'}). "
+        f"{problematic}/{total} pakette sorun bulundu"
+    )
+
+    success_rate = (total - problematic) / total * 100 if total else 0
+    return {
+        "status": "success",
+        "mode": "incremental" if run.incremental else "full",
+        "since": since.isoformat() if since else None,
+        "watermark": run.watermark.isoformat() if run.watermark else None,
+        "total_active": total,
+        "problematic_count": problematic,
+        "success_rate": round(success_rate, 2),
+        "rules": [
+            {"code": code, "message": message, "count": rule_counts[code]}
+            for code, (message, _) in RULES.items()
+        ],
+        "issues": [
+            {**sample, "issues": [RULES[code][0] for code in sample["issues"]]}
+            for sample in samples
+        ],
+    }
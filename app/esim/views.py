@@ -1,18 +1,59 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
 import json
+from datetime import datetime, time
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from django.db.models import Count, DecimalField, F, Min, Prefetch, Q
+from django.db.models.functions import NullIf
+
+from simmaxi.db_router import ReplicaReadMixin, read_alias, read_from_replica
+from simmaxi.throttling import CATALOGUE_THROTTLES, weighted
+from app.esim.serializers import (
+    CountryEsimSerializer,
+    CountrySummarySerializer,
+    eSIMPackageBatchSerializer,
+    eSIMPackageSerializer,
+)
 
-from app.esim.serializers import CountryEsimSerializer, eSIMPackageSerializer
-
-from .services import eSIMService, EsimMaxi, Esimgo
-from .models import eSIMPackage, Country, Provider
+from .batch import lookup_packages
+from .models import eSIMPackage, Country
+from .exports import (
+    EXPORT_DATASETS,
+    cached_export,
+    export_queryset,
+    gzip_stream,
+    iter_ndjson,
+    pa,
+)
+from .pagination import CountryPackagePagination, estimated_count
+from .planner import PlannerError, cents_to_price, plan_trip
+from .progress import read_progress
+from .plans import MAX_COMPARE_GROUPS, comparable_offers
+from .rankings import best_packages, best_payload, parse_best_params
+from .queries import (
+    is_requested,
+    package_lookup_queryset,
+    page_queryset,
+    parse_search_params,
+    search_payload,
+    search_queryset,
+    snapshot_search,
+    with_relations,
+)
+from .snapshot import get_snapshot
+from .stats import read_catalogue_stats
+from .supported_countries import cached_supported_countries
 from .tasks import (
     sync_all_esim_packages,
     sync_country_esim_packages,
@@ -21,6 +62,7 @@ from .tasks import (
     batch_update_countries,
     cleanup_old_packages,
     validate_package_data,
+    refresh_supported_countries_cache,
 )
 
 
@@ -162,6 +204,7 @@ def batch_update_countries_view(request):
 def cleanup_old_packages_view(request):
     """Eski paketleri temizler"""
     days = request.data.get("days", 30)
+    archive = str(request.data.get("archive", "")).lower() in ("1", "true", "on")
 
     try:
         days = int(days)
@@ -174,7 +217,7 @@ def cleanup_old_packages_view(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        task = cleanup_old_packages.delay(days)
+        task = cleanup_old_packages.delay(days, archive=archive)
         return Response(
             {
                 "status": "success",
@@ -216,60 +259,34 @@ def validate_package_data_view(request):
 
 
 @api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def task_status_view(request, task_id):
+    """Arka plan görevinin durumunu, ilerlemesini ve sonuç özetini döndürür"""
+    task = read_progress([task_id])[task_id]
+    if task is None:
+        return Response(
+            {"status": "error", "message": "Görev bulunamadı veya süresi doldu"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response({"status": "success", "task": task})
+
+
+@read_from_replica
+@api_view(["GET"])
+@throttle_classes(CATALOGUE_THROTTLES)
 def get_package_stats(request):
     """eSIM paket istatistiklerini döndürür"""
     try:
-
-        providers_stats = []
-        for provider in Provider.objects.all():
-            total_packages = eSIMPackage.objects.filter(provider=provider).count()
-            active_packages = eSIMPackage.objects.filter(
-                provider=provider, is_active=True
-            ).count()
-
-            providers_stats.append(
-                {
-                    "name": provider.name,
-                    "slug": provider.slug,
-                    "total_packages": total_packages,
-                    "active_packages": active_packages,
-                    "inactive_packages": total_packages - active_packages,
-                }
-            )
-
-        countries_stats = []
-        for country in Country.objects.all()[:10]:
-            package_count = eSIMPackage.objects.filter(
-                countries=country, is_active=True
-            ).count()
-
-            if package_count > 0:
-                countries_stats.append(
-                    {
-                        "code": country.code,
-                        "name": country.name,
-                        "package_count": package_count,
-                    }
-                )
-
-        countries_stats.sort(key=lambda x: x["package_count"], reverse=True)
-
-        total_packages = eSIMPackage.objects.count()
-        active_packages = eSIMPackage.objects.filter(is_active=True).count()
+        stats = read_catalogue_stats()
 
         return Response(
             {
                 "status": "success",
                 "data": {
-                    "general": {
-                        "total_packages": total_packages,
-                        "active_packages": active_packages,
-                        "inactive_packages": total_packages - active_packages,
-                        "total_providers": Provider.objects.count(),
-                        "total_countries": Country.objects.count(),
-                    },
-                    "providers": providers_stats,
-                    "top_countries": countries_stats[:10],
+                    "general": stats["general"],
+                    "providers": stats["providers"],
+                    "top_countries": stats["countries"][:10],
+                    "computed_at": stats["computed_at"],
                 },
             }
         )
@@ -280,37 +297,164 @@ def get_package_stats(request):
         )
 
 
+@read_from_replica
 @api_view(["GET"])
+@throttle_classes(CATALOGUE_THROTTLES)
+def get_best_packages(request, code):
+    """Ülkenin en iyi değerli paketlerini önceden hesaplanmış sıralamadan döndürür
+
+    `metric`: price_per_gb (varsayılan), price_per_day veya price;
+    `unlimited=1` ile sınırsız paketler ayrı sıralamadan döner.
+    """
+    try:
+        metric, unlimited, limit = parse_best_params(request.GET)
+    except ValueError as exc:
+        return Response(
+            {"status": "error", "message": str(exc)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    country = Country.objects.filter(code=code.upper()).first()
+    if country is None:
+        return Response(
+            {"status": "error", "message": f"Ülke bulunamadı: {code}"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    rankings = best_packages(country, metric, limit, unlimited)
+    return Response(best_payload(country, metric, unlimited, rankings))
+
+
+@read_from_replica
+@api_view(["GET"])
+@throttle_classes(weighted(5))
+def plan_trip_packages(request):
+    """Birden çok ülkeyi N gün kapsayan en ucuz paket kombinasyonunu döndürür
+
+    `?countries=TR,DE,FR&days=10&min_data=1024`
+    """
+    try:
+        days = int(request.GET.get("days", 1))
+        min_data = int(request.GET.get("min_data", 0))
+        codes = request.GET.get("countries", "").split(",")
+        # Snapshot'ın seçtiği bir paket sonradan pasifleştiyse plan güncel
+        # veritabanından yeniden kurulur; yanıt her zaman toplam fiyatla tutarlıdır
+        for use_snapshot in (True, False):
+            plan = plan_trip(codes, days, min_data, use_snapshot=use_snapshot)
+            if plan["uncovered"]:
+                break
+            package_ids = [package_id for package_id, _ in plan["packages"]]
+            packages = with_relations(
+                eSIMPackage.objects.filter(is_active=True), True, True
+            ).in_bulk(package_ids)
+            if len(packages) == len(set(package_ids)):
+                break
+        else:
+            return Response(
+                {
+                    "status": "error",
+                    "message": "Katalog güncelleniyor, lütfen tekrar deneyin",
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+    except (PlannerError, ValueError) as exc:
+        return Response(
+            {"status": "error", "message": str(exc)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if plan["uncovered"]:
+        return Response(
+            {
+                "status": "error",
+                "message": "Bazı ülkeler için uygun paket bulunamadı",
+                "uncovered": plan["uncovered"],
+            },
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response(
+        {
+            "status": "success",
+            "data": {
+                "days": days,
+                "total_price": cents_to_price(plan["total_cents"]),
+                "packages": [
+                    {
+                        "covers": covers,
+                        "package": eSIMPackageBatchSerializer(
+                            packages[package_id]
+                        ).data,
+                    }
+                    for package_id, covers in plan["packages"]
+                ],
+            },
+        }
+    )
+
+
+@read_from_replica
+@api_view(["GET"])
+@throttle_classes(weighted(3))
+def compare_packages(request):
+    """Aynı planı (ülke seti, veri, süre) sunan provider'ların tekliflerini karşılaştırır
+
+    `?country=TR&limit=50`; her grupta teklifler fiyata göre artan sıradadır.
+    """
+    country_code = request.GET.get("country")
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 50)), MAX_COMPARE_GROUPS))
+    except ValueError:
+        limit = 50
+
+    groups = comparable_offers(country_code.upper() if country_code else None, limit)
+    return Response(
+        {
+            "status": "success",
+            "data": {"country_code": country_code, "groups": groups},
+        }
+    )
+
+
+@read_from_replica
+@api_view(["GET"])
+@throttle_classes(CATALOGUE_THROTTLES)
 def get_supported_countries(request):
     """Desteklenen ülkeleri döndürür"""
     try:
         provider = request.GET.get("provider", "all")
+        entry, stale = cached_supported_countries(provider)
 
-        if provider == "all":
-            countries = Country.objects.all().order_by("name")
-            country_data = [{"code": c.code, "name": c.name} for c in countries]
-        elif provider == "esimgo":
-            service = eSIMService()
-            esim_go_countries = service.esim_go.get_countries()
-            country_data = [{"code": c, "name": c} for c in esim_go_countries]
-        else:
-            countries = (
-                Country.objects.filter(
-                    esimpackage__provider__slug=provider, esimpackage__is_active=True
-                )
-                .distinct()
-                .order_by("name")
+        if stale and cache.add(
+            f"esim:supported-countries:{provider}:refreshing", 1, 60
+        ):
+            refresh_supported_countries_cache.delay(provider)
+
+        if entry is None:
+            return Response(
+                {
+                    "status": "error",
+                    "message": "Ülke listesi henüz hazır değil, lütfen daha sonra tekrar deneyin",
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
-            country_data = [{"code": c.code, "name": c.name} for c in countries]
 
+        country_data = entry["countries"]
         return Response(
             {
                 "status": "success",
                 "provider": provider,
                 "countries": country_data,
                 "count": len(country_data),
+                "refreshed_at": entry["refreshed_at"],
+                "stale": stale,
             }
         )
+    except ValueError as exc:
+        return Response(
+            {"status": "error", "message": str(exc)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     except Exception as e:
         return Response(
             {"status": "error", "message": str(e)},
@@ -318,111 +462,118 @@ def get_supported_countries(request):
         )
 
 
+@read_from_replica
 @api_view(["GET"])
+@throttle_classes(weighted(2))
 def search_packages(request):
-    """eSIM paketlerini arar ve filtreler"""
-    try:
-        country_code = request.GET.get("country")
-        provider_slug = request.GET.get("provider")
-        min_price = request.GET.get("min_price")
-        max_price = request.GET.get("max_price")
-        min_data = request.GET.get("min_data")
-        max_data = request.GET.get("max_data")
-        min_validity = request.GET.get("min_validity")
-        max_validity = request.GET.get("max_validity")
-        search_term = request.GET.get("search")
-        page = int(request.GET.get("page", 1))
-        page_size = int(request.GET.get("page_size", 20))
-
-        queryset = eSIMPackage.objects.filter(is_active=True)
-
-        if country_code:
-            queryset = queryset.filter(countries__code=country_code)
-
-        if provider_slug:
-            queryset = queryset.filter(provider__slug=provider_slug)
-
-        if min_price:
-            queryset = queryset.filter(price__gte=float(min_price))
+    """eSIM paketlerini arar ve filtreler
 
-        if max_price:
-            queryset = queryset.filter(price__lte=float(max_price))
-
-        if min_data:
-            queryset = queryset.filter(data_amount_mb__gte=int(min_data))
-
-        if max_data:
-            queryset = queryset.filter(data_amount_mb__lte=int(max_data))
+    `?fields=id,formatted_name,price` ile sadece istenen alanlar döner;
+    ülke ve provider bilgisi istenmediğinde sorgulanmaz.
+    """
+    try:
+        try:
+            search = parse_search_params(request.GET)
+        except ValueError as exc:
+            return Response(
+                {"status": "error", "message": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        if min_validity:
-            queryset = queryset.filter(validity_days__gte=int(min_validity))
+        # Metin araması dışındaki tüm filtreler bellek eşlemeli snapshot'tan cevaplanır
+        snapshot = None if search["search_term"] else get_snapshot()
 
-        if max_validity:
-            queryset = queryset.filter(validity_days__lte=int(max_validity))
+        if snapshot is not None:
+            total_count, page_ids = snapshot_search(snapshot, search)
+            count_exact = True
+            packages_by_id = package_lookup_queryset(search).in_bulk(page_ids)
+            packages = [packages_by_id[i] for i in page_ids if i in packages_by_id]
+        else:
+            queryset = search_queryset(search)
+            total_count, count_exact = estimated_count(queryset)
+            packages = page_queryset(queryset, search)
 
-        if search_term:
-            queryset = queryset.filter(name__icontains=search_term)
+        return Response(search_payload(search, packages, total_count, count_exact))
+    except Exception as e:
+        return Response(
+            {"status": "error", "message": str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
 
-        total_count = queryset.count()
-        start = (page - 1) * page_size
-        end = start + page_size
-        packages = queryset[start:end]
-        package_data = []
-        for pkg in packages:
-            countries = [{"code": c.code, "name": c.name} for c in pkg.countries.all()]
 
-            package_data.append(
+@read_from_replica
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_packages(request):
+    """Aktif paket kataloğunu NDJSON (isteğe bağlı gzip) olarak akış halinde döndürür"""
+    updated_since = request.GET.get("updated_since")
+    if updated_since:
+        parsed = parse_datetime(updated_since)
+        if parsed is None:
+            parsed_date = parse_date(updated_since)
+            if parsed_date is not None:
+                parsed = datetime.combine(parsed_date, time.min)
+        if parsed is None:
+            return Response(
                 {
-                    "id": pkg.id,
-                    "name": pkg.name,
-                    "provider": {"name": pkg.provider.name, "slug": pkg.provider.slug},
-                    "price": float(pkg.price),
-                    "data_amount_mb": pkg.data_amount_mb,
-                    "data_amount_gb": (
-                        round(pkg.data_amount_mb / 1024, 2)
-                        if pkg.data_amount_mb != -1
-                        else "Unlimited"
-                    ),
-                    "validity_days": pkg.validity_days,
-                    "countries": countries,
-                    "created_at": pkg.created_at,
-                    "updated_at": pkg.updated_at,
-                }
+                    "status": "error",
+                    "message": "updated_since ISO 8601 tarih/zaman olmalı",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        updated_since = parsed
+
+    queryset = export_queryset(
+        provider_slug=request.GET.get("provider"),
+        country_code=request.GET.get("country"),
+        updated_since=updated_since,
+    )
+    # Akış view döndükten sonra okunur; veritabanı şimdiden sabitlenir
+    stream = iter_ndjson(queryset.using(read_alias(eSIMPackage)))
+    use_gzip = request.GET.get("gzip") in ("1", "true")
+    if use_gzip:
+        stream = gzip_stream(stream)
+
+    response = StreamingHttpResponse(stream, content_type="application/x-ndjson")
+    response["Content-Disposition"] = 'attachment; filename="packages.ndjson"'
+    if use_gzip:
+        response["Content-Encoding"] = "gzip"
+    return response
+
+
+@read_from_replica
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def export_catalogue(request):
+    """Analiz için katalog veri setini Parquet / Arrow IPC / CSV.gz dosyası olarak döndürür
 
+    `?format=` DRF'in renderer seçimine ayrıldığı için dosya formatı
+    `file_format` parametresiyle verilir (parquet, arrow, csv).
+    """
+    dataset = request.GET.get("dataset", "packages")
+    export_format = request.GET.get("file_format", "parquet" if pa else "csv")
+
+    if dataset not in EXPORT_DATASETS:
         return Response(
             {
-                "status": "success",
-                "data": {
-                    "packages": package_data,
-                    "pagination": {
-                        "page": page,
-                        "page_size": page_size,
-                        "total_count": total_count,
-                        "total_pages": (total_count + page_size - 1) // page_size,
-                        "has_next": end < total_count,
-                        "has_previous": page > 1,
-                    },
-                    "filters_applied": {
-                        "country_code": country_code,
-                        "provider_slug": provider_slug,
-                        "min_price": min_price,
-                        "max_price": max_price,
-                        "min_data": min_data,
-                        "max_data": max_data,
-                        "min_validity": min_validity,
-                        "max_validity": max_validity,
-                        "search_term": search_term,
-                    },
-                },
-            }
+                "status": "error",
+                "message": f"dataset şunlardan biri olmalı: {', '.join(EXPORT_DATASETS)}",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
         )
-    except Exception as e:
+
+    try:
+        path = cached_export(dataset, export_format)
+    except ValueError as e:
         return Response(
             {"status": "error", "message": str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=path.name)
+
 
 @method_decorator(csrf_exempt, name="dispatch")
 class eSIMSyncView(View):
@@ -490,17 +641,151 @@ class eSIMSyncView(View):
             return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
 
-class EsimPackageViewSet(viewsets.ReadOnlyModelViewSet):
-    """Databasede Bulunan Paket Verilerini Toplar"""
+class EsimPackageViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Databasede Bulunan Paket Verilerini Toplar
+
+    `?fields=` ile alanlar daraltılır, `?include=countries` ile paketin
+    ülkeleri eklenir (istenmezse ülke tablosu sorgulanmaz).
+    """
 
     queryset = eSIMPackage.objects.all()
     serializer_class = eSIMPackageSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = CATALOGUE_THROTTLES
+    # Sayfasız liste tüm kataloğu döndürür
+    throttle_costs = {"list": 20, "retrieve": 1, "batch": 5}
+    filter_backends = [OrderingFilter]
+    ordering_fields = [
+        "price",
+        "price_per_gb",
+        "data_amount_gb",
+        "validity_days",
+        "formatted_name",
+        "updated_at",
+    ]
+
+    def get_queryset(self):
+        return with_relations(
+            super().get_queryset(),
+            with_provider=False,
+            with_countries=is_requested(
+                self.request.query_params, "countries", default=False
+            ),
+        )
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """id, slug veya external_id listesiyle paketleri tek istekte çözer
+
+        Gövde: `{"keys": [...], "by": "id" | "slug" | "external_id"}`. Paketler
+        istek sırasıyla döner; bulunamayan anahtarlar `missing` içinde listelenir.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            packages, missing = lookup_packages(data.get("keys"), data.get("by", "id"))
+        except ValueError as exc:
+            return Response(
+                {"status": "error", "message": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {"status": "success", "data": {"packages": packages, "missing": missing}}
+        )
 
 
-class CountryPackageViewSet(viewsets.ReadOnlyModelViewSet):
-    """Databasede Bulunan paketleri Ülke Bazlı Çeker"""
+class CountryPackageViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Databasede Bulunan paketleri Ülke Bazlı Çeker
 
-    queryset = Country.objects.prefetch_related("esimpackage_set")
+    `?view=summary` ile ülke başına paket sayısı, en düşük fiyat ve GB başına
+    en ucuz fiyat döner. Tam listede her ülke için aktif paketlerin ilk sayfası
+    (`packages_page_size`, varsayılan 20) gömülür; devamı `packages` action'ı
+    üzerinden sayfalı çekilir. `?fields=id,name,eSIMPackages.price` ve
+    `?include=eSIMPackages.countries` ile yanıt daraltılıp genişletilebilir.
+    """
+
+    queryset = Country.objects.all()
     serializer_class = CountryEsimSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = CATALOGUE_THROTTLES
+    throttle_costs = {"list": 10, "retrieve": 2, "packages": 2}
+    pagination_class = CountryPackagePagination
+
+    def _is_summary(self):
+        return (
+            self.action == "list" and self.request.query_params.get("view") == "summary"
+        )
+
+    def _active_packages(self, countries_path):
+        return with_relations(
+            eSIMPackage.objects.filter(is_active=True),
+            with_provider=False,
+            with_countries=is_requested(
+                self.request.query_params, countries_path, default=False
+            ),
+        )
+
+    def get_queryset(self):
+        active = Q(esimpackage__is_active=True)
+
+        if self._is_summary():
+            return (
+                Country.objects.annotate(
+                    package_count=Count("esimpackage", filter=active),
+                    min_price=Min("esimpackage__price", filter=active),
+                    cheapest_per_gb=Min(
+                        F("esimpackage__price")
+                        * 1024
+                        / NullIf(F("esimpackage__data_amount_mb"), 0),
+                        filter=active & Q(esimpackage__data_amount_mb__gt=0),
+                        output_field=DecimalField(max_digits=12, decimal_places=2),
+                    ),
+                )
+                .filter(package_count__gt=0)
+                .order_by("name")
+            )
+
+        if self.action == "packages":
+            return Country.objects.all()
+
+        try:
+            limit = int(self.request.query_params.get("packages_page_size", 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, CountryPackagePagination.max_page_size))
+
+        queryset = Country.objects.order_by("name")
+        if is_requested(self.request.query_params, "package_count"):
+            queryset = queryset.annotate(
+                package_count=Count("esimpackage", filter=active)
+            )
+        if is_requested(self.request.query_params, "eSIMPackages"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "esimpackage_set",
+                    queryset=self._active_packages("eSIMPackages.countries")[:limit],
+                    to_attr="active_packages",
+                )
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self._is_summary():
+            return CountrySummarySerializer
+        return super().get_serializer_class()
+
+    def paginate_queryset(self, queryset):
+        # Ülke listesi küçük; sayfalama sadece ülke içi paket listesine uygulanır
+        if self.action != "packages":
+            return None
+        return super().paginate_queryset(queryset)
+
+    @action(detail=True, methods=["get"])
+    def packages(self, request, pk=None):
+        """Bir ülkenin aktif paketlerini sayfalı döndürür"""
+        country = self.get_object()
+        queryset = self._active_packages("countries").filter(countries=country)
+        page = self.paginate_queryset(queryset)
+        serializer = eSIMPackageSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,227 @@
+"""
+Katalog okumalarını replika veritabanına yönlendiren router.
+
+Replika sadece `DATABASES["replica"]` tanımlıysa (REPLICA_DB_HOST) kullanılır ve
+yalnızca `read_from_replica` ile işaretlenmiş (salt okunur) view'ların okumaları
+oraya gider; senkronizasyon, admin, kimlik/oturum tabloları ve tüm yazmalar
+primary'de kalır. Kullanıcı kendi yazma isteğinden sonra `REPLICA_STICKY_SECONDS`
+boyunca primary'den okur (kullanıcı DRF kimlik doğrulamasıyla, yani JWT ile
+belirlenir); replika gecikmesi `REPLICA_MAX_LAG_SECONDS`'ı aşarsa ya da replikaya
+erişilemezse okumalar primary'ye döner.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = "replica"
+STICKY_COOKIE = "esim_primary_until"
+STICKY_CACHE_KEY = "esim:primary-until:{user_id}"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Kimlik doğrulama sırasında okunan tablolar; replikaya gitmez
+PRIMARY_APP_LABELS = {"auth", "contenttypes", "sessions", "admin", "token_blacklist"}
+
+_replica_request = ContextVar("replica_request", default=None)
+
+_lag_lock = threading.Lock()
+_lag_state = {"checked_at": float("-inf"), "healthy": False}
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.databases
+
+
+def _sticky_seconds():
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 15)
+
+
+def _replica_lag():
+    # Replika değilse (pg_is_in_recovery = false) gecikme 0 kabul edilir
+    with connections[REPLICA_ALIAS].cursor() as cursor:
+        cursor.execute("""
+            SELECT CASE
+                WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+            END
+            """)
+        lag = cursor.fetchone()[0]
+    return float(lag or 0)
+
+
+def replica_healthy():
+    """Replika gecikmesini en fazla `REPLICA_LAG_CHECK_INTERVAL` saniyede bir ölçer"""
+    interval = getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 5)
+    now = time.monotonic()
+    if now - _lag_state["checked_at"] < interval:
+        return _lag_state["healthy"]
+
+    with _lag_lock:
+        if now - _lag_state["checked_at"] >= interval:
+            max_lag = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 5)
+            try:
+                lag = _replica_lag()
+                healthy = lag <= max_lag
+                if not healthy:
+                    logger.warning(f"Replika {lag:.1f} sn geride, primary kullanılıyor")
+            except Exception as exc:
+                healthy = False
+                logger.error(f"Replika gecikmesi ölçülemedi: {exc}")
+            _lag_state.update(checked_at=now, healthy=healthy)
+    return _lag_state["healthy"]
+
+
+def _api_user(request):
+    """İsteğin DRF kimlik doğrulayıcılarıyla (JWT) bulunan kullanıcısı; yoksa None"""
+    # `Request.user` Django isteğindeki kullanıcıyı da değiştirdiği için
+    # doğrulayıcılar doğrudan çağrılır
+    drf_request = Request(request)
+    for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authenticator_class().authenticate(drf_request)
+        except APIException:
+            return None
+        if result is not None:
+            return result[0]
+    # Admin ve browsable API kullanıcıları oturumla gelir
+    user = getattr(request, "user", None)
+    return user if user is not None and user.is_authenticated else None
+
+
+class _ReplicaDecision:
+    # Kimlik doğrulama view içinde yapıldığı için karar ilk okumada verilir
+    def __init__(self, request):
+        self.request = request
+        self._use_replica = None
+
+    def _sticky(self):
+        try:
+            if float(self.request.COOKIES.get(STICKY_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        user = _api_user(self.request)
+        if user is not None:
+            until = cache.get(STICKY_CACHE_KEY.format(user_id=user.pk))
+            return until is not None and until > time.time()
+        return False
+
+    def use_replica(self):
+        if self._use_replica is None:
+            # Karar verilirken yapılan okumalar (oturum, kullanıcı) primary'den
+            # yapılır; aksi halde router kararı yeniden hesaplamaya çalışır
+            self._use_replica = False
+            self._use_replica = not self._sticky() and replica_healthy()
+        return self._use_replica
+
+
+@contextmanager
+def replica_reads(request):
+    """Blok içindeki okumaları (koşullar uygunsa) replikaya yönlendirir"""
+    # Salt okunur isteklerin (ör. POST ile toplu sorgu) yanıtı primary'ye sabitlemez
+    request.replica_reads = True
+    if not replica_configured():
+        yield
+        return
+    token = _replica_request.set(_ReplicaDecision(request))
+    try:
+        yield
+    finally:
+        _replica_request.reset(token)
+
+
+def read_from_replica(view):
+    """Salt okunur fonksiyon view'ları (senkron/asenkron) için `replica_reads` dekoratörü"""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with replica_reads(request):
+                return await view(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(request):
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """Salt okunur ViewSet'lerin okumalarını replikaya yönlendiren mixin"""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request):
+            return super().dispatch(request, *args, **kwargs)
+
+
+def read_alias(model):
+    """Model için şu an geçerli okuma veritabanı (akış yanıtlarında sabitlemek için)"""
+    return ReplicaRouter().db_for_read(model) or "default"
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if (
+            model._meta.app_label in PRIMARY_APP_LABELS
+            or model._meta.label == settings.AUTH_USER_MODEL
+        ):
+            return "default"
+        decision = _replica_request.get()
+        if decision is not None and decision.use_replica():
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class PrimaryStickinessMiddleware(MiddlewareMixin):
+    """Başarılı yazma isteklerinden sonra kullanıcının okumalarını primary'ye sabitler"""
+
+    def process_response(self, request, response):
+        if (
+            replica_configured()
+            and request.method not in SAFE_METHODS
+            and not getattr(request, "replica_reads", False)
+            and response.status_code < 400
+        ):
+            until = time.time() + _sticky_seconds()
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(until),
+                max_age=_sticky_seconds(),
+                httponly=True,
+                samesite="Lax",
+            )
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                cache.set(
+                    STICKY_CACHE_KEY.format(user_id=user.pk), until, _sticky_seconds()
+                )
+        return response
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson yoksa DRF'in standart JSON renderer'ına düşülür
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack yoksa MessagePack yanıtı sunulmaz
+    msgpack = None
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    # En sık gelen tip Decimal; geri kalanı DRF'in encoder'ına bırakılır
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """orjson tabanlı JSON renderer; datetime ve UUID orjson içinde işlenir"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        options = ORJSON_OPTIONS
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=options)
+
+
+class ORJSONParser(JSONParser):
+    """orjson tabanlı JSON parser"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """`Accept: application/msgpack` ile seçilen MessagePack renderer"""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # datetime ve UUID, JSON yanıtındaki ile aynı metin biçiminde gönderilir
+        return msgpack.packb(data, default=_default, use_bin_type=True)
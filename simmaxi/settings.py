@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from datetime import timedelta
+from decouple import config
+from importlib.util import find_spec
 from pathlib import Path
 from django.templatetags.static import static
 from django.conf import settings
@@ -49,6 +51,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "app.esim",
     "app.dealers",
     "rest_framework",
@@ -65,6 +68,8 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "simmaxi.db_router.PrimaryStickinessMiddleware",
+    "simmaxi.throttling.RateLimitHeadersMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -106,6 +111,21 @@ DATABASES = {
     }
 }
 
+# Katalog okumaları için opsiyonel replika (simmaxi/db_router.py)
+REPLICA_DB_HOST = config("REPLICA_DB_HOST", default="")
+if REPLICA_DB_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": REPLICA_DB_HOST,
+        "PORT": config("REPLICA_DB_PORT", default="5432"),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["simmaxi.db_router.ReplicaRouter"]
+REPLICA_MAX_LAG_SECONDS = config("REPLICA_MAX_LAG_SECONDS", default=5, cast=int)
+REPLICA_LAG_CHECK_INTERVAL = 5
+REPLICA_STICKY_SECONDS = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -148,6 +168,15 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 CELERY_BROKER_URL = "redis://localhost:6379/0"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+    }
+}
+# Her senkronizasyon sonunda yazılan, worker'ların mmap ile okuduğu katalog snapshot'ı
+ESIM_CATALOGUE_SNAPSHOT_PATH = BASE_DIR / "var" / "catalogue.snapshot"
 AUTH_USER_MODEL = "users.CustomUser"
 
 from celery.schedules import crontab
@@ -168,6 +197,11 @@ CELERY_BEAT_SCHEDULE = {
         "task": "app.esim.tasks.update_esimgo_packages",
         "schedule": crontab(minute=0, hour="*/6"),
     },
+    # Her saat başı desteklenen ülke listesi önbelleğini yenile
+    "refresh-supported-countries": {
+        "task": "app.esim.tasks.refresh_supported_countries_cache",
+        "schedule": crontab(minute=30),
+    },
 }
 
 CELERY_TIMEZONE = "Europe/Istanbul"
@@ -180,7 +214,30 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "simmaxi.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "simmaxi.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Herkese açık katalog uç noktalarının token bucket limitleri
+    "DEFAULT_THROTTLE_RATES": {
+        "catalogue_anon": "120/min",
+        "catalogue_user": "600/min",
+    },
 }
+THROTTLE_REDIS_URL = config("THROTTLE_REDIS_URL", default="redis://localhost:6379/2")
+# Redis hatasından sonra throttle'ın Redis'i denemeden istekleri geçirdiği süre
+THROTTLE_BREAKER_SECONDS = 10
+
+# B2B istemcileri `Accept: application/msgpack` ile MessagePack yanıt alabilir
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "simmaxi.renderers.MessagePackRenderer"
+    )
 
 # Configure Spectacular settings
 SPECTACULAR_SETTINGS = {
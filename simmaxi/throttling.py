@@ -0,0 +1,223 @@
+"""
+Redis üzerinde atomik token bucket ile çalışan DRF throttle'ları.
+
+Her istemci (IP ya da kullanıcı) için Redis'te tek bir hash tutulur; doldurma ve
+harcama tek bir Lua script'iyle yapıldığından DRF'in önbellekteki zaman damgası
+listesinden hem ucuz hem de worker'lar arasında yarışsızdır. Uç noktalar
+ağırlıklıdır: tüm kataloğu döndüren çağrılar kovadan daha fazla token harcar.
+Redis'e erişilemezse istek geçirilir (fail-open) ve `THROTTLE_BREAKER_SECONDS`
+boyunca Redis hiç denenmez; böylece kesinti her isteğe bağlantı zaman aşımı
+kadar gecikme eklemez. Asenkron (DRF dışı) view'lar `athrottled` ile aynı
+kovalardan harcar.
+"""
+
+import logging
+import math
+import time
+from functools import wraps
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: kova; ARGV: kapasite, saniye başına dolum, maliyet.
+# Dönüş: {izin (0/1), kalan token (string, Lua sayıları tamsayıya kırpılır)}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+_script = None
+# Son Redis hatasından sonra kovaların atlanacağı an (time.monotonic)
+_breaker = {"open_until": 0.0}
+
+
+def _breaker_open():
+    return time.monotonic() < _breaker["open_until"]
+
+
+def _trip_breaker(exc):
+    seconds = getattr(settings, "THROTTLE_BREAKER_SECONDS", 10)
+    _breaker["open_until"] = time.monotonic() + seconds
+    logger.warning(
+        f"Throttle kovasına erişilemedi, {seconds} sn boyunca istekler geçiriliyor: {exc}"
+    )
+
+
+def _token_bucket():
+    global _script
+    if _script is None:
+        client = redis.Redis.from_url(
+            settings.THROTTLE_REDIS_URL,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1,
+        )
+        _script = client.register_script(TOKEN_BUCKET_LUA)
+    return _script
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    `rate` kovanın kapasitesini ve dolum hızını belirler ("120/min": 120 token,
+    dakikada 120 token dolum). View'lar `throttle_costs` ile action başına
+    maliyet verebilir; verilmezse sınıfın `cost` değeri kullanılır.
+    """
+
+    cache_format = "throttle:bucket:%(scope)s:%(ident)s"
+    cost = 1
+
+    def get_cost(self, view):
+        costs = getattr(view, "throttle_costs", None) or {}
+        cost = costs.get(getattr(view, "action", None), self.cost)
+        return max(1, min(cost, self.num_requests))
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        if _breaker_open():
+            return True
+
+        cost = self.get_cost(view)
+        refill = self.num_requests / self.duration
+        try:
+            allowed, tokens = _token_bucket()(
+                keys=[self.key], args=[self.num_requests, refill, cost]
+            )
+        except redis.RedisError as exc:
+            _trip_breaker(exc)
+            return True
+
+        tokens = float(tokens)
+        self._wait = 0 if allowed else (cost - tokens) / refill
+        request._request.ratelimit = {
+            "limit": self.num_requests,
+            "window": self.duration,
+            "remaining": math.floor(tokens),
+            "reset": math.ceil((self.num_requests - tokens) / refill),
+        }
+        return bool(allowed)
+
+    def wait(self):
+        return self._wait
+
+
+class CatalogueAnonThrottle(TokenBucketThrottle):
+    """Kimliği doğrulanmamış istemciler için IP başına kova"""
+
+    scope = "catalogue_anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class CatalogueUserThrottle(TokenBucketThrottle):
+    """Token ile gelen istemciler için kullanıcı başına kova"""
+
+    scope = "catalogue_user"
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+
+CATALOGUE_THROTTLES = [CatalogueAnonThrottle, CatalogueUserThrottle]
+
+
+def weighted(cost, throttles=CATALOGUE_THROTTLES):
+    """Fonksiyon view'ları için sabit maliyetli throttle sınıfları"""
+    return [
+        type(throttle.__name__, (throttle,), {"cost": cost}) for throttle in throttles
+    ]
+
+
+def _throttle_wait(request, throttles):
+    """Kovalardan harcar; istek geçerse None, aksi halde beklenecek süreyi döndürür"""
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        drf_request.user
+    except AuthenticationFailed:
+        # Geçersiz token anonim istemci gibi IP kovasından harcar
+        drf_request._not_authenticated()
+
+    waits = []
+    for throttle_class in throttles:
+        throttle = throttle_class()
+        if not throttle.allow_request(drf_request, None):
+            waits.append(throttle.wait())
+    return max(waits) if waits else None
+
+
+def athrottled(cost=1, throttles=CATALOGUE_THROTTLES):
+    """
+    Asenkron function view'lar için `throttle_classes(weighted(cost))` karşılığı.
+    Kimlik ve kova anahtarları senkron view'larla aynıdır; yanıt DRF'in 429'udur.
+    """
+    throttles = weighted(cost, throttles)
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            wait = await sync_to_async(_throttle_wait)(request, throttles)
+            if wait is not None:
+                exc = Throttled(wait)
+                response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+                response["Retry-After"] = str(math.ceil(wait))
+                return response
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class RateLimitHeadersMiddleware(MiddlewareMixin):
+    """Throttle'dan geçen isteklerin yanıtına `RateLimit-*` başlıklarını ekler"""
+
+    def process_response(self, request, response):
+        state = getattr(request, "ratelimit", None)
+        if state is not None:
+            response["RateLimit-Limit"] = str(state["limit"])
+            response["RateLimit-Remaining"] = str(state["remaining"])
+            response["RateLimit-Reset"] = str(state["reset"])
+            response["RateLimit-Policy"] = f"{state['limit']};w={state['window']}"
+        return response